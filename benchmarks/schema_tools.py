@@ -0,0 +1,359 @@
+"""Benchmarks of the json schema tools used for object and type validation.
+
+Generates synthetic type schemas and matching objects (deep nesting, wide
+objects, big arrays, ``allOf``/``$ref`` chains and pattern properties) and
+measures the schema walker construction, the data walk and the object and
+type validation of the v1 api. The results are emitted as json to track
+regressions across commits.
+
+Usage: ``python -m benchmarks.schema_tools [--output results.json]``
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from statistics import mean, stdev
+from timeit import repeat
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from muse_for_anything.api.json_schema.schema_tools import DataWalker, SchemaWalker
+
+SCHEMA_HEADER = {"$schema": "http://json-schema.org/draft-07/schema#", "abstract": False}
+
+# a generated type schema and an object that is valid against it
+Scenario = Tuple[Dict[str, Any], Any]
+
+
+def _type_schema(title: str, root: str, definitions: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **SCHEMA_HEADER,
+        "title": title,
+        "$ref": f"#/definitions/{root}",
+        "definitions": definitions,
+    }
+
+
+def generate_deep(size: int) -> Scenario:
+    """Objects nested ``size`` levels deep (every level is a definition)."""
+    definitions = {}
+    for level in range(size):
+        properties: Dict[str, Any] = {"value": {"type": ["integer"]}}
+        if level + 1 < size:
+            properties["child"] = {"$ref": f"#/definitions/level{level + 1}"}
+        definitions[f"level{level}"] = {
+            "type": ["object"],
+            "properties": properties,
+            "required": ["value"],
+        }
+    data: Dict[str, Any] = {"value": size - 1}
+    for level in reversed(range(size - 1)):
+        data = {"value": level, "child": data}
+    return _type_schema("Deep", "level0", definitions), data
+
+
+def generate_wide(size: int) -> Scenario:
+    """A single object with ``size`` properties of mixed types."""
+    property_schemas = [
+        ({"type": ["string"], "maxLength": 50}, "text"),
+        ({"type": ["integer"], "minimum": 0}, 42),
+        ({"type": ["number"]}, 4.2),
+        ({"type": ["boolean"]}, True),
+        ({"enum": ["a", "b", None]}, "b"),
+    ]
+    properties = {}
+    data = {}
+    for i in range(size):
+        schema, value = property_schemas[i % len(property_schemas)]
+        properties[f"prop{i}"] = schema
+        data[f"prop{i}"] = value
+    definitions = {
+        "root": {"type": ["object"], "properties": properties, "required": ["prop0"]}
+    }
+    return _type_schema("Wide", "root", definitions), data
+
+
+def generate_array(size: int) -> Scenario:
+    """An array of ``size`` small objects."""
+    definitions = {
+        "root": {
+            "type": ["object"],
+            "properties": {"items": {"$ref": "#/definitions/list"}},
+        },
+        "list": {
+            "type": ["array"],
+            "arrayType": "array",
+            "items": {"$ref": "#/definitions/item"},
+        },
+        "item": {
+            "type": ["object"],
+            "properties": {
+                "name": {"type": ["string"]},
+                "count": {"type": ["integer"]},
+            },
+            "required": ["name"],
+        },
+    }
+    data = {"items": [{"name": f"item {i}", "count": i} for i in range(size)]}
+    return _type_schema("Array", "root", definitions), data
+
+
+def generate_ref_chain(size: int) -> Scenario:
+    """An object type extending ``size`` base types (``allOf`` of ``$ref``).
+
+    The root is reached through a chain of ``size`` schema references.
+    """
+    definitions: Dict[str, Any] = {}
+    data: Dict[str, Any] = {}
+    for i in range(size):
+        base: Dict[str, Any] = {
+            "type": ["object"],
+            "properties": {f"prop{i}": {"type": ["integer"]}},
+        }
+        if i > 0:
+            base["allOf"] = [{"$ref": f"#/definitions/base{i - 1}"}]
+        definitions[f"base{i}"] = base
+        data[f"prop{i}"] = i
+    for i in range(size):
+        target = f"ref{i + 1}" if i + 1 < size else f"base{size - 1}"
+        definitions[f"ref{i}"] = {"$ref": f"#/definitions/{target}"}
+    return _type_schema("Ref chain", "ref0", definitions), data
+
+
+def generate_pattern(size: int) -> Scenario:
+    """An object with ``size`` keys matched by pattern properties."""
+    definitions = {
+        "root": {
+            "type": ["object"],
+            "patternProperties": {
+                "^int_[0-9]+$": {"type": ["integer"]},
+                "^str_[0-9]+$": {"type": ["string"]},
+                "^flag_": {"type": ["boolean"]},
+            },
+            "additionalProperties": {"type": ["number"]},
+        }
+    }
+    values = [("int", 1), ("str", "value"), ("flag", False), ("num", 1.5)]
+    data = {}
+    for i in range(size):
+        prefix, value = values[i % len(values)]
+        data[f"{prefix}_{i}"] = value
+    return _type_schema("Pattern", "root", definitions), data
+
+
+SCENARIOS: Dict[str, Callable[[int], Scenario]] = {
+    "deep": generate_deep,
+    "wide": generate_wide,
+    "array": generate_array,
+    "ref_chain": generate_ref_chain,
+    "pattern": generate_pattern,
+}
+
+# the scenario sizes by preset (deep nesting is limited by the recursion limit)
+SIZES: Dict[str, Dict[str, List[int]]] = {
+    "quick": {
+        "deep": [10, 50],
+        "wide": [10, 100],
+        "array": [10, 100],
+        "ref_chain": [5, 20],
+        "pattern": [10, 100],
+    },
+    "full": {
+        "deep": [10, 50, 150],
+        "wide": [10, 100, 1000],
+        "array": [10, 100, 1000, 10000],
+        "ref_chain": [5, 20, 80],
+        "pattern": [10, 100, 1000],
+    },
+}
+
+
+def _no_url_resolver(url: str) -> Optional[Dict[str, Any]]:
+    return None
+
+
+def walk_schema(schema: Dict[str, Any], data: Any):
+    """Construct a schema walker and the child walkers of all data locations."""
+    stack = [(data, SchemaWalker(schema, _no_url_resolver))]
+    while stack:
+        data, walker = stack.pop()
+        if isinstance(data, dict):
+            stack.extend((value, walker[key]) for key, value in data.items())
+        elif isinstance(data, list):
+            stack.extend((value, walker[index]) for index, value in enumerate(data))
+
+
+def walk_data(schema: Dict[str, Any], data: Any):
+    DataWalker(data, SchemaWalker(schema, _no_url_resolver), visitors=None).walk()
+
+
+class ApiBenchmarks:
+    """Benchmarks of the object and type validation of the v1 api.
+
+    Uses an app with an in memory database holding a type for every scenario.
+    """
+
+    def __init__(self) -> None:
+        from muse_for_anything import create_app
+        from muse_for_anything.db.db import DB
+        from muse_for_anything.db.models.namespace import Namespace
+        from muse_for_anything.util.config import ProductionConfig
+
+        # a test config skips the production defaults, so start from them
+        config = {
+            key: getattr(ProductionConfig, key)
+            for key in dir(ProductionConfig)
+            if key.isupper()
+        }
+        config.update(
+            SQLALCHEMY_DATABASE_URI="sqlite://",
+            SECRET_KEY="benchmark-secret-key-benchmark-secret-key",
+        )
+        self.app = create_app(config)
+        self._context = self.app.test_request_context()
+        self._context.push()
+        DB.create_all()
+        self.namespace = Namespace(name="benchmarks", description="")
+        DB.session.add(self.namespace)
+        DB.session.commit()
+
+    def close(self):
+        self._context.pop()
+
+    def create_type_version(self, name: str, schema: Dict[str, Any]):
+        from muse_for_anything.db.db import DB
+        from muse_for_anything.db.models.ontology_objects import (
+            OntologyObjectType,
+            OntologyObjectTypeVersion,
+        )
+
+        object_type = OntologyObjectType(
+            namespace=self.namespace, name=name, description=""
+        )
+        type_version = OntologyObjectTypeVersion(object_type, 1, schema)
+        object_type.current_version = type_version
+        DB.session.add_all([object_type, type_version])
+        DB.session.commit()
+        return type_version
+
+    def validate_object(self, type_version, data: Any):
+        from muse_for_anything.api.v1_api.ontology_object_validation import (
+            validate_object_data,
+        )
+
+        validate_object_data(data, type_version)
+
+    def validate_object_type(self, type_version):
+        from muse_for_anything.api.v1_api.ontology_type_validation import (
+            validate_object_type,
+        )
+
+        validate_object_type(type_version)
+
+
+def _measure(func: Callable[[], Any], number: int, repetitions: int) -> Dict[str, Any]:
+    func()  # warm up (fills the caches used by all later calls)
+    timings = [t / number for t in repeat(func, number=number, repeat=repetitions)]
+    return {
+        "min": min(timings),
+        "mean": mean(timings),
+        "stdev": stdev(timings) if len(timings) > 1 else 0.0,
+        "number": number,
+        "repeat": repetitions,
+    }
+
+
+def run(
+    sizes: Dict[str, List[int]],
+    scenarios: Optional[List[str]] = None,
+    number: int = 3,
+    repetitions: int = 5,
+    include_api: bool = True,
+) -> List[Dict[str, Any]]:
+    api = ApiBenchmarks() if include_api else None
+    results = []
+    try:
+        for scenario in scenarios or list(SCENARIOS):
+            for size in sizes[scenario]:
+                schema, data = SCENARIOS[scenario](size)
+                benchmarks: Dict[str, Callable[[], Any]] = {
+                    "SchemaWalker": lambda schema=schema, data=data: walk_schema(
+                        schema, data
+                    ),
+                    "DataWalker.walk": lambda schema=schema, data=data: walk_data(
+                        schema, data
+                    ),
+                }
+                if api is not None:
+                    type_version = api.create_type_version(f"{scenario}-{size}", schema)
+                    benchmarks["validate_object"] = (
+                        lambda type_version=type_version, data=data: (
+                            api.validate_object(type_version, data)
+                        )
+                    )
+                    benchmarks["validate_object_type"] = (
+                        lambda type_version=type_version: (
+                            api.validate_object_type(type_version)
+                        )
+                    )
+                for name, func in benchmarks.items():
+                    results.append(
+                        {
+                            "scenario": scenario,
+                            "size": size,
+                            "benchmark": name,
+                            **_measure(func, number=number, repetitions=repetitions),
+                        }
+                    )
+    finally:
+        if api is not None:
+            api.close()
+    return results
+
+
+def _get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=list(SIZES), default="quick")
+    parser.add_argument("--scenario", choices=list(SCENARIOS), action="append")
+    parser.add_argument("--number", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--no-api",
+        action="store_true",
+        help="Only benchmark the schema tools (without object and type validation).",
+    )
+    parser.add_argument("--output", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    results = {
+        "commit": _get_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "preset": args.preset,
+        "results": run(
+            sizes=SIZES[args.preset],
+            scenarios=args.scenario,
+            number=args.number,
+            repetitions=args.repeat,
+            include_api=not args.no_api,
+        ),
+    }
+    if args.output:
+        with open(args.output, mode="w") as output:
+            json.dump(results, output, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Micro-benchmark of walking generated type schemas with the type schema.
+
+Compares the shared type schema walker and the cached walkers of the type
+definitions against building a new walker for every type definition.
+
+Usage: ``python -m benchmarks.type_schema_walk``
+"""
+
+import argparse
+import json
+from timeit import repeat
+from typing import Any, Dict, List
+
+from muse_for_anything.api.json_schema.schema_tools import SchemaWalker
+from muse_for_anything.api.v1_api.models.schema import TYPE_SCHEMA
+from muse_for_anything.api.v1_api.ontology_type_validation import (
+    SCHEMA_VALIDATOR,
+    RefVisitor,
+    ResourceReferenceVisitor,
+    TypeSchemaDataWalker,
+    get_type_schema_walker,
+)
+
+PROPERTY_SCHEMAS: List[Dict[str, Any]] = [
+    {"type": ["string"], "singleLine": True, "maxLength": 100},
+    {"type": ["integer"], "minimum": 0},
+    {"type": ["number"], "maximum": 10.5},
+    {"type": ["boolean"]},
+    {"enum": ["a", "b", 1, None]},
+]
+
+
+class UncachedTypeSchemaDataWalker(TypeSchemaDataWalker):
+    """Type schema walker building a new walker for every type definition."""
+
+    __slots__ = tuple()
+
+    def _get_injected_walker(self, walker: SchemaWalker, inject_schema_ref: str):
+        return self._copy_walker(walker, inject_schema_ref)
+
+
+def generate_type_schema(width: int, depth: int) -> Dict[str, Any]:
+    """Generate a type schema with ``depth`` object definitions of ``width`` properties.
+
+    Every object definition references the next definition in one property.
+    """
+    definitions: Dict[str, Any] = {}
+    for level in range(depth):
+        properties: Dict[str, Any] = {
+            f"prop{i}": {
+                "title": f"Property {i}",
+                **PROPERTY_SCHEMAS[i % len(PROPERTY_SCHEMAS)],
+            }
+            for i in range(width)
+        }
+        if level + 1 < depth:
+            properties["next"] = {"$ref": f"#/definitions/level{level + 1}"}
+        definitions[f"level{level}"] = {
+            "type": ["object"],
+            "title": f"Level {level}",
+            "properties": properties,
+            "required": ["prop0"],
+        }
+    definitions["list"] = {
+        "type": ["array"],
+        "arrayType": "array",
+        "items": {"type": ["string"]},
+    }
+    definitions["pair"] = {
+        "type": ["array"],
+        "arrayType": "tuple",
+        "items": [{"type": ["integer"]}, {"type": ["string"]}],
+    }
+    return {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "title": f"Generated {width}x{depth}",
+        "$ref": "#/definitions/level0",
+        "abstract": False,
+        "definitions": definitions,
+    }
+
+
+def walk_cached(schema: Dict[str, Any]):
+    TypeSchemaDataWalker(
+        schema,
+        get_type_schema_walker(),
+        visitors=[RefVisitor(), ResourceReferenceVisitor()],
+    ).walk()
+
+
+def walk_uncached(schema: Dict[str, Any]):
+    UncachedTypeSchemaDataWalker(
+        schema,
+        SchemaWalker(TYPE_SCHEMA, lambda x: None),
+        visitors=[RefVisitor(), ResourceReferenceVisitor()],
+    ).walk()
+
+
+def run(sizes: List[int], depth: int, number: int, repetitions: int):
+    results = []
+    for width in sizes:
+        schema = generate_type_schema(width=width, depth=depth)
+        SCHEMA_VALIDATOR.validate(schema)  # benchmark only valid type schemas
+        result: Dict[str, Any] = {"width": width, "depth": depth}
+        for name, walk in (("uncached", walk_uncached), ("cached", walk_cached)):
+            timings = repeat(
+                lambda walk=walk, schema=schema: walk(schema),
+                number=number,
+                repeat=repetitions,
+            )
+            result[name] = min(timings) / number
+        result["speedup"] = result["uncached"] / result["cached"]
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--number", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    results = run(
+        sizes=args.sizes, depth=args.depth, number=args.number, repetitions=args.repeat
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Add current name, current sort key and path to taxonomy items.
+
+Revision ID: 3b9d2f6c1e47
+Revises: ecf3e093a631
+Create Date: 2026-10-17 09:12:40.318275
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3b9d2f6c1e47"
+down_revision = "ecf3e093a631"
+branch_labels = None
+depends_on = None
+
+
+item_table = sa.table(
+    "TaxonomyItem",
+    sa.column("id", sa.Integer),
+    sa.column("current_version_id", sa.Integer),
+    sa.column("current_name", sa.Unicode),
+    sa.column("current_sort_key", sa.Float),
+    sa.column("path", sa.String),
+)
+
+version_table = sa.table(
+    "TaxonomyItemVersion",
+    sa.column("id", sa.Integer),
+    sa.column("name", sa.Unicode),
+    sa.column("sort_key", sa.Float),
+)
+
+relation_table = sa.table(
+    "TaxonomyItemRelation",
+    sa.column("id", sa.Integer),
+    sa.column("taxonomy_item_source_id", sa.Integer),
+    sa.column("taxonomy_item_target_id", sa.Integer),
+    sa.column("deleted_on", sa.DateTime(timezone=True)),
+)
+
+
+def populate_current_version_columns():
+    """Copy the name and sort key of the current version into the items."""
+    connection = op.get_bind()
+    for column in ("name", "sort_key"):
+        connection.execute(
+            item_table.update().values(
+                {
+                    f"current_{column}": sa.select(version_table.c[column])
+                    .where(version_table.c.id == item_table.c.current_version_id)
+                    .scalar_subquery()
+                }
+            )
+        )
+
+
+def populate_paths():
+    """Compute the paths of all items from their first current relation."""
+    connection = op.get_bind()
+    item_ids = connection.execute(sa.select(item_table.c.id)).scalars().all()
+    first_parents = {}
+    for source_id, target_id in connection.execute(
+        sa.select(
+            relation_table.c.taxonomy_item_source_id,
+            relation_table.c.taxonomy_item_target_id,
+        )
+        .where(relation_table.c.deleted_on == None)
+        .order_by(relation_table.c.id)
+    ):
+        first_parents.setdefault(target_id, source_id)
+
+    paths = {}
+    for item_id in item_ids:
+        # follow the first parents up to an item with a known path
+        chain = []
+        parent_id = item_id
+        while parent_id is not None and parent_id not in paths:
+            if parent_id in chain:
+                break  # circle (cannot happen for valid taxonomies)
+            chain.append(parent_id)
+            parent_id = first_parents.get(parent_id)
+        parent_path = paths.get(parent_id, "/")
+        for chain_id in reversed(chain):
+            parent_path = paths[chain_id] = f"{parent_path}{chain_id}/"
+
+    if paths:
+        connection.execute(
+            item_table.update()
+            .where(item_table.c.id == sa.bindparam("item_id"))
+            .values(path=sa.bindparam("new_path")),
+            [{"item_id": item_id, "new_path": path} for item_id, path in paths.items()],
+        )
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table("TaxonomyItem", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("current_name", sa.Unicode(), nullable=True))
+        batch_op.add_column(sa.Column("current_sort_key", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("path", sa.String(), nullable=True))
+        batch_op.create_index(
+            batch_op.f("ix_TaxonomyItem_current_name"), ["current_name"], unique=False
+        )
+        batch_op.create_index(batch_op.f("ix_TaxonomyItem_path"), ["path"], unique=False)
+        batch_op.create_index(
+            "ix_sort_TaxonomyItem",
+            ["taxonomy_id", "current_sort_key", "current_name"],
+            unique=False,
+        )
+
+    # ### end Alembic commands ###
+    populate_current_version_columns()
+    populate_paths()
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table("TaxonomyItem", schema=None) as batch_op:
+        batch_op.drop_index("ix_sort_TaxonomyItem")
+        batch_op.drop_index(batch_op.f("ix_TaxonomyItem_path"))
+        batch_op.drop_index(batch_op.f("ix_TaxonomyItem_current_name"))
+        batch_op.drop_column("path")
+        batch_op.drop_column("current_sort_key")
+        batch_op.drop_column("current_name")
+
+    # ### end Alembic commands ###
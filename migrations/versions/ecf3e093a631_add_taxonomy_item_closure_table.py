@@ -0,0 +1,150 @@
+"""Add taxonomy item closure table.
+
+Revision ID: ecf3e093a631
+Revises: 7cafcf18cca2
+Create Date: 2026-10-17 03:31:12.482113
+"""
+
+from collections import Counter, defaultdict, deque
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "ecf3e093a631"
+down_revision = "7cafcf18cca2"
+branch_labels = None
+depends_on = None
+
+
+closure_table = sa.table(
+    "TaxonomyItemClosure",
+    sa.column("taxonomy_id", sa.Integer),
+    sa.column("ancestor_id", sa.Integer),
+    sa.column("descendant_id", sa.Integer),
+    sa.column("path_count", sa.BigInteger),
+)
+
+item_table = sa.table(
+    "TaxonomyItem",
+    sa.column("id", sa.Integer),
+    sa.column("taxonomy_id", sa.Integer),
+)
+
+relation_table = sa.table(
+    "TaxonomyItemRelation",
+    sa.column("taxonomy_item_source_id", sa.Integer),
+    sa.column("taxonomy_item_target_id", sa.Integer),
+    sa.column("deleted_on", sa.DateTime(timezone=True)),
+)
+
+
+def populate_closure_table():
+    """Compute the path counts between all items from the current relations."""
+    connection = op.get_bind()
+    edges = connection.execute(
+        sa.select(
+            item_table.c.taxonomy_id,
+            relation_table.c.taxonomy_item_source_id,
+            relation_table.c.taxonomy_item_target_id,
+        )
+        .select_from(relation_table)
+        .join(item_table, item_table.c.id == relation_table.c.taxonomy_item_source_id)
+        .where(relation_table.c.deleted_on == None)
+    ).all()
+
+    taxonomy_of_item = {}
+    children = defaultdict(list)
+    parents = defaultdict(list)
+    child_count = Counter()
+    for taxonomy_id, source_id, target_id in edges:
+        taxonomy_of_item[source_id] = taxonomy_id
+        children[source_id].append(target_id)
+        parents[target_id].append(source_id)
+        child_count[source_id] += 1
+
+    # process the items in reverse topological order (leaves first)
+    leaves = deque(item_id for item_id in parents if not child_count[item_id])
+    closure = {}
+    rows = []
+    while leaves:
+        item_id = leaves.popleft()
+        descendants = Counter()
+        for child_id in children.get(item_id, ()):
+            descendants[child_id] += 1
+            descendants.update(closure.get(child_id, {}))
+        closure[item_id] = descendants
+        rows.extend(
+            {
+                "taxonomy_id": taxonomy_of_item[item_id],
+                "ancestor_id": item_id,
+                "descendant_id": descendant_id,
+                "path_count": path_count,
+            }
+            for descendant_id, path_count in descendants.items()
+        )
+        for parent_id in parents.get(item_id, ()):
+            child_count[parent_id] -= 1
+            if not child_count[parent_id]:
+                leaves.append(parent_id)
+
+    if rows:
+        op.bulk_insert(closure_table, rows)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table(
+        "TaxonomyItemClosure",
+        sa.Column("taxonomy_id", sa.Integer(), nullable=False),
+        sa.Column("ancestor_id", sa.Integer(), nullable=False),
+        sa.Column("descendant_id", sa.Integer(), nullable=False),
+        sa.Column("path_count", sa.BigInteger(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["ancestor_id"],
+            ["TaxonomyItem.id"],
+            name=op.f("fk_TaxonomyItemClosure_ancestor_id_TaxonomyItem"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["descendant_id"],
+            ["TaxonomyItem.id"],
+            name=op.f("fk_TaxonomyItemClosure_descendant_id_TaxonomyItem"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["taxonomy_id"],
+            ["Taxonomy.id"],
+            name=op.f("fk_TaxonomyItemClosure_taxonomy_id_Taxonomy"),
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_TaxonomyItemClosure")),
+    )
+    with op.batch_alter_table("TaxonomyItemClosure", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_TaxonomyItemClosure_descendant_id"),
+            ["descendant_id"],
+            unique=False,
+        )
+        batch_op.create_index(
+            batch_op.f("ix_TaxonomyItemClosure_taxonomy_id"),
+            ["taxonomy_id"],
+            unique=False,
+        )
+        batch_op.create_index(
+            "ix_uq_ancestor_descendant_TaxonomyItemClosure",
+            ["ancestor_id", "descendant_id"],
+            unique=True,
+        )
+
+    # ### end Alembic commands ###
+    populate_closure_table()
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table("TaxonomyItemClosure", schema=None) as batch_op:
+        batch_op.drop_index("ix_uq_ancestor_descendant_TaxonomyItemClosure")
+        batch_op.drop_index(batch_op.f("ix_TaxonomyItemClosure_taxonomy_id"))
+        batch_op.drop_index(batch_op.f("ix_TaxonomyItemClosure_descendant_id"))
+
+    op.drop_table("TaxonomyItemClosure")
+    # ### end Alembic commands ###
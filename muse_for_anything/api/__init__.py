@@ -12,6 +12,10 @@ from .base_models import (
     DynamicApiResponseSchema,
 )
 from .v1_api import API_V1
+from .v1_api.link_templates import LINK_TEMPLATES
+from .v1_api.response_cache import IMMUTABLE_RESPONSES
+from .v1_api.schema_store import TYPE_SCHEMAS
+from .v1_api.validator_cache import TYPE_VERSION_VALIDATORS
 from .jwt import SECURITY_SCHEMES
 
 """A single API instance. All api versions should be blueprints."""
@@ -77,3 +81,8 @@ def register_root_api(app: Flask):
     # register API blueprints (only do this after the API is registered with flask!)
     ROOT_API.register_blueprint(ROOT_ENDPOINT)
     ROOT_API.register_blueprint(API_V1)
+
+    LINK_TEMPLATES.init_app(app)
+    IMMUTABLE_RESPONSES.init_app(app)
+    TYPE_SCHEMAS.init_app(app)
+    TYPE_VERSION_VALIDATORS.init_app(app)
@@ -1,3 +1,4 @@
 """Module for working with jsonschema objects."""
 
 from .schema_tools import *
+from .validation_plan import *
@@ -6,17 +6,19 @@ from typing import (
     Callable,
     Deque,
     Dict,
+    Hashable,
     Iterable,
     List,
     Optional,
+    Pattern,
     Sequence,
     Set,
     Tuple,
     Union,
     cast,
 )
-from re import search
-from functools import reduce
+from re import compile
+from functools import lru_cache, reduce
 
 __all__ = [
     "SchemaWalker",
@@ -27,7 +29,26 @@ __all__ = [
 ]
 
 
+# maximum number of memoized property walkers of a single schema walker
+MAX_MEMOIZED_PROPERTIES = 1024
+
+
+@lru_cache(maxsize=1024)
+def _compile_pattern(pattern: str) -> Pattern:
+    return compile(pattern)
+
+
 class SchemaWalker:
+    """Walk a json schema (resolving ``$ref`` and ``allOf``) alongside the data.
+
+    The schemas are treated as immutable. Derived values of the resolved
+    schema (types, attributes) and the child walkers are memoized, so walking
+    the same schema location again (e.g. for every item of an array) does not
+    resolve the schemas again. All array items after the longest tuple schema
+    share a single walker (its path ends with the index of the first of these
+    items).
+    """
+
     __slots__ = (
         "cache",
         "path",
@@ -35,6 +56,8 @@ class SchemaWalker:
         "resolved_schema",
         "resolve_error",
         "url_resolver",
+        "_memo",
+        "_children",
     )
 
     def __init__(
@@ -47,6 +70,10 @@ class SchemaWalker:
         self.path = path if path else tuple()
         self.url_resolver = url_resolver
         self.cache = cache if cache is not None else {}
+        # memoized values derived from the resolved schema
+        self._memo: Dict[Hashable, Any] = {}
+        # memoized child walkers by property name or array position
+        self._children: Dict[Union[str, int], "SchemaWalker"] = {}
         if isinstance(schema, Sequence):
             self.schema = tuple(
                 (a, s) for a, s in schema if s and s is not True
@@ -79,7 +106,12 @@ class SchemaWalker:
 
     @property
     def resolved_attributes(self) -> Set[str]:
-        return self._get_attributes(resolved=True)
+        attributes = self._memo.get("attributes")
+        if attributes is None:
+            attributes = self._memo["attributes"] = frozenset(
+                self._get_attributes(resolved=True)
+            )
+        return set(attributes)
 
     def _get_attribute(self, attr: str, resolved: bool = False) -> List[Any]:
         attribute_values = []
@@ -92,7 +124,11 @@ class SchemaWalker:
         return self._get_attribute(attr)
 
     def get_resolved_attribute(self, attr: str) -> List[Any]:
-        return self._get_attribute(attr, resolved=True)
+        key = ("attribute", attr)
+        values = self._memo.get(key)
+        if values is None:
+            values = self._memo[key] = tuple(self._get_attribute(attr, resolved=True))
+        return list(values)
 
     def _get_type(self, resolved: bool = False) -> Set[str]:
         types_set = self._get_attribute("type", resolved=resolved)
@@ -158,10 +194,13 @@ class SchemaWalker:
 
     @property
     def main_type_resolved(self) -> str:
-        return self._get_main_type(resolved=True)
+        main_type = self._memo.get("main_type")
+        if main_type is None:
+            main_type = self._memo["main_type"] = self._get_main_type(resolved=True)
+        return main_type
 
     def _get_secondary_type(self, resolved: bool = False) -> Optional[str]:
-        main_type = self._get_main_type(resolved=resolved)
+        main_type = self.main_type_resolved if resolved else self._get_main_type()
         schemas = self.resolved_schema if resolved else self.schema
         if main_type == "object":
             for _, schema in reversed(schemas):
@@ -177,20 +216,40 @@ class SchemaWalker:
 
     @property
     def secondary_type_resolved(self) -> Optional[str]:
-        return self._get_secondary_type(resolved=True)
+        if "secondary_type" not in self._memo:
+            self._memo["secondary_type"] = self._get_secondary_type(resolved=True)
+        return self._memo["secondary_type"]
 
     @property
     def properties_resolved(self) -> Set[str]:
-        if self.main_type_resolved != "object":
-            return set()
+        props = self._memo.get("properties")
+        if props is not None:
+            return set(props)
         props = set()
-        property_dicts = cast(
-            Set[Dict[str, Any]], self.get_resolved_attribute("properties")
-        )
-        for prop_dict in property_dicts:
-            props.update(prop_dict.keys())
+        if self.main_type_resolved == "object":
+            property_dicts = cast(
+                Set[Dict[str, Any]], self.get_resolved_attribute("properties")
+            )
+            for prop_dict in property_dicts:
+                props.update(prop_dict.keys())
+        self._memo["properties"] = frozenset(props)
         return props
 
+    @property
+    def tuple_length_resolved(self) -> int:
+        """The length of the longest tuple schema (``items`` given as a list)."""
+        tuple_length = self._memo.get("tuple_length")
+        if tuple_length is None:
+            tuple_length = self._memo["tuple_length"] = max(
+                (
+                    len(items)
+                    for items in self.get_resolved_attribute("items")
+                    if isinstance(items, Sequence)
+                ),
+                default=0,
+            )
+        return tuple_length
+
     def _get_resolved_object_property(self, prop: str) -> "SchemaWalker":
         schemas = []
         for anchor, schema in self.resolved_schema:
@@ -200,7 +259,7 @@ class SchemaWalker:
             used_pattern_property = False
             if "patternProperties" in schema:
                 for pattern, prop_schema in schema["patternProperties"].items():
-                    if search(pattern, prop):
+                    if _compile_pattern(pattern).search(prop):
                         schemas.append((anchor, prop_schema))
                         used_pattern_property = True
             if not used_pattern_property and prop_schema is None:
@@ -240,11 +299,21 @@ class SchemaWalker:
         if main_type == "object":
             if not isinstance(item, str):
                 raise TypeError("Item must be of type str for object properties!")
-            return self._get_resolved_object_property(item)
+            child = self._children.get(item)
+            if child is None:
+                child = self._get_resolved_object_property(item)
+                if len(self._children) < MAX_MEMOIZED_PROPERTIES:
+                    self._children[item] = child
+            return child
         elif main_type == "array":
             if not isinstance(item, int):
                 raise TypeError("Item must be of type int for array items!")
-            return self._get_resolved_array_item(item)
+            # all items after the longest tuple schema share the same schemas
+            position = min(item, self.tuple_length_resolved)
+            child = self._children.get(position)
+            if child is None:
+                child = self._children[position] = self._get_resolved_array_item(position)
+            return child
         raise IndexError("Schema is not indexable!")
 
     def _fetch_schema(self, anchor: str) -> Dict[str, Any]:
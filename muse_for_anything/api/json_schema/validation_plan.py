@@ -0,0 +1,497 @@
+"""Precompiled validation plans for validating data in a single pass.
+
+A validation plan validates data against a json schema and collects all
+data nodes whose schema matches a predicate (e.g. resource references) in the
+same traversal. ``$ref`` and ``allOf`` are resolved with the ``SchemaWalker``
+and the resolved schemas of every visited schema location are compiled once.
+All other keywords are evaluated with the keyword functions of the
+jsonschema validator, so the reported errors are the same as the errors of
+``validator.iter_errors`` (only the ``schema_path`` of an error is relative
+to the resolved schema containing the failed keyword).
+
+Schemas the plan cannot evaluate exactly (e.g. ``$ref`` inside of ``anyOf``)
+raise an ``UnsupportedSchemaError`` and must be validated with the validator
+(and the ``DataWalker``) instead.
+"""
+
+from itertools import islice
+from re import Pattern, compile
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+from jsonschema.exceptions import ValidationError
+from jsonschema.protocols import Validator
+
+from .schema_tools import SchemaWalker
+
+__all__ = [
+    "ValidationPlan",
+    "UnsupportedSchemaError",
+]
+
+# keywords resolved by the schema walker or evaluated by the plan itself
+_PLAN_KEYWORDS = frozenset(
+    (
+        "$ref",
+        "allOf",
+        "properties",
+        "patternProperties",
+        "additionalProperties",
+        "items",
+        "additionalItems",
+    )
+)
+
+# keywords evaluated by jsonschema that validate subschemas
+_APPLICATOR_KEYWORDS = frozenset(
+    ("anyOf", "oneOf", "not", "if", "contains", "dependencies", "propertyNames")
+)
+
+# the subschemas of "if" are siblings of the keyword (evaluated by "if")
+_CONDITIONAL_KEYWORDS = ("if", "then", "else")
+
+SchemaEntry = Tuple[str, Union[Dict[str, Any], bool]]
+Path = Tuple[Union[str, int], ...]
+
+
+class UnsupportedSchemaError(Exception):
+    """The schema cannot be evaluated exactly by a validation plan."""
+
+
+def _contains_ref(schema: Any) -> bool:
+    if isinstance(schema, dict):
+        return "$ref" in schema or any(_contains_ref(s) for s in schema.values())
+    if isinstance(schema, list):
+        return any(_contains_ref(s) for s in schema)
+    return False
+
+
+class _SchemaGroup:
+    """The resolved schemas that apply to a data node at one schema location."""
+
+    __slots__ = (
+        "plan",
+        "false_schemas",
+        "keywords",
+        "properties",
+        "pattern_properties",
+        "additional_properties",
+        "items",
+        "tuple_items",
+        "additional_items",
+        "tuple_length",
+        "_property_groups",
+        "_item_groups",
+    )
+
+    def __init__(self, plan: "ValidationPlan", entries: Sequence[SchemaEntry]) -> None:
+        self.plan = plan
+        self.false_schemas = [s for _, s in entries if s is False]
+        self.keywords: List[Tuple[str, Callable, Any, Dict[str, Any]]] = []
+        # (anchor, properties) of every resolved schema
+        self.properties: List[Tuple[str, Dict[str, Any]]] = []
+        self.pattern_properties: List[Tuple[str, List[Tuple[Pattern, Any]]]] = []
+        # (anchor, properties, patterns, additionalProperties) of every resolved schema
+        self.additional_properties: List[
+            Tuple[str, Dict[str, Any], List[Pattern], Dict[str, Any]]
+        ] = []
+        self.items: List[SchemaEntry] = []
+        self.tuple_items: List[Tuple[str, List[Any]]] = []
+        self.additional_items: List[Tuple[str, int, Dict[str, Any]]] = []
+        self._property_groups: Dict[str, "_SchemaGroup"] = {}
+        self._item_groups: Dict[int, "_SchemaGroup"] = {}
+
+        schemas = [(a, s) for a, s in entries if isinstance(s, dict) and s]
+        if not schemas:
+            self.tuple_length = 0
+            return
+        try:
+            walker = SchemaWalker(schemas, plan.url_resolver, cache=plan.schema_cache)
+        except Exception as err:
+            raise UnsupportedSchemaError(err) from err
+        if not walker.is_resolved:
+            raise UnsupportedSchemaError(walker.resolve_error)
+
+        for anchor, schema in walker.resolved_schema:
+            self._compile_schema(anchor, schema)
+        self.tuple_length = max((len(items) for _, items in self.tuple_items), default=0)
+
+    def _compile_schema(self, anchor: str, schema: Dict[str, Any]):
+        if "$id" in schema and not str(schema["$id"]).startswith("#"):
+            if schema is not self.plan.schema_cache.get(anchor):
+                # jsonschema would resolve refs relative to the new base uri
+                raise UnsupportedSchemaError(
+                    f"Unsupported embedded schema id '{schema['$id']}'"
+                )
+        self._compile_keywords(schema)
+        self._compile_properties(anchor, schema)
+        self._compile_items(anchor, schema)
+
+    def _compile_keywords(self, schema: Dict[str, Any]):
+        """Add the keywords evaluated by jsonschema."""
+        for keyword, value in schema.items():
+            if keyword in _PLAN_KEYWORDS:
+                continue
+            function = self.plan.validator.VALIDATORS.get(keyword)
+            if function is None:
+                continue
+            if keyword == "if":
+                conditional_schemas = [schema.get(k) for k in _CONDITIONAL_KEYWORDS]
+                if _contains_ref(conditional_schemas):
+                    raise UnsupportedSchemaError(
+                        "Unsupported $ref inside of 'if', 'then' or 'else'"
+                    )
+            elif keyword in _APPLICATOR_KEYWORDS and _contains_ref(value):
+                raise UnsupportedSchemaError(f"Unsupported $ref inside of '{keyword}'")
+            self.keywords.append((keyword, function, value, schema))
+
+    def _compile_properties(self, anchor: str, schema: Dict[str, Any]):
+        """Add the schemas of the properties of objects."""
+        if "properties" in schema:
+            self.properties.append((anchor, schema["properties"]))
+        patterns = [
+            (compile(pattern), subschema)
+            for pattern, subschema in schema.get("patternProperties", {}).items()
+        ]
+        if patterns:
+            self.pattern_properties.append((anchor, patterns))
+        additional_properties = schema.get("additionalProperties")
+        if isinstance(additional_properties, dict):
+            self.additional_properties.append(
+                (
+                    anchor,
+                    schema.get("properties", {}),
+                    [pattern for pattern, _ in patterns],
+                    additional_properties,
+                )
+            )
+        elif additional_properties is not None:
+            self._add_keyword("additionalProperties", schema)
+
+    def _compile_items(self, anchor: str, schema: Dict[str, Any]):
+        """Add the schemas of the items of arrays."""
+        items = schema.get("items")
+        if isinstance(items, list):
+            self.tuple_items.append((anchor, items))
+            additional_items = schema.get("additionalItems")
+            if isinstance(additional_items, dict):
+                self.additional_items.append((anchor, len(items), additional_items))
+            elif additional_items is not None:
+                self._add_keyword("additionalItems", schema)
+        elif items is not None:
+            self.items.append((anchor, items))
+            if isinstance(items, bool) and "additionalItems" in schema:
+                self._add_keyword("additionalItems", schema)
+
+    def _add_keyword(self, keyword: str, schema: Dict[str, Any]):
+        function = self.plan.validator.VALIDATORS[keyword]
+        self.keywords.append((keyword, function, schema[keyword], schema))
+
+    def property_group(self, prop: str) -> "_SchemaGroup":
+        group = self._property_groups.get(prop)
+        if group is not None:
+            return group
+        entries: List[SchemaEntry] = []
+        for anchor, properties in self.properties:
+            if prop in properties:
+                entries.append((anchor, properties[prop]))
+        for anchor, patterns in self.pattern_properties:
+            for pattern, subschema in patterns:
+                if pattern.search(prop):
+                    entries.append((anchor, subschema))
+        for anchor, properties, patterns, additional in self.additional_properties:
+            if prop in properties or any(pattern.search(prop) for pattern in patterns):
+                continue
+            entries.append((anchor, additional))
+        group = self.plan.get_group(entries)
+        self._property_groups[prop] = group
+        return group
+
+    def item_group(self, index: int) -> "_SchemaGroup":
+        # all items after the longest tuple schema share the same schemas
+        position = min(index, self.tuple_length)
+        group = self._item_groups.get(position)
+        if group is not None:
+            return group
+        entries: List[SchemaEntry] = list(self.items)
+        for anchor, items in self.tuple_items:
+            if position < len(items):
+                entries.append((anchor, items[position]))
+        for anchor, tuple_length, additional_items in self.additional_items:
+            if position >= tuple_length:
+                entries.append((anchor, additional_items))
+        group = self.plan.get_group(entries)
+        self._item_groups[position] = group
+        return group
+
+    def iter_errors(self, validator: Validator, instance: Any, path: Path):
+        for false_schema in self.false_schemas:
+            error = ValidationError(
+                f"False schema does not allow {instance!r}",
+                validator=None,
+                validator_value=None,
+                instance=instance,
+                schema=false_schema,
+            )
+            error.path.extend(path)
+            yield error
+        for keyword, function, value, schema in self.keywords:
+            for error in function(validator, value, instance, schema) or ():
+                error._set(
+                    validator=keyword,
+                    validator_value=value,
+                    instance=instance,
+                    schema=schema,
+                    type_checker=validator.TYPE_CHECKER,
+                )
+                if keyword != "if":
+                    error.schema_path.appendleft(keyword)
+                error.path.extendleft(reversed(path))
+                yield error
+
+
+class _MatchNode:
+    """A schema walker of the old data walker semantics with memoized children."""
+
+    __slots__ = ("walker", "is_match", "main_type", "tuple_length", "_children")
+
+    def __init__(
+        self, walker: SchemaWalker, match: Callable[[SchemaWalker], bool]
+    ) -> None:
+        if not walker.is_resolved:
+            raise UnsupportedSchemaError(walker.resolve_error)
+        self.walker = walker
+        self.is_match = match(walker)
+        self.main_type = walker.main_type_resolved
+        self.tuple_length = walker.tuple_length_resolved
+        self._children: Dict[Hashable, "_MatchNode"] = {}
+
+    def child(
+        self, key: Union[str, int], match: Callable[[SchemaWalker], bool]
+    ) -> "_MatchNode":
+        if isinstance(key, int):
+            # all items after the longest tuple schema share the same schemas
+            key = min(key, self.tuple_length)
+        child = self._children.get(key)
+        if child is None:
+            try:
+                child = _MatchNode(self.walker[key], match)
+            except UnsupportedSchemaError:
+                raise
+            except Exception as err:
+                raise UnsupportedSchemaError(err) from err
+            self._children[key] = child
+        return child
+
+
+class ValidationPlan:
+    """Validate data and collect the data nodes with schemas matching a predicate.
+
+    The compiled schema locations are reused for all validated data, so the
+    plan should be cached together with the validator.
+    """
+
+    def __init__(
+        self,
+        validator: Validator,
+        schema: Dict[str, Any],
+        url_resolver: Callable[[str], Optional[Dict[str, Any]]],
+        match: Callable[[SchemaWalker], bool],
+    ) -> None:
+        self.validator = validator
+        self.url_resolver = url_resolver
+        self.match = match
+        self.schema_cache: Dict[str, Dict[str, Any]] = {}
+        # set if a schema location reached by the data is not supported
+        self.unsupported: Optional[UnsupportedSchemaError] = None
+        self._groups: Dict[Tuple[Tuple[str, int], ...], _SchemaGroup] = {}
+        try:
+            root_walker = SchemaWalker(schema, url_resolver, cache=self.schema_cache)
+        except Exception as err:
+            raise UnsupportedSchemaError(err) from err
+        self.root = self.get_group([("ROOT", schema)])
+        self.root_match = _MatchNode(root_walker, match)
+
+    def get_group(self, entries: Sequence[SchemaEntry]) -> _SchemaGroup:
+        key = tuple((anchor, id(schema)) for anchor, schema in entries)
+        group = self._groups.get(key)
+        if group is None:
+            group = _SchemaGroup(self, entries)
+            self._groups[key] = group
+        return group
+
+    def validate(
+        self, data: Any, max_errors: Optional[int] = None
+    ) -> Tuple[List[ValidationError], List[Tuple[Any, SchemaWalker]]]:
+        """Validate the data in a single pass.
+
+        Args:
+            data (Any): the data to validate
+            max_errors (Optional[int], optional): stop validating after this many
+                errors (the collected matches are incomplete then). Defaults to None.
+
+        Returns:
+            the validation errors and all (data, schema walker) pairs that
+            matched the predicate of the plan (depth first with the members of a
+            node in reverse order, the same order as the DataWalker)
+        """
+        return self._validate([(data, self.root, self.root_match, ())], max_errors)
+
+    def validate_member(
+        self,
+        key: Union[str, int],
+        value: Any,
+        container_type: str,
+        max_errors: Optional[int] = None,
+    ) -> Tuple[List[ValidationError], List[Tuple[Any, SchemaWalker]]]:
+        """Validate a single property (or item) of the data.
+
+        Used to validate the data while it is parsed. The keywords of the root
+        schema must be validated with ``validate_root`` once the data is complete.
+
+        Args:
+            key (Union[str, int]): the property name (or item index)
+            value (Any): the value of the property (or item)
+            container_type (str): the type of the data (``"object"`` or ``"array"``)
+            max_errors (Optional[int], optional): stop validating after this many errors
+        """
+        match_node: Optional[_MatchNode] = self.root_match
+        if match_node.main_type != container_type:
+            match_node = None
+        try:
+            if container_type == "object":
+                group = self.root.property_group(cast(str, key))
+            else:
+                group = self.root.item_group(cast(int, key))
+            child_match = (
+                match_node.child(key, self.match) if match_node is not None else None
+            )
+        except UnsupportedSchemaError as err:
+            self.unsupported = err
+            raise
+        return self._validate([(value, group, child_match, (key,))], max_errors)
+
+    def validate_root(
+        self, data: Any, max_errors: Optional[int] = None
+    ) -> Tuple[List[ValidationError], List[Tuple[Any, SchemaWalker]]]:
+        """Validate the data against the root schema without validating its members."""
+        errors = list(islice(self.root.iter_errors(self.validator, data, ()), max_errors))
+        matches = []
+        if self.root_match.is_match:
+            matches.append((data, self.root_match.walker))
+        return errors, matches
+
+    def collect_matches(self, data: Any) -> List[Tuple[Any, SchemaWalker]]:
+        """Collect the data nodes matching the predicate without validating the data.
+
+        Only use this for data that is known to be valid. The matches are
+        collected in the same order as in ``validate``.
+        """
+        validator = self.validator
+        match = self.match
+        matches: List[Tuple[Any, SchemaWalker]] = []
+        stack: List[Tuple[Any, _MatchNode]] = [(data, self.root_match)]
+        try:
+            while stack:
+                instance, match_node = stack.pop()
+                if match_node.is_match:
+                    matches.append((instance, match_node.walker))
+                if match_node.main_type == "object" and validator.is_type(
+                    instance, "object"
+                ):
+                    stack.extend(
+                        (value, match_node.child(prop, match))
+                        for prop, value in instance.items()
+                    )
+                elif match_node.main_type == "array" and validator.is_type(
+                    instance, "array"
+                ):
+                    stack.extend(
+                        (value, match_node.child(index, match))
+                        for index, value in enumerate(instance)
+                    )
+        except UnsupportedSchemaError as err:
+            self.unsupported = err
+            raise
+        return matches
+
+    def _validate(
+        self,
+        stack: List[Tuple[Any, _SchemaGroup, Optional[_MatchNode], Path]],
+        max_errors: Optional[int],
+    ) -> Tuple[List[ValidationError], List[Tuple[Any, SchemaWalker]]]:
+        try:
+            return self._walk(stack, max_errors)
+        except UnsupportedSchemaError as err:
+            self.unsupported = err
+            raise
+
+    def _walk(
+        self,
+        stack: List[Tuple[Any, _SchemaGroup, Optional[_MatchNode], Path]],
+        max_errors: Optional[int],
+    ) -> Tuple[List[ValidationError], List[Tuple[Any, SchemaWalker]]]:
+        validator = self.validator
+        errors: List[ValidationError] = []
+        matches: List[Tuple[Any, SchemaWalker]] = []
+
+        while stack:
+            instance, group, match_node, path = stack.pop()
+            for error in group.iter_errors(validator, instance, path):
+                errors.append(error)
+                if max_errors is not None and len(errors) >= max_errors:
+                    return errors, matches
+
+            if match_node is not None:
+                if match_node.is_match:
+                    matches.append((instance, match_node.walker))
+                if instance is None:
+                    match_node = None
+
+            self._push_members(stack, instance, group, match_node, path)
+        return errors, matches
+
+    def _push_members(
+        self,
+        stack: List[Tuple[Any, _SchemaGroup, Optional[_MatchNode], Path]],
+        instance: Any,
+        group: _SchemaGroup,
+        match_node: Optional[_MatchNode],
+        path: Path,
+    ):
+        """Push the properties (or items) of the instance onto the stack.
+
+        The members are pushed in data order and therefore visited in reverse.
+        """
+        validator = self.validator
+        match = self.match
+        if validator.is_type(instance, "object"):
+            if match_node is not None and match_node.main_type != "object":
+                match_node = None
+            for prop, value in instance.items():
+                child_match = (
+                    match_node.child(prop, match) if match_node is not None else None
+                )
+                stack.append(
+                    (value, group.property_group(prop), child_match, (*path, prop))
+                )
+        elif validator.is_type(instance, "array"):
+            if match_node is not None and match_node.main_type != "array":
+                match_node = None
+            for index, value in enumerate(instance):
+                child_match = (
+                    match_node.child(index, match) if match_node is not None else None
+                )
+                stack.append(
+                    (value, group.item_group(index), child_match, (*path, index))
+                )
@@ -0,0 +1,190 @@
+"""Module containing an incremental json reader for large request bodies.
+
+The reader decodes a json document from a binary stream chunk by chunk. The
+container at the streamed path (e.g. the ``data`` attribute of an object) is
+decoded member by member and every member is passed to a callback as soon as
+it is complete. Raising an exception in the callback stops reading the
+stream, so invalid documents can be rejected before the whole body is read.
+
+Only the decoded document and the current chunk are kept in memory (not the
+raw body and its decoded text in addition to the document).
+"""
+
+from codecs import getincrementaldecoder
+from json import JSONDecodeError, JSONDecoder
+from re import compile
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple, Union
+
+__all__ = ["JsonStreamReader", "JSONDecodeError"]
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# values (and errors) further away from the end of the buffer cannot be
+# affected by the next chunk (except for unterminated strings)
+_MAX_INCOMPLETE_TOKEN_LENGTH = 16
+
+_WHITESPACE = " \t\n\r"
+
+_ARRAY_DELIMITER = compile(r"[ \t\n\r]*([,\]])[ \t\n\r]*")
+
+MemberCallback = Callable[[Tuple[str, ...], Union[str, int], Any, str], None]
+
+
+class JsonStreamReader:
+    """Read a json document from a binary stream in chunks."""
+
+    def __init__(
+        self,
+        stream: IO[bytes],
+        streamed_path: Tuple[str, ...] = (),
+        on_member: Optional[MemberCallback] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """Create a new reader.
+
+        Args:
+            stream (IO[bytes]): the stream to read the (utf-8 encoded) document from
+            streamed_path (Tuple[str, ...], optional): the path of object keys to the
+                container whose members are streamed. Defaults to () (the document).
+            on_member (Optional[MemberCallback], optional): called with the path of the
+                streamed container, the key (or index), the value of every member and
+                the container type (``"object"`` or ``"array"``)
+            chunk_size (int, optional): the number of bytes to read at once
+        """
+        self.stream = stream
+        self.streamed_path = streamed_path
+        self.on_member = on_member
+        self.chunk_size = chunk_size
+        self._decoder = JSONDecoder()
+        self._text_decoder = getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        # the number of bytes to read if a value does not fit into the buffer
+        self._read_size = chunk_size
+
+    def read(self) -> Any:
+        """Read and decode the complete document."""
+        value = self._read_value(())
+        self._skip_whitespace()
+        if self._pos < len(self._buffer):
+            raise JSONDecodeError("Extra data", self._buffer, self._pos)
+        return value
+
+    def _fill(self) -> bool:
+        """Read the next chunk into the buffer. Returns False at the end of the stream."""
+        if self._eof:
+            return False
+        chunk = self.stream.read(self._read_size)
+        if not chunk:
+            self._eof = True
+            self._buffer += self._text_decoder.decode(b"", final=True)
+            return False
+        if self._pos:
+            # drop the already decoded part of the buffer
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        self._buffer += self._text_decoder.decode(chunk)
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            buffer, pos = self._buffer, self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer) or not self._fill():
+                return
+
+    def _peek(self) -> str:
+        self._skip_whitespace()
+        if self._pos >= len(self._buffer):
+            raise JSONDecodeError("Expecting value", self._buffer, self._pos)
+        return self._buffer[self._pos]
+
+    def _expect(self, char: str, message: str):
+        if self._peek() != char:
+            raise JSONDecodeError(message, self._buffer, self._pos)
+        self._pos += 1
+
+    def _decode(self) -> Any:
+        """Decode the complete value at the current position."""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except JSONDecodeError as err:
+                is_incomplete = err.msg.startswith("Unterminated string") or (
+                    len(self._buffer) - err.pos <= _MAX_INCOMPLETE_TOKEN_LENGTH
+                )
+                if not is_incomplete or not self._fill():
+                    raise
+                self._read_size *= 2  # large value, read bigger chunks
+                continue
+            if len(self._buffer) - end < _MAX_INCOMPLETE_TOKEN_LENGTH and self._fill():
+                # numbers may continue in the next chunk (e.g. "1.5" of "1.5e3")
+                self._read_size *= 2
+                continue
+            self._pos = end
+            self._read_size = self.chunk_size
+            return value
+
+    def _read_value(self, path: Tuple[str, ...]) -> Any:
+        depth = len(path)
+        if depth > len(self.streamed_path) or path != self.streamed_path[:depth]:
+            return self._decode()
+        char = self._peek()
+        if char == "{":
+            return self._read_object(path)
+        if char == "[" and depth == len(self.streamed_path):
+            return self._read_array(path)
+        return self._decode()
+
+    def _read_object(self, path: Tuple[str, ...]) -> Dict[str, Any]:
+        is_streamed = path == self.streamed_path
+        result: Dict[str, Any] = {}
+        self._pos += 1  # skip "{"
+        if self._peek() == "}":
+            self._pos += 1
+            return result
+        while True:
+            if self._peek() != '"':
+                raise JSONDecodeError(
+                    "Expecting property name enclosed in double quotes",
+                    self._buffer,
+                    self._pos,
+                )
+            key = self._decode()
+            self._expect(":", "Expecting ':' delimiter")
+            value = self._read_value((*path, key))
+            result[key] = value
+            if is_streamed and self.on_member is not None:
+                self.on_member(path, key, value, "object")
+            if self._peek() == "}":
+                self._pos += 1
+                return result
+            self._expect(",", "Expecting ',' delimiter")
+
+    def _read_array(self, path: Tuple[str, ...]) -> List[Any]:
+        result: List[Any] = []
+        self._pos += 1  # skip "["
+        if self._peek() == "]":
+            self._pos += 1
+            return result
+        on_member = self.on_member
+        while True:
+            value = self._decode()
+            result.append(value)
+            if on_member is not None:
+                on_member(path, len(result) - 1, value, "array")
+            # fast path for delimiters that are completely in the buffer
+            match = _ARRAY_DELIMITER.match(self._buffer, self._pos)
+            if match is not None and match.end() < len(self._buffer):
+                self._pos = match.end()
+                if match.group(1) == "]":
+                    return result
+                continue
+            if self._peek() == "]":
+                self._pos += 1
+                return result
+            self._expect(",", "Expecting ',' delimiter")
@@ -15,6 +15,7 @@ from typing import (
     cast,
 )
 
+from flask import current_app
 from flask_sqlalchemy.model import Model
 from sqlalchemy.sql.schema import Column
 
@@ -26,7 +27,13 @@ from muse_for_anything.api.v1_api.request_helpers import (
     skip_slow_policy_checks_for_links_in_embedded_responses,
 )
 from muse_for_anything.db.models.model_helpers import IdMixin
-from muse_for_anything.db.pagination import PaginationInfo, get_page_info
+from muse_for_anything.db.pagination import (
+    KEYSET_EXACT_ROW_LIMIT,
+    PaginationInfo,
+    get_keyset_page_info,
+    get_page_info,
+)
+from muse_for_anything.oso_helpers import FLASK_OSO
 
 
 @dataclass
@@ -126,14 +133,25 @@ def default_get_page_info(
     filter_criteria: Sequence[Any],
     pagination_options: PaginationOptions,
     sort_columns: Optional[Sequence[Column]] = None,
+    use_keyset: Optional[bool] = None,
+    authorize_action: Optional[str] = "GET",
 ) -> PaginationInfo:
     """Get the pagination info from a model that extends IdMixin.
 
+    Uses keyset pagination if ``use_keyset`` is True or if it is None and the
+    ``PAGINATION_USE_KEYSET`` config is set.
+
+    If the authorization rules for ``authorize_action`` can be expressed in SQL
+    the rows the current user may not access are filtered out in the database,
+    so counts and page boundaries only include visible rows.
+
     Args:
         model (Type[T]): the db model; must also extend IdMixin!
         filter_criteria (Sequence[Any]): the filter criteria
         pagination_options (PaginationOptions): the pagination options object containing the page size, sort string and cursor
         sort_columns (Optional[Sequence[Column]], optional): a list of columns of the model that can be used to sort the items. Defaults to None.
+        use_keyset (Optional[bool], optional): force (or disable) keyset pagination. Defaults to None.
+        authorize_action (Optional[str], optional): the action the rows must be authorized for, None disables the authorization filter. Defaults to "GET".
 
     Raises:
         TypeError: if model is not an IdMixin
@@ -166,6 +184,30 @@ def default_get_page_info(
     if not sort_columns:
         raise ValueError("Could not identify sort columns!", model, pagination_options)
 
+    if authorize_action is not None:
+        authorization_criteria = FLASK_OSO.get_filter_criteria(
+            model, action=authorize_action
+        )
+        if authorization_criteria:
+            filter_criteria = (*filter_criteria, *authorization_criteria)
+
+    if use_keyset is None:
+        use_keyset = current_app.config.get("PAGINATION_USE_KEYSET", False)
+
+    if use_keyset:
+        return get_keyset_page_info(
+            model,
+            id_column,
+            sort_columns,
+            pagination_options.cursor,
+            pagination_options.sort,
+            pagination_options.item_count,
+            filter_criteria=filter_criteria,
+            exact_row_limit=current_app.config.get(
+                "PAGINATION_EXACT_ROW_LIMIT", KEYSET_EXACT_ROW_LIMIT
+            ),
+        )
+
     return get_page_info(
         model,
         id_column,
@@ -196,8 +238,11 @@ def dump_embedded_page_items(
     embedded_items: List[ApiResponse] = []
     links: List[ApiLink] = []
 
+    # authorize all items at once, the generators reuse the cached decisions
+    allowed_items = FLASK_OSO.filter_allowed(items, action="GET")
+
     with skip_slow_policy_checks_for_links_in_embedded_responses():
-        for item in items:
+        for item in allowed_items:
             response = ApiResponseGenerator.get_api_response(
                 item, link_to_relations=link_to_relations
             )
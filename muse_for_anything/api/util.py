@@ -1,9 +1,10 @@
 """Module containing utilities for flask smorest APIs."""
 
 from typing import Any, Dict
-from flask import url_for
+from flask import Request, url_for
 from flask_smorest import Blueprint
 from marshmallow_jsonschema import JSONSchema
+from webargs.flaskparser import FlaskParser
 
 from .jwt import JWTMixin
 
@@ -14,6 +15,9 @@ JSON_SCHEMA_MIMETYPE = "application/schema+json"
 
 JSON_SCHEMA = JSONSchema()
 
+# request environ key of a json body that was already parsed while streaming it
+STREAMED_JSON_ENVIRON_KEY = "muse_for_anything.streamed_json"
+
 
 def template_url_for(endpoint: str, key_args: Dict[str, str], **values) -> str:
     for key, key_variable in key_args.items():
@@ -24,12 +28,23 @@ def template_url_for(endpoint: str, key_args: Dict[str, str], **values) -> str:
     return url
 
 
+class StreamedJsonFlaskParser(FlaskParser):
+    """Flask parser that reuses a json body that was already parsed while streaming it."""
+
+    def _raw_load_json(self, req: Request) -> Any:
+        if STREAMED_JSON_ENVIRON_KEY in req.environ:
+            return req.environ[STREAMED_JSON_ENVIRON_KEY]
+        return super()._raw_load_json(req)
+
+
 class SecurityBlueprint(Blueprint, JWTMixin):
     """Blueprint that is aware of jwt tokens and how to document them.
 
     Use this Blueprint if you want to document security requirements for your api.
     """
 
+    ARGUMENTS_PARSER = StreamedJsonFlaskParser()
+
     def __init__(self, *args: Any, **kwargs):
         super().__init__(*args, **kwargs)
         self._prepare_doc_cbks.append(self._prepare_security_doc)
@@ -8,7 +8,11 @@ from . import user_roles  # noqa
 from . import namespace  # noqa
 from . import ontology_types  # noqa
 from . import ontology_type_versions  # noqa
+from . import ontology_type_revalidations  # noqa
 from . import ontology_objects  # noqa
 from . import ontology_object_versions  # noqa
 from . import taxonomy  # noqa
 from . import taxonomy_items  # noqa
+from . import taxonomy_tree  # noqa
+from . import taxonomy_import  # noqa
+from . import taxonomy_subtrees  # noqa
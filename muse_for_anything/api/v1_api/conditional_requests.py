@@ -0,0 +1,192 @@
+"""Module containing helpers for conditional requests of mutable resources.
+
+The validator of a resource is derived from the change timestamps of the
+resource (and of the resources its response depends on), its current version
+and the permission fingerprint of the current user. It is cheap to compute
+from the already loaded rows, so GET endpoints can answer a matching
+``If-None-Match`` (or ``If-Modified-Since``) header with 304 before the links
+and embedded resources are generated.
+
+PUT and DELETE endpoints accept the same validator in ``If-Match`` to guard
+against lost updates (412 if the resource was changed in the meantime).
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from hashlib import sha256
+from http import HTTPStatus
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import Response, request
+from flask.globals import g
+from flask_babel import gettext
+from flask_smorest import abort
+from sqlalchemy.sql.expression import func, or_, select, true
+from werkzeug.http import http_date, quote_etag
+
+from .response_cache import permission_fingerprint
+from ...db.db import DB
+from ...db.models.taxonomies import TaxonomyItem, TaxonomyItemRelation
+
+
+@dataclass(frozen=True)
+class ResourceValidator:
+    """The (strong) ETag and last modified date of a resource response."""
+
+    etag: str
+    last_modified: Optional[datetime]
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """The validator headers for a full response."""
+        headers = {
+            "ETag": quote_etag(self.etag),
+            "Cache-Control": "private, no-cache",
+            "Vary": "Authorization",
+        }
+        if self.last_modified is not None:
+            headers["Last-Modified"] = http_date(self.last_modified)
+        return headers
+
+
+def _as_utc(timestamp: Optional[datetime]) -> Optional[datetime]:
+    if timestamp is None:
+        return None
+    if timestamp.tzinfo is None:  # sqlite does not store timezones
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def _model_state(model: Any) -> Tuple[str, List[datetime]]:
+    updated_on = _as_utc(getattr(model, "updated_on", None))
+    deleted_on = _as_utc(getattr(model, "deleted_on", None))
+    state = ":".join(
+        (
+            getattr(model, "__tablename__", type(model).__name__),
+            str(model.id),
+            updated_on.isoformat() if updated_on else "",
+            deleted_on.isoformat() if deleted_on else "",
+            str(getattr(model, "current_version_id", "")),
+        )
+    )
+    return state, [t for t in (updated_on, deleted_on) if t is not None]
+
+
+def get_resource_validator(
+    resource: Any, *dependencies: Any, extra_state: Iterable[Any] = ()
+) -> ResourceValidator:
+    """Compute the validator of the response of a resource.
+
+    Args:
+        resource (Any): the database model of the requested resource
+        *dependencies (Any): other database models the response depends on
+            (e.g. the namespace the resource is in)
+        extra_state (Iterable[Any], optional): additional state the response
+            depends on, datetime values are also used for the last modified date.
+    """
+    parts: List[str] = []
+    timestamps: List[datetime] = []
+    for model in (resource, *dependencies):
+        state, model_timestamps = _model_state(model)
+        parts.append(state)
+        timestamps.extend(model_timestamps)
+    for value in extra_state:
+        if isinstance(value, datetime):
+            value = _as_utc(value)
+            timestamps.append(value)
+        parts.append(str(value))
+    parts.append(str(permission_fingerprint(g.get("current_user"))))
+    return ResourceValidator(
+        etag=sha256("|".join(parts).encode()).hexdigest()[:32],
+        last_modified=max(timestamps) if timestamps else None,
+    )
+
+
+def get_taxonomy_content_state(taxonomy_id: int) -> Tuple[Any, ...]:
+    """Get the state of all items and relations of a taxonomy with a single query.
+
+    Changes to items (and adding, deleting or restoring relations) do not
+    change the updated_on timestamp of the taxonomy itself.
+    """
+    items = select(
+        func.count(TaxonomyItem.id),
+        func.count(TaxonomyItem.deleted_on),
+        func.max(TaxonomyItem.updated_on),
+    ).where(TaxonomyItem.taxonomy_id == taxonomy_id)
+    relations = (
+        select(
+            func.count(TaxonomyItemRelation.id),
+            func.count(TaxonomyItemRelation.deleted_on),
+            func.max(TaxonomyItemRelation.created_on),
+            func.max(TaxonomyItemRelation.deleted_on),
+        )
+        .join(
+            TaxonomyItem,
+            TaxonomyItem.id == TaxonomyItemRelation.taxonomy_item_source_id,
+        )
+        .where(TaxonomyItem.taxonomy_id == taxonomy_id)
+    )
+    items_state, relations_state = items.subquery(), relations.subquery()
+    # both subqueries return exactly one row
+    query = select(items_state, relations_state).select_from(
+        items_state.join(relations_state, true())
+    )
+    return tuple(DB.session.execute(query).one())
+
+
+def get_taxonomy_item_relations_state(taxonomy_item_id: int) -> Tuple[Any, ...]:
+    """Get the state of the direct relations of a taxonomy item (and the related items).
+
+    The response of a taxonomy item embeds its parents and children.
+    """
+    relations = (
+        select(
+            func.count(TaxonomyItemRelation.id),
+            func.count(TaxonomyItemRelation.deleted_on),
+            func.max(TaxonomyItemRelation.created_on),
+            func.max(TaxonomyItemRelation.deleted_on),
+            func.max(TaxonomyItem.updated_on),
+        )
+        .join(
+            TaxonomyItem,
+            or_(
+                TaxonomyItem.id == TaxonomyItemRelation.taxonomy_item_source_id,
+                TaxonomyItem.id == TaxonomyItemRelation.taxonomy_item_target_id,
+            ),
+        )
+        .where(
+            or_(
+                TaxonomyItemRelation.taxonomy_item_source_id == taxonomy_item_id,
+                TaxonomyItemRelation.taxonomy_item_target_id == taxonomy_item_id,
+            )
+        )
+    )
+    return tuple(DB.session.execute(relations).one())
+
+
+def check_not_modified(validator: ResourceValidator) -> Optional[Response]:
+    """Get a 304 response if the client already has the current representation."""
+    if request.if_none_match:
+        is_current = request.if_none_match.contains_weak(validator.etag)
+    elif request.if_modified_since and validator.last_modified is not None:
+        # http dates have no sub second precision
+        last_modified = validator.last_modified.replace(microsecond=0)
+        is_current = last_modified <= request.if_modified_since
+    else:
+        return None
+    if not is_current:
+        return None
+    response = Response(status=HTTPStatus.NOT_MODIFIED)
+    response.headers.update(validator.headers)
+    return response
+
+
+def check_if_match(validator: ResourceValidator):
+    """Abort with 412 if the request is conditional and the resource has changed."""
+    if request.if_match and not request.if_match.contains(validator.etag):
+        abort(
+            HTTPStatus.PRECONDITION_FAILED,
+            message=gettext(
+                "The resource was changed by another request. Reload the resource and try again."
+            ),
+        )
@@ -61,11 +61,15 @@ NAMESPACE_REL_TYPE = "ont-namespace"
 
 TYPE_REL_TYPE = "ont-type"
 TYPE_VERSION_REL_TYPE = "ont-type-version"
+TYPE_REVALIDATION_REL_TYPE = "ont-type-revalidation"
 
 OBJECT_REL_TYPE = "ont-object"
 OBJECT_VERSION_REL_TYPE = "ont-object-version"
 
 TAXONOMY_REL_TYPE = "ont-taxonomy"
+TAXONOMY_TREE_REL_TYPE = "ont-taxonomy-tree"
+TAXONOMY_IMPORT_REL_TYPE = "ont-taxonomy-import"
+TAXONOMY_SUBTREE_REL_TYPE = "ont-taxonomy-subtree"
 
 TAXONOMY_ITEM_REL_TYPE = "ont-taxonomy-item"
 TAXONOMY_ITEM_VERSION_REL_TYPE = "ont-taxonomy-item-version"
@@ -2,8 +2,6 @@
 
 from typing import Dict, Iterable, Optional
 
-from flask import url_for
-
 from muse_for_anything.api.base_models import ApiLink, ApiResponse
 from muse_for_anything.api.v1_api.constants import (
     COLLECTION_REL,
@@ -39,6 +37,7 @@ from muse_for_anything.api.v1_api.constants import (
     UPDATE,
     UPDATE_REL,
 )
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
 from muse_for_anything.api.v1_api.models.ontology import (
     FileExportData,
     FileExportDataRaw,
@@ -84,11 +83,13 @@ class NamespacePageLinkGenerator(LinkGenerator, resource_type=Namespace, page=Tr
         if query_params is None:
             query_params = {ITEM_COUNT_QUERY_KEY: ITEM_COUNT_DEFAULT}
         return ApiLink(
-            href=url_for(NAMESPACE_PAGE_RESOURCE, **query_params, _external=True),
+            href=cached_url_for(NAMESPACE_PAGE_RESOURCE, **query_params, _external=True),
             rel=(COLLECTION_REL, PAGE_REL),
             resource_type=NAMESPACE_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource, query_params=query_params),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=NAMESPACE_SCHEMA, _external=True),
+            schema=cached_url_for(
+                SCHEMA_RESOURCE, schema_id=NAMESPACE_SCHEMA, _external=True
+            ),
         )
 
 
@@ -128,11 +129,15 @@ class NamespaceSelfLinkGenerator(LinkGenerator, resource_type=Namespace):
         ignore_deleted: bool = False,
     ) -> Optional[ApiLink]:
         return ApiLink(
-            href=url_for(NAMESPACE_RESOURCE, namespace=str(resource.id), _external=True),
+            href=cached_url_for(
+                NAMESPACE_RESOURCE, namespace=str(resource.id), _external=True
+            ),
             rel=tuple(),
             resource_type=NAMESPACE_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=NAMESPACE_SCHEMA, _external=True),
+            schema=cached_url_for(
+                SCHEMA_RESOURCE, schema_id=NAMESPACE_SCHEMA, _external=True
+            ),
             name=resource.name,
         )
 
@@ -309,13 +314,13 @@ class ExportNamespaceLinkGenerator(
             if resource.is_deleted:
                 return  # deleted
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 NAMESPACE_EXPORT_RESOURCE, namespace=str(resource.id), _external=True
             ),
             rel=(EXPORT_REL, NAMESPACE_REL_TYPE),
             resource_type=DATA_EXPORT_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource),
-            schema=url_for(
+            schema=cached_url_for(
                 SCHEMA_RESOURCE, schema_id=NAMESPACE_EXPORT_SCHEMA, _external=True
             ),
             name=resource.name,
@@ -386,7 +391,7 @@ class ExportNamespaceSelfLinkGenerator(LinkGenerator, resource_type=FileExportDa
             if resource.namespace.is_deleted:
                 return  # deleted
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 NAMESPACE_EXPORT_RESOURCE,
                 namespace=str(resource.namespace.id),
                 _external=True,
@@ -394,7 +399,7 @@ class ExportNamespaceSelfLinkGenerator(LinkGenerator, resource_type=FileExportDa
             rel=(EXPORT_REL, NAMESPACE_REL_TYPE),
             resource_type=DATA_EXPORT_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource),
-            schema=url_for(
+            schema=cached_url_for(
                 SCHEMA_RESOURCE, schema_id=NAMESPACE_EXPORT_SCHEMA, _external=True
             ),
             name=resource.name,
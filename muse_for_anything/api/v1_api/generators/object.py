@@ -2,8 +2,6 @@
 
 from typing import Any, Dict, Iterable, List, Optional, Union
 
-from flask import url_for
-
 from muse_for_anything.api.base_models import ApiLink, ApiResponse
 from muse_for_anything.api.v1_api.constants import (
     COLLECTION_REL,
@@ -35,6 +33,7 @@ from muse_for_anything.api.v1_api.constants import (
     UPDATE,
     UPDATE_REL,
 )
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
 from muse_for_anything.api.v1_api.models.ontology import ObjectData
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiObjectGenerator,
@@ -61,7 +60,7 @@ def object_type_schema_url(
         version = object_type.current_version_id
     else:
         version = object_type.id
-    return url_for(
+    return cached_url_for(
         TYPE_SCHEMA_RESOURCE,
         schema_id=str(version),
         _external=True,
@@ -109,7 +108,7 @@ class ObjectPageLinkGenerator(LinkGenerator, resource_type=OntologyObject, page=
             query_params[TYPE_ID_QUERY_KEY] = str(object_type.id)
 
         link = ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 OBJECT_PAGE_RESOURCE,
                 namespace=str(namespace.id),
                 **query_params,
@@ -221,7 +220,7 @@ class ObjectSelfLinkGenerator(LinkGenerator, resource_type=OntologyObject):
         ignore_deleted: bool = False,
     ) -> Optional[ApiLink]:
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 OBJECT_RESOURCE,
                 namespace=str(resource.namespace_id),
                 object_id=str(resource.id),
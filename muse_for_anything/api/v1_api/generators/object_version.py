@@ -2,8 +2,6 @@
 
 from typing import Any, Dict, Iterable, List, Optional, Union
 
-from flask import url_for
-
 from muse_for_anything.api.base_models import ApiLink, ApiResponse
 from muse_for_anything.api.v1_api.constants import (
     COLLECTION_REL,
@@ -24,6 +22,7 @@ from muse_for_anything.api.v1_api.constants import (
     UP_REL,
 )
 from muse_for_anything.api.v1_api.generators.object import object_type_schema_url
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
 from muse_for_anything.api.v1_api.models.ontology import ObjectData, ObjectTypeData
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiObjectGenerator,
@@ -79,7 +78,7 @@ class ObjectVersionsPageSelfLinkGenerator(
         if query_params is None:
             query_params = {ITEM_COUNT_QUERY_KEY: ITEM_COUNT_DEFAULT}
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 OBJECT_VERSION_PAGE_RESOURCE,
                 namespace=str(object_.namespace_id),
                 object_id=str(object_.id),
@@ -167,7 +166,7 @@ class ObjectVersionSelfLinkGenerator(LinkGenerator, resource_type=OntologyObject
         ignore_deleted: bool = False,
     ) -> Optional[ApiLink]:
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 OBJECT_VERSION_RESOURCE,
                 namespace=str(resource.ontology_object.namespace_id),
                 object_id=str(resource.object_id),
@@ -2,8 +2,6 @@
 
 from typing import Any, Dict, Iterable, List, Optional, Union
 
-from flask import url_for
-
 from muse_for_anything.api.base_models import ApiLink, ApiResponse
 from muse_for_anything.api.v1_api.constants import (
     COLLECTION_REL,
@@ -33,6 +31,7 @@ from muse_for_anything.api.v1_api.constants import (
     UPDATE,
     UPDATE_REL,
 )
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
 from muse_for_anything.api.v1_api.models.ontology import TaxonomyData
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiObjectGenerator,
@@ -77,7 +76,7 @@ class TaxonomyPageLinkGenerator(LinkGenerator, resource_type=Taxonomy, page=True
         if query_params is None:
             query_params = {ITEM_COUNT_QUERY_KEY: ITEM_COUNT_DEFAULT}
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TAXONOMY_PAGE_RESOURCE,
                 namespace=str(namespace.id),
                 **query_params,
@@ -86,7 +85,9 @@ class TaxonomyPageLinkGenerator(LinkGenerator, resource_type=Taxonomy, page=True
             rel=(COLLECTION_REL, PAGE_REL),
             resource_type=TAXONOMY_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource, query_params=query_params),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=TAXONOMY_SCHEMA, _external=True),
+            schema=cached_url_for(
+                SCHEMA_RESOURCE, schema_id=TAXONOMY_SCHEMA, _external=True
+            ),
         )
 
 
@@ -167,7 +168,7 @@ class TaxonomySelfLinkGenerator(LinkGenerator, resource_type=Taxonomy):
         ignore_deleted: bool = False,
     ) -> Optional[ApiLink]:
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TAXONOMY_RESOURCE,
                 namespace=str(resource.namespace_id),
                 taxonomy=str(resource.id),
@@ -176,7 +177,9 @@ class TaxonomySelfLinkGenerator(LinkGenerator, resource_type=Taxonomy):
             rel=tuple(),
             resource_type=TAXONOMY_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=TAXONOMY_SCHEMA, _external=True),
+            schema=cached_url_for(
+                SCHEMA_RESOURCE, schema_id=TAXONOMY_SCHEMA, _external=True
+            ),
             name=resource.name,
         )
 
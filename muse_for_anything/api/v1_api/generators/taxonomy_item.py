@@ -2,8 +2,6 @@
 
 from typing import Any, Dict, Iterable, List, Optional, Union
 
-from flask import url_for
-
 from muse_for_anything.api.base_models import ApiLink, ApiResponse
 from muse_for_anything.api.v1_api.constants import (
     COLLECTION_REL,
@@ -35,6 +33,7 @@ from muse_for_anything.api.v1_api.constants import (
     UP_REL,
     UPDATE,
 )
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
 from muse_for_anything.api.v1_api.models.ontology import (
     TaxonomyItemData,
 )
@@ -89,7 +88,7 @@ class TaxonomyItemsPageLinkGenerator(
         if query_params is None:
             query_params = {ITEM_COUNT_QUERY_KEY: ITEM_COUNT_DEFAULT}
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TAXONOMY_ITEM_PAGE_RESOURCE,
                 namespace=str(taxonomy.namespace_id),
                 taxonomy=str(taxonomy.id),
@@ -99,7 +98,7 @@ class TaxonomyItemsPageLinkGenerator(
             rel=(COLLECTION_REL, PAGE_REL),
             resource_type=TAXONOMY_ITEM_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource, query_params=query_params),
-            schema=url_for(
+            schema=cached_url_for(
                 SCHEMA_RESOURCE, schema_id=TAXONOMY_ITEM_SCHEMA, _external=True
             ),
         )
@@ -203,7 +202,7 @@ class TaxonomyItemSelfLinkGenerator(LinkGenerator, resource_type=TaxonomyItem):
         ignore_deleted: bool = False,
     ) -> Optional[ApiLink]:
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TAXONOMY_ITEM_RESOURCE,
                 namespace=str(resource.taxonomy.namespace_id),
                 taxonomy=str(resource.taxonomy_id),
@@ -213,7 +212,7 @@ class TaxonomyItemSelfLinkGenerator(LinkGenerator, resource_type=TaxonomyItem):
             rel=tuple(),
             resource_type=TAXONOMY_ITEM_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource),
-            schema=url_for(
+            schema=cached_url_for(
                 SCHEMA_RESOURCE, schema_id=TAXONOMY_ITEM_SCHEMA, _external=True
             ),
             name=resource.name,
@@ -2,8 +2,6 @@
 
 from typing import Dict, Iterable, Optional
 
-from flask import url_for
-
 from muse_for_anything.api.base_models import ApiLink, ApiResponse
 from muse_for_anything.api.v1_api.constants import (
     COLLECTION_REL,
@@ -29,6 +27,7 @@ from muse_for_anything.api.v1_api.constants import (
     TAXONOMY_REL_TYPE,
     UP_REL,
 )
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
 from muse_for_anything.api.v1_api.models.ontology import TaxonomyItemRelationData
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiObjectGenerator,
@@ -78,7 +77,7 @@ class TaxonomyItemRelationsPageLinkGenerator(
         if query_params is None:
             query_params = {ITEM_COUNT_QUERY_KEY: ITEM_COUNT_DEFAULT}
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TAXONOMY_ITEM_RELATION_PAGE_RESOURCE,
                 namespace=str(taxonomy_item.taxonomy.namespace_id),
                 taxonomy=str(taxonomy_item.taxonomy_id),
@@ -89,7 +88,7 @@ class TaxonomyItemRelationsPageLinkGenerator(
             rel=(COLLECTION_REL, PAGE_REL),
             resource_type=TAXONOMY_ITEM_RELATION_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource, query_params=query_params),
-            schema=url_for(
+            schema=cached_url_for(
                 SCHEMA_RESOURCE, schema_id=TAXONOMY_ITEM_RELATION_SCHEMA, _external=True
             ),
         )
@@ -127,7 +126,7 @@ class TaxonomyItemRelationsPageCreateLinkGenerator(
             resource, query_params=query_params, ignore_deleted=ignore_deleted
         )
         link.rel = (CREATE_REL, POST_REL)
-        link.schema = url_for(
+        link.schema = cached_url_for(
             SCHEMA_RESOURCE, schema_id=TAXONOMY_ITEM_RELATION_POST_SCHEMA, _external=True
         )
         return link
@@ -210,7 +209,7 @@ class TaxonomyItemRelationSelfLinkGenerator(
         ignore_deleted: bool = False,
     ) -> Optional[ApiLink]:
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TAXONOMY_ITEM_RELATION_RESOURCE,
                 namespace=str(resource.taxonomy_item_source.taxonomy.namespace_id),
                 taxonomy=str(resource.taxonomy_item_source.taxonomy_id),
@@ -221,7 +220,7 @@ class TaxonomyItemRelationSelfLinkGenerator(
             rel=tuple(),
             resource_type=TAXONOMY_ITEM_RELATION_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource),
-            schema=url_for(
+            schema=cached_url_for(
                 SCHEMA_RESOURCE, schema_id=TAXONOMY_ITEM_RELATION_SCHEMA, _external=True
             ),
         )
@@ -2,8 +2,6 @@
 
 from typing import Dict, Iterable, Optional
 
-from flask import url_for
-
 from muse_for_anything.api.base_models import ApiLink, ApiResponse
 from muse_for_anything.api.v1_api.constants import (
     COLLECTION_REL,
@@ -24,6 +22,7 @@ from muse_for_anything.api.v1_api.constants import (
     UP_REL,
     VERSION_KEY,
 )
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
 from muse_for_anything.api.v1_api.models.ontology import TaxonomyItemData
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiObjectGenerator,
@@ -77,7 +76,7 @@ class TaxonomyItemVersionsPageSelfLinkGenerator(
         if query_params is None:
             query_params = {ITEM_COUNT_QUERY_KEY: ITEM_COUNT_DEFAULT}
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TAXONOMY_ITEM_VERSION_PAGE_RESOURCE,
                 namespace=str(taxonomy_item.taxonomy.namespace_id),
                 taxonomy=str(taxonomy_item.taxonomy_id),
@@ -88,7 +87,7 @@ class TaxonomyItemVersionsPageSelfLinkGenerator(
             rel=(COLLECTION_REL, PAGE_REL),
             resource_type=TAXONOMY_ITEM_VERSION_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource, query_params=query_params),
-            schema=url_for(
+            schema=cached_url_for(
                 SCHEMA_RESOURCE, schema_id=TAXONOMY_ITEM_SCHEMA, _external=True
             ),
         )
@@ -171,7 +170,7 @@ class TaxonomyItemVersionSelfLinkGenerator(
         ignore_deleted: bool = False,
     ) -> Optional[ApiLink]:
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TAXONOMY_ITEM_VERSION_RESOURCE,
                 namespace=str(resource.taxonomy_item.taxonomy.namespace_id),
                 taxonomy=str(resource.taxonomy_item.taxonomy_id),
@@ -182,7 +181,7 @@ class TaxonomyItemVersionSelfLinkGenerator(
             rel=tuple(),
             resource_type=TAXONOMY_ITEM_VERSION_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource),
-            schema=url_for(
+            schema=cached_url_for(
                 SCHEMA_RESOURCE, schema_id=TAXONOMY_ITEM_SCHEMA, _external=True
             ),
             name=f"{resource.name} (v{resource.version})",
@@ -2,8 +2,6 @@
 
 from typing import Any, Dict, Iterable, List, Optional, Union
 
-from flask import url_for
-
 from muse_for_anything.api.base_models import ApiLink, ApiResponse
 from muse_for_anything.api.v1_api.constants import (
     COLLECTION_REL,
@@ -38,6 +36,7 @@ from muse_for_anything.api.v1_api.constants import (
     UPDATE,
     UPDATE_REL,
 )
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
 from muse_for_anything.api.v1_api.models.ontology import ObjectTypeData
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiObjectGenerator,
@@ -87,7 +86,7 @@ class ObjectTypePageLinkGenerator(
         if query_params is None:
             query_params = {ITEM_COUNT_QUERY_KEY: ITEM_COUNT_DEFAULT}
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TYPE_PAGE_RESOURCE,
                 namespace=str(namespace.id),
                 **query_params,
@@ -96,7 +95,7 @@ class ObjectTypePageLinkGenerator(
             rel=(COLLECTION_REL, PAGE_REL),
             resource_type=TYPE_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource, query_params=query_params),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA, _external=True),
+            schema=cached_url_for(SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA, _external=True),
         )
 
 
@@ -124,7 +123,9 @@ class ObjectTypePageCreateLinkGenerator(
                 return  # deleted
         link = LinkGenerator.get_link_of(resource, query_params=query_params)
         link.rel = (CREATE_REL, POST_REL)
-        link.schema = url_for(SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA_POST, _external=True)
+        link.schema = cached_url_for(
+            SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA_POST, _external=True
+        )
         return link
 
 
@@ -183,7 +184,7 @@ class ObjectTypeSelfLinkGenerator(LinkGenerator, resource_type=OntologyObjectTyp
         ignore_deleted: bool = False,
     ) -> Optional[ApiLink]:
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TYPE_RESOURCE,
                 namespace=str(resource.namespace_id),
                 object_type=str(resource.id),
@@ -192,7 +193,7 @@ class ObjectTypeSelfLinkGenerator(LinkGenerator, resource_type=OntologyObjectTyp
             rel=tuple(),
             resource_type=TYPE_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA, _external=True),
+            schema=cached_url_for(SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA, _external=True),
             name=resource.name,
         )
 
@@ -277,7 +278,9 @@ class UpdateObjectTypeLinkGenerator(
                 return  # deleted
         link = LinkGenerator.get_link_of(resource, ignore_deleted=ignore_deleted)
         link.rel = (UPDATE_REL, PUT_REL)
-        link.schema = url_for(SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA_POST, _external=True)
+        link.schema = cached_url_for(
+            SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA_POST, _external=True
+        )
         return link
 
 
@@ -2,8 +2,6 @@
 
 from typing import Any, Dict, Iterable, List, Optional, Union
 
-from flask import url_for
-
 from muse_for_anything.api.base_models import ApiLink, ApiResponse
 from muse_for_anything.api.v1_api.constants import (
     COLLECTION_REL,
@@ -24,6 +22,7 @@ from muse_for_anything.api.v1_api.constants import (
     TYPE_VERSION_RESOURCE,
     UP_REL,
 )
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
 from muse_for_anything.api.v1_api.models.ontology import ObjectTypeData
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiObjectGenerator,
@@ -78,7 +77,7 @@ class ObjectTypeVersionsPageSelfLinkGenerator(
         if query_params is None:
             query_params = {ITEM_COUNT_QUERY_KEY: ITEM_COUNT_DEFAULT}
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TYPE_VERSION_PAGE_RESOURCE,
                 namespace=str(object_type.namespace_id),
                 object_type=str(object_type.id),
@@ -88,7 +87,7 @@ class ObjectTypeVersionsPageSelfLinkGenerator(
             rel=(COLLECTION_REL, PAGE_REL),
             resource_type=TYPE_VERSION_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource, query_params=query_params),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA, _external=True),
+            schema=cached_url_for(SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA, _external=True),
         )
 
 
@@ -151,7 +150,7 @@ class ObjectTypeVersionSelfLinkGenerator(
         ignore_deleted: bool = False,
     ) -> Optional[ApiLink]:
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 TYPE_VERSION_RESOURCE,
                 namespace=str(resource.ontology_type.namespace_id),
                 object_type=str(resource.object_type_id),
@@ -161,7 +160,7 @@ class ObjectTypeVersionSelfLinkGenerator(
             rel=(SCHEMA_REL_TYPE,),
             resource_type=TYPE_VERSION_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA, _external=True),
+            schema=cached_url_for(SCHEMA_RESOURCE, schema_id=TYPE_SCHEMA, _external=True),
             name=f"{resource.name} (v{resource.version})",
         )
 
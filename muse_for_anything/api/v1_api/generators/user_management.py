@@ -2,7 +2,6 @@
 
 from typing import Dict, Iterable, Optional, Tuple
 
-from flask import url_for
 from flask.globals import g
 
 from muse_for_anything.api.base_models import ApiLink, ApiResponse
@@ -39,6 +38,7 @@ from muse_for_anything.api.v1_api.constants import (
     USER_SCHEMA,
     USER_UPDATE_SCHEMA,
 )
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
 from muse_for_anything.api.v1_api.models.auth import UserData
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiObjectGenerator,
@@ -76,11 +76,11 @@ class UsersPageLinkGenerator(LinkGenerator, resource_type=User, page=True):
         if query_params is None:
             query_params = {ITEM_COUNT_QUERY_KEY: ITEM_COUNT_DEFAULT}
         return ApiLink(
-            href=url_for(USER_PAGE_RESOURCE, **query_params, _external=True),
+            href=cached_url_for(USER_PAGE_RESOURCE, **query_params, _external=True),
             rel=(COLLECTION_REL, PAGE_REL),
             resource_type=USER_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource, query_params=query_params),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=USER_SCHEMA, _external=True),
+            schema=cached_url_for(SCHEMA_RESOURCE, schema_id=USER_SCHEMA, _external=True),
         )
 
 
@@ -98,7 +98,7 @@ class UsersPageCreateUserLinkGenerator(
             return
         link = LinkGenerator.get_link_of(resource, query_params=query_params)
         link.rel = (CREATE_REL, POST_REL, REQUIRES_FRESH_LOGIN_REL)
-        link.schema = url_for(
+        link.schema = cached_url_for(
             SCHEMA_RESOURCE, schema_id=USER_CREATE_SCHEMA, _external=True
         )
         return link
@@ -123,11 +123,13 @@ class UserSelfLinkGenerator(LinkGenerator, resource_type=User):
         ignore_deleted: bool = False,
     ) -> Optional[ApiLink]:
         return ApiLink(
-            href=url_for(USER_RESOURCE, username=str(resource.username), _external=True),
+            href=cached_url_for(
+                USER_RESOURCE, username=str(resource.username), _external=True
+            ),
             rel=tuple(),
             resource_type=USER_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=USER_SCHEMA, _external=True),
+            schema=cached_url_for(SCHEMA_RESOURCE, schema_id=USER_SCHEMA, _external=True),
             name=resource.username,
         )
 
@@ -194,7 +196,7 @@ class UpdateUserLinkGenerator(LinkGenerator, resource_type=User, relation=UPDATE
 
         link = LinkGenerator.get_link_of(resource)
 
-        link.schema = url_for(
+        link.schema = cached_url_for(
             SCHEMA_RESOURCE, schema_id=USER_UPDATE_SCHEMA, _external=True
         )
 
@@ -253,7 +255,7 @@ class UserCreateUserRoleLinkGenerator(
             return
         link = LinkGenerator.get_link_of(CollectionResource(UserRole, resource=resource))
         link.rel = (CREATE_REL, POST_REL, REQUIRES_FRESH_LOGIN_REL)
-        link.schema = url_for(
+        link.schema = cached_url_for(
             SCHEMA_RESOURCE, schema_id=USER_ROLE_POST_SCHEMA, _external=True
         )
         return link
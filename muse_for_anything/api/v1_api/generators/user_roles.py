@@ -2,7 +2,6 @@
 
 from typing import Dict, Iterable, List, Optional, Tuple
 
-from flask import url_for
 from flask.globals import g
 
 from muse_for_anything.api.base_models import ApiLink, ApiResponse
@@ -28,6 +27,7 @@ from muse_for_anything.api.v1_api.constants import (
     USER_ROLE_RESOURCE,
     USER_ROLE_SCHEMA,
 )
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
 from muse_for_anything.api.v1_api.models.auth import UserRoleData
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiObjectGenerator,
@@ -81,13 +81,15 @@ class UserRolesCollectionLinkGenerator(LinkGenerator, resource_type=UserRole, pa
         ):
             return
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 USER_ROLE_COLLECTION_RESOURCE, username=username, _external=True
             ),
             rel=(COLLECTION_REL,),
             resource_type=USER_ROLE_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource, query_params=query_params),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=USER_ROLE_SCHEMA, _external=True),
+            schema=cached_url_for(
+                SCHEMA_RESOURCE, schema_id=USER_ROLE_SCHEMA, _external=True
+            ),
         )
 
 
@@ -121,7 +123,7 @@ class UserRolesCollectionCreateUserRoleLinkGenerator(
             return
         link = LinkGenerator.get_link_of(resource, query_params=query_params)
         link.rel = (CREATE_REL, POST_REL, REQUIRES_FRESH_LOGIN_REL)
-        link.schema = url_for(
+        link.schema = cached_url_for(
             SCHEMA_RESOURCE, schema_id=USER_ROLE_POST_SCHEMA, _external=True
         )
         return link
@@ -147,7 +149,7 @@ class UserRoleSelfLinkGenerator(LinkGenerator, resource_type=UserRole):
         ignore_deleted: bool = False,
     ) -> Optional[ApiLink]:
         return ApiLink(
-            href=url_for(
+            href=cached_url_for(
                 USER_ROLE_RESOURCE,
                 username=str(resource.user.username),
                 role=resource.role,
@@ -156,7 +158,9 @@ class UserRoleSelfLinkGenerator(LinkGenerator, resource_type=UserRole):
             rel=tuple(),
             resource_type=USER_ROLE_REL_TYPE,
             resource_key=KeyGenerator.generate_key(resource),
-            schema=url_for(SCHEMA_RESOURCE, schema_id=USER_ROLE_SCHEMA, _external=True),
+            schema=cached_url_for(
+                SCHEMA_RESOURCE, schema_id=USER_ROLE_SCHEMA, _external=True
+            ),
             name=resource.role,
         )
 
@@ -0,0 +1,200 @@
+"""Module containing a cache for building the urls of api links.
+
+``url_for`` resolves the url adapter, the url defaults and all rules of the
+endpoint for every call. Link generators build the same endpoints thousands of
+times per request, so this module resolves each endpoint once per
+(endpoint, host, script root) into a link template (the url prefix and the
+rule precompiled into a format string). Urls of constant endpoints (e.g.
+schema urls) are cached completely.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Hashable, Optional
+from urllib.parse import quote
+
+from flask import Flask, current_app, url_for
+from flask.globals import request_ctx
+from werkzeug.routing import MapAdapter, Rule
+from werkzeug.routing.converters import UnicodeConverter
+
+from .constants import SCHEMA_RESOURCE, TYPE_SCHEMA_RESOURCE
+
+# endpoints that always produce the same url for the same (host, values)
+CONSTANT_URL_ENDPOINTS = frozenset((SCHEMA_RESOURCE, TYPE_SCHEMA_RESOURCE))
+
+LINK_TEMPLATE_CACHE_MAX_ENTRIES = 2048
+
+# safe characters of werkzeug url path segments
+_PATH_SAFE = "!$&'()*+,/:;=@"
+
+# variable parts of url rules (e.g. "<string:namespace>")
+_RULE_VARIABLE = re.compile(
+    r"<(?:(?P<converter>[a-zA-Z_][a-zA-Z0-9_]*)(?:\((?P<arguments>.*?)\))?:)?"
+    r"(?P<variable>[a-zA-Z_][a-zA-Z0-9_]*)>"
+)
+
+# options of url_for that are not url values
+_URL_FOR_OPTIONS = frozenset(("_anchor", "_method", "_scheme"))
+
+
+def _quote_path_segment(value: Any) -> str:
+    value = str(value)
+    if value.isascii() and value.isalnum():
+        return value  # nothing to quote (e.g. database ids)
+    return quote(value, safe=_PATH_SAFE)
+
+
+def _compile_path_format(rule: Rule, adapter: MapAdapter) -> Optional[str]:
+    """Compile the rule into a format string (None if the rule uses special converters)."""
+    path_format = []
+    position = 0
+    for match in _RULE_VARIABLE.finditer(rule.rule):
+        converter = adapter.map.converters.get(match.group("converter") or "default")
+        if converter is not UnicodeConverter:
+            return None
+        static = quote(rule.rule[position : match.start()], safe=_PATH_SAFE)
+        path_format.append(static.replace("{", "{{").replace("}", "}}"))
+        path_format.append(f"{{{match.group('variable')}}}")
+        position = match.end()
+    static = quote(rule.rule[position:], safe=_PATH_SAFE)
+    path_format.append(static.replace("{", "{{").replace("}", "}}"))
+    return "".join(path_format).lstrip("/")
+
+
+@dataclass(frozen=True)
+class LinkTemplate:
+    """The resolved url rule of an endpoint with the url prefix of a host."""
+
+    rule: Rule
+    arguments: FrozenSet[str]
+    path_format: Optional[str]
+    external_prefix: str
+    internal_prefix: str
+
+    def build(self, values: Dict[str, Any], external: bool) -> Optional[str]:
+        """Build the url with the given values or return None if the rule cannot be built."""
+        prefix = self.external_prefix if external else self.internal_prefix
+        if self.path_format is not None and self.arguments == values.keys():
+            return prefix + self.path_format.format_map(
+                {key: _quote_path_segment(value) for key, value in values.items()}
+            )
+        if not self.arguments.issubset(values):
+            return None
+        # werkzeug builder appends the remaining values as query string
+        result = self.rule.build(values, append_unknown=True)
+        if result is None:
+            return None
+        return prefix + result[1].lstrip("/")
+
+
+class LinkTemplateCache:
+    """Cache of link templates and constant urls."""
+
+    def __init__(self, max_entries: int = LINK_TEMPLATE_CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._templates: Dict[Hashable, Optional[LinkTemplate]] = {}
+        self._constant_urls: Dict[Hashable, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app: Flask):
+        self.clear()
+
+    def clear(self):
+        self._templates.clear()
+        self._constant_urls.clear()
+
+    def _get_template(
+        self, endpoint: str, adapter: MapAdapter, key: Hashable
+    ) -> Optional[LinkTemplate]:
+        if key in self._templates:
+            self.hits += 1
+            return self._templates[key]
+        self.misses += 1
+        template = self._resolve_template(endpoint, adapter)
+        if len(self._templates) >= self.max_entries:
+            self._templates.clear()  # unexpected amount of hosts, start over
+        self._templates[key] = template
+        return template
+
+    def _resolve_template(
+        self, endpoint: str, adapter: MapAdapter
+    ) -> Optional[LinkTemplate]:
+        """Resolve the link template of an endpoint (None if url_for must be used)."""
+        if any(current_app.url_default_functions.values()):
+            return None  # url defaults may change the values
+        if adapter.map.host_matching:
+            return None
+        rules = adapter.map._rules_by_endpoint.get(endpoint, ())
+        if len(rules) != 1:
+            return None
+        rule = rules[0]
+        if rule.defaults or rule.websocket or rule.build_only:
+            return None
+        if rule.subdomain != adapter.subdomain:
+            return None
+        scheme = "https:" if adapter.url_scheme in {"https", "wss"} else "http:"
+        host = adapter.get_host(None)
+        return LinkTemplate(
+            rule=rule,
+            arguments=frozenset(rule.arguments),
+            path_format=_compile_path_format(rule, adapter),
+            external_prefix=f"{scheme}//{host}{adapter.script_name[:-1]}/",
+            internal_prefix=f"{adapter.script_name.rstrip('/')}/",
+        )
+
+    def url_for(self, endpoint: str, _external: bool = False, **values: Any) -> str:
+        """Build the url of an endpoint (see ``flask.url_for``)."""
+        try:
+            adapter: Optional[MapAdapter] = request_ctx._get_current_object().url_adapter
+        except RuntimeError:  # outside of a request
+            adapter = None
+        if (
+            adapter is None
+            or endpoint[:1] == "."
+            or not _URL_FOR_OPTIONS.isdisjoint(values)
+        ):
+            return url_for(endpoint, _external=_external, **values)
+
+        key = (
+            endpoint,
+            adapter.server_name,
+            adapter.subdomain,
+            adapter.script_name,
+            adapter.url_scheme,
+        )
+
+        if None in values.values():
+            values = {k: v for k, v in values.items() if v is not None}
+
+        constant_key: Optional[Hashable] = None
+        if endpoint in CONSTANT_URL_ENDPOINTS:
+            try:
+                constant_key = (key, _external, frozenset(values.items()))
+                url = self._constant_urls.get(constant_key)
+            except TypeError:  # unhashable values
+                constant_key = None
+                url = None
+            if url is not None:
+                self.hits += 1
+                return url
+
+        template = self._get_template(endpoint, adapter, key)
+        url = template.build(values, _external) if template is not None else None
+        if url is None:
+            url = url_for(endpoint, _external=_external, **values)
+
+        if constant_key is not None:
+            if len(self._constant_urls) >= self.max_entries:
+                self._constant_urls.clear()
+            self._constant_urls[constant_key] = url
+        return url
+
+
+LINK_TEMPLATES = LinkTemplateCache()
+
+
+def cached_url_for(endpoint: str, **values: Any) -> str:
+    """Drop in replacement of ``flask.url_for`` using the link template cache."""
+    return LINK_TEMPLATES.url_for(endpoint, **values)
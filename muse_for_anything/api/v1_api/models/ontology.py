@@ -2,10 +2,10 @@
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Optional, Sequence
+from typing import Any, Dict, Optional, Sequence
 
 import marshmallow as ma
-from marshmallow.validate import Length, Regexp
+from marshmallow.validate import Length, Range, Regexp
 
 from ...base_models import (
     ApiLink,
@@ -177,6 +177,70 @@ class ObjectData(BaseApiObject, ChangesDataMixin, NameDescriptionMixin):
     data: Any
 
 
+class ObjectRevalidationTaskCreateSchema(MaBaseSchema):
+    type_version = ma.fields.Integer(
+        required=False,
+        allow_none=True,
+        load_default=None,
+        metadata={"description": "The type version (defaults to the current version)."},
+    )
+    create_versions = ma.fields.Boolean(
+        required=False,
+        load_default=False,
+        metadata={"description": "Create new object versions for all valid objects."},
+    )
+
+
+class ObjectRevalidationResultSchema(MaBaseSchema):
+    object_id = ma.fields.Integer(allow_none=False, dump_only=True)
+    object_version_id = ma.fields.Integer(allow_none=False, dump_only=True)
+    errors = ma.fields.Raw(allow_none=True, dump_only=True)
+
+
+class ObjectRevalidationTaskSchema(CreateSchemaMixin, UpdateSchemaMixin, ApiObjectSchema):
+    type_version = ma.fields.Integer(allow_none=False, dump_only=True)
+    create_versions = ma.fields.Boolean(allow_none=False, dump_only=True)
+    status = ma.fields.String(allow_none=False, dump_only=True)
+    message = ma.fields.String(allow_none=True, dump_only=True)
+    progress = ma.fields.Float(allow_none=False, dump_only=True)
+    objects_total = ma.fields.Integer(allow_none=False, dump_only=True)
+    objects_checked = ma.fields.Integer(allow_none=False, dump_only=True)
+    objects_valid = ma.fields.Integer(allow_none=False, dump_only=True)
+    objects_invalid = ma.fields.Integer(allow_none=False, dump_only=True)
+    versions_created = ma.fields.Integer(allow_none=False, dump_only=True)
+    finished_on = ma.fields.DateTime(allow_none=True, dump_only=True)
+    invalid_objects = ma.fields.List(
+        ma.fields.Nested(ObjectRevalidationResultSchema),
+        allow_none=False,
+        dump_only=True,
+    )
+
+
+@dataclass
+class ObjectRevalidationResultData:
+    object_id: int
+    object_version_id: int
+    errors: Any
+
+
+@dataclass
+class ObjectRevalidationTaskData(BaseApiObject):
+    created_on: datetime
+    updated_on: datetime
+    type_version: int
+    create_versions: bool
+    status: str
+    message: Optional[str]
+    progress: float
+    objects_total: int
+    objects_checked: int
+    objects_valid: int
+    objects_invalid: int
+    versions_created: int
+    finished_on: Optional[datetime]
+    invalid_objects: Sequence[ObjectRevalidationResultData]
+
+
 class ObjectsCursorPageArgumentsSchema(
     CursorPageArgumentsSchema, DeletedPageSchemaMixin, SearchPageSchemaMixin
 ):
@@ -277,4 +341,166 @@ class TaxonomyItemRelationData(BaseApiObject, CreateDeleteDataMixin):
     target_item: ApiLink
 
 
+class TaxonomyTreeParamsSchema(MaBaseSchema):
+    root = ma.fields.List(
+        ma.fields.String(validate=Regexp(r"^[0-9]+$")),
+        allow_none=True,
+        load_only=True,
+        metadata={"description": "The ids of the subtree roots (repeatable)."},
+    )
+    depth = ma.fields.Integer(
+        allow_none=True,
+        load_only=True,
+        validate=Range(0, None, min_inclusive=True),
+        metadata={"description": "The maximum depth of items below the roots."},
+    )
+
+
+class TaxonomyTreeItemSchema(MaBaseSchema):
+    id = ma.fields.String(allow_none=False, dump_only=True)
+    href = ma.fields.String(allow_none=False, dump_only=True)
+    name = ma.fields.String(allow_none=False, dump_only=True)
+    description = ma.fields.String(
+        allow_none=False, dump_only=True, metadata={"format": "markdown"}
+    )
+    sort_key = ma.fields.Float(allow_none=True, dump_only=True)
+    version = ma.fields.Integer(allow_none=False, dump_only=True)
+    depth = ma.fields.Integer(allow_none=False, dump_only=True)
+    parents = ma.fields.List(ma.fields.String(), allow_none=False, dump_only=True)
+    children = ma.fields.List(ma.fields.String(), allow_none=False, dump_only=True)
+
+
+class TaxonomyTreeSchema(ApiObjectSchema):
+    roots = ma.fields.List(ma.fields.String(), allow_none=False, dump_only=True)
+    max_depth = ma.fields.Integer(allow_none=True, dump_only=True)
+    items = ma.fields.List(
+        ma.fields.Nested(TaxonomyTreeItemSchema),
+        allow_none=False,
+        dump_only=True,
+        metadata={
+            "description": "All items of the tree (breadth first, each item once)."
+        },
+    )
+
+
+@dataclass
+class TaxonomyTreeItemData:
+    id: str
+    href: str
+    name: str
+    description: str
+    sort_key: Optional[float]
+    version: int
+    depth: int
+    parents: Sequence[str]
+    children: Sequence[str]
+
+
+@dataclass
+class TaxonomyTreeData(BaseApiObject):
+    roots: Sequence[str]
+    max_depth: Optional[int]
+    items: Sequence[TaxonomyTreeItemData]
+
+
+class TaxonomyImportItemSchema(MaBaseSchema):
+    key = ma.fields.String(
+        required=False,
+        allow_none=True,
+        validate=Length(1, MAX_STRING_LENGTH),
+        metadata={"description": "The key used to reference the item in relations."},
+    )
+    name = ma.fields.String(
+        allow_none=False, required=True, validate=Length(1, MAX_STRING_LENGTH)
+    )
+    description = ma.fields.String(
+        load_default="", required=False, metadata={"format": "markdown"}
+    )
+    sort_key = ma.fields.Float(allow_nan=False, allow_none=True, required=False)
+    children = ma.fields.List(
+        ma.fields.Nested(lambda: TaxonomyImportItemSchema()),
+        required=False,
+        allow_none=False,
+        load_default=list,
+    )
+
+
+class TaxonomyImportRelationSchema(MaBaseSchema):
+    source = ma.fields.String(required=True, allow_none=False)
+    target = ma.fields.String(required=True, allow_none=False)
+
+
+class TaxonomyImportSchema(MaBaseSchema):
+    parent = ma.fields.String(
+        required=False,
+        allow_none=True,
+        validate=Regexp(r"^[0-9]+$"),
+        metadata={"description": "The id of an existing item to import the items into."},
+    )
+    items = ma.fields.List(
+        ma.fields.Nested(TaxonomyImportItemSchema),
+        required=True,
+        allow_none=False,
+        metadata={"description": "The (nested) items to import."},
+    )
+    relations = ma.fields.List(
+        ma.fields.Nested(TaxonomyImportRelationSchema),
+        required=False,
+        allow_none=False,
+        load_default=list,
+        metadata={"description": "Relations between the keys of the imported items."},
+    )
+
+
+class TaxonomyImportResultSchema(ApiObjectSchema):
+    items_created = ma.fields.Integer(allow_none=False, dump_only=True)
+    relations_created = ma.fields.Integer(allow_none=False, dump_only=True)
+    toplevel_items = ma.fields.Integer(allow_none=False, dump_only=True)
+    max_depth = ma.fields.Integer(allow_none=False, dump_only=True)
+    ids = ma.fields.Dict(
+        keys=ma.fields.String(),
+        values=ma.fields.String(),
+        allow_none=False,
+        dump_only=True,
+        metadata={"description": "The ids of the imported items by their key."},
+    )
+
+
+@dataclass
+class TaxonomyImportResultData(BaseApiObject):
+    items_created: int
+    relations_created: int
+    toplevel_items: int
+    max_depth: int
+    ids: Dict[str, str]
+
+
+class TaxonomySubtreeMoveSchema(MaBaseSchema):
+    parent = ma.fields.String(
+        required=True,
+        allow_none=True,
+        validate=Regexp(r"^[0-9]+$"),
+        metadata={"description": "The id of the new parent (null for toplevel items)."},
+    )
+
+
+class TaxonomySubtreeChangeSchema(ApiObjectSchema):
+    root = ma.fields.Nested(ApiLinkSchema(), allow_none=False, dump_only=True)
+    items = ma.fields.Integer(allow_none=False, dump_only=True)
+    relations = ma.fields.Integer(allow_none=False, dump_only=True)
+    skipped_relations = ma.fields.Integer(
+        allow_none=False,
+        dump_only=True,
+        metadata={"description": "Relations not restored because of a circle."},
+    )
+
+
+@dataclass
+class TaxonomySubtreeChangeData(BaseApiObject):
+    root: ApiLink
+    items: int
+    relations: int
+    skipped_relations: int = 0
+
+
 __all__.extend(get_all_classes_of_module(__name__, MaBaseSchema))
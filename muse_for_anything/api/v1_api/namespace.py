@@ -20,6 +20,11 @@ from muse_for_anything.api.pagination_util import (
 from muse_for_anything.db.models import owl
 from muse_for_anything.db.models.users import User
 
+from .conditional_requests import (
+    check_if_match,
+    check_not_modified,
+    get_resource_validator,
+)
 from .constants import (
     CHANGED_REL,
     CREATE,
@@ -40,6 +45,7 @@ from .models.ontology import (
     NamespaceSchema,
 )
 from .request_helpers import ApiResponseGenerator, LinkGenerator, PageResource
+from .response_cache import IMMUTABLE_RESPONSES
 from .root import API_V1
 from ..base_models import (
     ApiResponse,
@@ -253,8 +259,16 @@ class NamespaceView(MethodView):
         FLASK_OSO.set_current_resource(found_namespace)
         FLASK_OSO.authorize()
 
-        return ApiResponseGenerator.get_api_response(
-            found_namespace, link_to_relations=NAMESPACE_EXTRA_LINK_RELATIONS
+        validator = get_resource_validator(found_namespace)
+        not_modified = check_not_modified(validator)
+        if not_modified is not None:
+            return not_modified
+
+        return (
+            ApiResponseGenerator.get_api_response(
+                found_namespace, link_to_relations=NAMESPACE_EXTRA_LINK_RELATIONS
+            ),
+            validator.headers,
         )
 
     @API_V1.arguments(NamespaceSchema(only=("name", "description")))
@@ -283,6 +297,7 @@ class NamespaceView(MethodView):
             )
 
         FLASK_OSO.authorize_and_set_resource(found_namespace, action=UPDATE)
+        check_if_match(get_resource_validator(found_namespace))
 
         if found_namespace.name != namespace_data.get("name"):
             existing: bool = (
@@ -303,6 +318,7 @@ class NamespaceView(MethodView):
         found_namespace.update(**namespace_data)
         DB.session.add(found_namespace)
         DB.session.commit()
+        IMMUTABLE_RESPONSES.invalidate()
 
         namespace_response = ApiResponseGenerator.get_api_response(
             found_namespace, link_to_relations=NAMESPACE_EXTRA_LINK_RELATIONS
@@ -351,6 +367,7 @@ class NamespaceView(MethodView):
             found_namespace.deleted_on = None
             DB.session.add(found_namespace)
             DB.session.commit()
+            IMMUTABLE_RESPONSES.invalidate()
 
         namespace_response = ApiResponseGenerator.get_api_response(
             found_namespace, link_to_relations=NAMESPACE_EXTRA_LINK_RELATIONS
@@ -392,6 +409,7 @@ class NamespaceView(MethodView):
             abort(HTTPStatus.NOT_FOUND, message=gettext("Namespace not found."))
 
         FLASK_OSO.authorize_and_set_resource(found_namespace)
+        check_if_match(get_resource_validator(found_namespace))
 
         # only actually delete when not already deleted
         if found_namespace.deleted_on is None:
@@ -399,6 +417,7 @@ class NamespaceView(MethodView):
             found_namespace.deleted_on = datetime.now(timezone.utc)
             DB.session.add(found_namespace)
             DB.session.commit()
+            IMMUTABLE_RESPONSES.invalidate()
 
         namespace_response = ApiResponseGenerator.get_api_response(
             found_namespace, link_to_relations=NAMESPACE_EXTRA_LINK_RELATIONS
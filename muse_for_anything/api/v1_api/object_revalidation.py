@@ -0,0 +1,509 @@
+"""Module containing the background job revalidating objects against a new type version.
+
+A revalidation task validates all objects of a type (whose current version
+uses another type version) against the type version of the task. The
+objects are processed in batches ordered by their id:
+
+1. the json schema validation of a batch is distributed over a process pool
+   (every worker prepares the validator of the type version once)
+2. resource references of the valid objects are checked with the cached
+   validation plan and batched queries (see ``validate_object_data``)
+3. the results (and optionally the new object versions) are committed
+   together with the id of the last object of the batch
+
+An interrupted task resumes after the last committed batch. A job claims
+its task in the database before processing it and renews the claim with
+every batch, so a task is never processed by two workers at once (the
+running tasks are only tracked per process).
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from multiprocessing import get_context
+from os import cpu_count
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urldefrag
+
+from flask import Flask, current_app
+from jsonschema import Draft7Validator
+from referencing import Registry, Resource
+from referencing.jsonschema import DRAFT7
+from sqlalchemy.sql.expression import func, or_, select, update
+from werkzeug.exceptions import HTTPException
+
+from .constants import OBJECT_REL_TYPE
+from .ontology_object_validation import (
+    ObjectMetadata,
+    extract_object_references,
+    resolve_type_version_schema_url,
+)
+from .response_cache import IMMUTABLE_RESPONSES
+from .schema_store import TYPE_SCHEMAS
+from .validation_errors import ValidationErrorCollector
+from .validator_cache import TYPE_VERSION_VALIDATORS
+from ..json_schema import DataWalkerException
+from ...db.db import DB
+from ...db.models.object_relation_tables import (
+    OntologyObjectVersionToObject,
+    OntologyObjectVersionToTaxonomyItem,
+)
+from ...db.models.ontology_objects import (
+    OntologyObject,
+    OntologyObjectTypeVersion,
+    OntologyObjectVersion,
+)
+from ...db.models.revalidation import (
+    REVALIDATION_FAILED,
+    REVALIDATION_FINISHED,
+    REVALIDATION_PENDING,
+    REVALIDATION_RUNNING,
+    ObjectRevalidationResult,
+    ObjectRevalidationTask,
+)
+from ...util.logging import get_logger
+
+REVALIDATION_LOGGER = "revalidation"
+
+# running tasks without a heartbeat (a started batch) for this long were interrupted
+STALE_TASK_TIMEOUT = timedelta(minutes=10)
+
+# the validation errors of a single object (json pointer -> error messages)
+ObjectErrors = Dict[str, List[str]]
+
+# (object id, object version id, object version, data)
+ObjectRow = Tuple[int, int, int, Any]
+
+ProgressCallback = Callable[[ObjectRevalidationTask], None]
+
+
+# process pool worker ##########################################################
+
+# the validator of the task of the current worker process
+_WORKER_VALIDATOR: Optional[Draft7Validator] = None
+
+
+def _init_worker(schema: Dict[str, Any], remote_schemas: Dict[str, Any]):
+    """Prepare the validator of the type version once per worker process."""
+    global _WORKER_VALIDATOR
+    registry: Registry = Registry().with_resources(
+        (url, Resource.from_contents(contents, default_specification=DRAFT7))
+        for url, contents in remote_schemas.items()
+    )
+    _WORKER_VALIDATOR = Draft7Validator(schema, registry=registry)
+
+
+def _validate_batch(
+    objects: List[Tuple[int, Any]], max_errors: Optional[int]
+) -> List[Tuple[int, ObjectErrors]]:
+    """Validate the data of the objects in a worker process."""
+    assert _WORKER_VALIDATOR is not None, "Worker was not initialized!"
+    return _validate_objects(_WORKER_VALIDATOR, objects, max_errors)
+
+
+def _validate_objects(
+    validator: Draft7Validator, objects: List[Tuple[int, Any]], max_errors: Optional[int]
+) -> List[Tuple[int, ObjectErrors]]:
+    results: List[Tuple[int, ObjectErrors]] = []
+    for object_id, data in objects:
+        collector = ValidationErrorCollector(max_errors=max_errors)
+        collector.collect(validator.iter_errors(data))
+        results.append((object_id, collector.to_json(prefix="/data")))
+    return results
+
+
+def collect_remote_schemas(
+    schema: Dict[str, Any], resolve_url: Callable[[str], Any]
+) -> Dict[str, Any]:
+    """Resolve all remote schemas referenced (transitively) by the schema.
+
+    Returns:
+        Dict[str, Any]: the resolved schemas by their url (without fragment)
+    """
+    remote_schemas: Dict[str, Any] = {}
+    stack: List[Any] = [schema]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(current)
+            continue
+        if not isinstance(current, dict):
+            continue
+        ref = current.get("$ref")
+        if isinstance(ref, str) and not ref.startswith("#"):
+            url = urldefrag(ref).url
+            if url not in remote_schemas:
+                remote_schemas[url] = resolve_url(url)
+                stack.append(remote_schemas[url])
+        stack.extend(current.values())
+    return remote_schemas
+
+
+# revalidation job #############################################################
+
+
+class ObjectRevalidationJob:
+    """Process a revalidation task in batches."""
+
+    def __init__(
+        self,
+        task: ObjectRevalidationTask,
+        batch_size: int = 200,
+        processes: Optional[int] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> None:
+        """Create a new job.
+
+        Args:
+            task (ObjectRevalidationTask): the task to process (or resume)
+            batch_size (int, optional): the number of objects committed together
+            processes (Optional[int], optional): the number of worker processes
+                validating the objects. Defaults to None (number of cpus).
+                Use 0 to validate in the current process.
+            on_progress (Optional[ProgressCallback], optional): called after every
+                committed batch
+        """
+        self.task = task
+        self.batch_size = max(batch_size, 1)
+        self.processes = processes
+        self.on_progress = on_progress
+        self.max_errors = current_app.config.get("SCHEMA_VALIDATION_MAX_ERRORS")
+
+    def _object_filter(self) -> Tuple[Any, ...]:
+        return (
+            OntologyObject.object_type_id == self.task.object_type_id,
+            OntologyObject.deleted_on == None,
+            OntologyObjectVersion.object_type_version_id != self.task.type_version_id,
+        )
+
+    def _count_objects(self) -> int:
+        query = (
+            select(func.count(OntologyObject.id))
+            .join(
+                OntologyObjectVersion,
+                OntologyObject.current_version_id == OntologyObjectVersion.id,
+            )
+            .where(*self._object_filter())
+        )
+        return DB.session.execute(query).scalar_one()
+
+    def _load_batch(self) -> List[ObjectRow]:
+        query = (
+            select(
+                OntologyObject.id,
+                OntologyObjectVersion.id,
+                OntologyObjectVersion.version,
+                OntologyObjectVersion.data,
+            )
+            .join(
+                OntologyObjectVersion,
+                OntologyObject.current_version_id == OntologyObjectVersion.id,
+            )
+            .where(*self._object_filter(), OntologyObject.id > self.task.last_object_id)
+            .order_by(OntologyObject.id)
+            .limit(self.batch_size)
+        )
+        return [tuple(row) for row in DB.session.execute(query)]
+
+    def _create_executor(self, type_version: OntologyObjectTypeVersion) -> Executor:
+        remote_schemas = collect_remote_schemas(
+            type_version.data, resolve_type_version_schema_url
+        )
+        # spawn workers, forking a (multithreaded) web server process is not safe
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(type_version.data, remote_schemas),
+        )
+
+    def _claim(self) -> bool:
+        """Mark the task as running unless it is running in another worker.
+
+        The conditional update is atomic, so only one of several concurrent
+        workers can claim an interrupted task.
+        """
+        now = datetime.now(timezone.utc)
+        result = DB.session.execute(
+            update(ObjectRevalidationTask)
+            .where(
+                ObjectRevalidationTask.id == self.task.id,
+                or_(
+                    ObjectRevalidationTask.status != REVALIDATION_RUNNING,
+                    ObjectRevalidationTask.updated_on < now - STALE_TASK_TIMEOUT,
+                ),
+            )
+            .values(status=REVALIDATION_RUNNING, message=None, updated_on=now)
+            .execution_options(synchronize_session=False)
+        )
+        DB.session.commit()
+        return result.rowcount == 1
+
+    def _heartbeat(self):
+        """Renew the claim of the task before processing a batch."""
+        self.task.updated_on = datetime.now(timezone.utc)
+        DB.session.add(self.task)
+        DB.session.commit()
+
+    def _validate(
+        self, rows: List[ObjectRow], executor: Optional[Executor]
+    ) -> Dict[int, ObjectErrors]:
+        objects = [(object_id, data) for object_id, _, _, data in rows]
+        if executor is None:
+            validator = TYPE_VERSION_VALIDATORS.get_validator(
+                self.task.type_version, resolve_url=resolve_type_version_schema_url
+            )
+            return dict(_validate_objects(validator, objects, self.max_errors))
+        workers = self.processes or cpu_count() or 1
+        chunk_size = max(len(objects) // workers, 1)
+        chunks = [
+            objects[start : start + chunk_size]
+            for start in range(0, len(objects), chunk_size)
+        ]
+        results: Dict[int, ObjectErrors] = {}
+        for chunk_results in executor.map(
+            _validate_batch, chunks, [self.max_errors] * len(chunks)
+        ):
+            results.update(chunk_results)
+        return results
+
+    def _check_references(
+        self, data: Any
+    ) -> Tuple[Optional[ObjectMetadata], ObjectErrors]:
+        """Check the resource references of an object the workers found valid."""
+        try:
+            metadata = extract_object_references(data, self.task.type_version)
+        except DataWalkerException as err:
+            messages = [str(error) for _, error, _, _ in err.accumulated_errors]
+            return None, {"/data": messages or [str(err)]}
+        except HTTPException as err:
+            errors = getattr(err, "data", {}).get("errors", {}).get("json")
+            return None, errors or {"/data": [str(err.description)]}
+        return metadata, {}
+
+    def _create_version(
+        self,
+        found_object: OntologyObject,
+        object_version: OntologyObjectVersion,
+        metadata: ObjectMetadata,
+    ):
+        DB.session.add(object_version)
+        for object_ref in metadata.referenced_objects:
+            DB.session.add(
+                OntologyObjectVersionToObject(
+                    object_version_source=object_version, object_target=object_ref
+                )
+            )
+        for taxonomy_item in metadata.referenced_taxonomy_items:
+            DB.session.add(
+                OntologyObjectVersionToTaxonomyItem(
+                    object_version_source=object_version,
+                    taxonomy_item_target=taxonomy_item,
+                )
+            )
+        found_object.current_version = object_version
+        DB.session.add(found_object)
+
+    def _process_batch(self, rows: List[ObjectRow], executor: Optional[Executor]):
+        task = self.task
+        errors_by_object = self._validate(rows, executor)
+
+        valid_ids = [row[0] for row in rows if not errors_by_object.get(row[0])]
+        found_objects: Dict[int, OntologyObject] = {}
+        if valid_ids:
+            found_objects = {
+                found_object.id: found_object
+                for found_object in OntologyObject.query.filter(
+                    OntologyObject.id.in_(valid_ids)
+                )
+            }
+
+        changed_objects: Set[int] = set()
+        for object_id, object_version_id, version, data in rows:
+            errors = errors_by_object.get(object_id)
+            new_version: Optional[OntologyObjectVersion] = None
+            found_object = found_objects.get(object_id)
+            if not errors and found_object is not None:
+                metadata, errors = self._check_references(data)
+                if (
+                    metadata is not None
+                    and task.create_versions
+                    # do not overwrite concurrent updates of the object
+                    and found_object.current_version_id == object_version_id
+                ):
+                    new_version = OntologyObjectVersion(
+                        object=found_object,
+                        type_version=task.type_version,
+                        version=version + 1,
+                        name=found_object.name,
+                        description=found_object.description,
+                        data=data,
+                    )
+                    self._create_version(found_object, new_version, metadata)
+                    changed_objects.add(object_id)
+            DB.session.add(
+                ObjectRevalidationResult(
+                    task=task,
+                    object_id=object_id,
+                    object_version_id=object_version_id,
+                    valid=not errors,
+                    errors=errors or None,
+                    new_version=new_version,
+                )
+            )
+            task.objects_checked += 1
+            if errors:
+                task.objects_invalid += 1
+            else:
+                task.objects_valid += 1
+            if new_version is not None:
+                task.versions_created += 1
+
+        task.last_object_id = rows[-1][0]
+        DB.session.add(task)
+        DB.session.commit()
+        for object_id in changed_objects:
+            IMMUTABLE_RESPONSES.invalidate((OBJECT_REL_TYPE, str(object_id)))
+
+    def run(self):
+        """Process all remaining batches of the task."""
+        task = self.task
+        logger = get_logger(current_app, REVALIDATION_LOGGER)
+        type_version = task.type_version
+
+        is_pending = task.status == REVALIDATION_PENDING
+        if not self._claim():
+            logger.info("Revalidation task %d is already running.", task.id)
+            return
+        if is_pending:
+            task.objects_total = self._count_objects()
+            DB.session.add(task)
+            DB.session.commit()
+        logger.info(
+            "Revalidating %d objects of type %d against type version %d (task %d).",
+            task.objects_total,
+            task.object_type_id,
+            type_version.version,
+            task.id,
+        )
+
+        # load all imported schemas at once
+        TYPE_SCHEMAS.preload(type_version)
+
+        executor: Optional[Executor] = None
+        try:
+            if self.processes != 0:
+                executor = self._create_executor(type_version)
+            while True:
+                rows = self._load_batch()
+                if not rows:
+                    break
+                self._heartbeat()
+                self._process_batch(rows, executor)
+                if self.on_progress is not None:
+                    self.on_progress(task)
+        except Exception as err:
+            logger.exception("Revalidation task %d failed.", task.id)
+            DB.session.rollback()
+            task.status = REVALIDATION_FAILED
+            task.message = str(err)
+            DB.session.add(task)
+            DB.session.commit()
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        # objects created while the task was running are counted as well
+        task.objects_total = max(task.objects_total, task.objects_checked)
+        task.status = REVALIDATION_FINISHED
+        task.finished_on = datetime.now(timezone.utc)
+        DB.session.add(task)
+        DB.session.commit()
+        logger.info(
+            "Revalidation task %d finished: %d valid, %d invalid, %d new versions.",
+            task.id,
+            task.objects_valid,
+            task.objects_invalid,
+            task.versions_created,
+        )
+
+
+# background tasks #############################################################
+
+_RUNNING_TASKS: Set[int] = set()
+_RUNNING_TASKS_LOCK = Lock()
+
+
+def is_task_running(task_id: int) -> bool:
+    """Check if the task is processed by a background thread of this process."""
+    with _RUNNING_TASKS_LOCK:
+        return task_id in _RUNNING_TASKS
+
+
+def is_task_stale(task: ObjectRevalidationTask) -> bool:
+    """Check if a running task was interrupted (e.g. by a restart of the server)."""
+    updated_on = task.updated_on
+    if updated_on.tzinfo is None:  # sqlite does not store the timezone
+        updated_on = updated_on.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - updated_on > STALE_TASK_TIMEOUT
+
+
+def _fail_task(app: Flask, task_id: int, message: str):
+    """Record the failure of a task that could not be started."""
+    try:
+        with app.app_context():
+            task = DB.session.get(ObjectRevalidationTask, task_id)
+            if task is None or task.is_finished:
+                return
+            if task.status == REVALIDATION_RUNNING and not is_task_stale(task):
+                return  # claimed by another worker
+            task.status = REVALIDATION_FAILED
+            task.message = message
+            DB.session.add(task)
+            DB.session.commit()
+    except Exception:
+        app.logger.exception("Could not record the failure of task %d.", task_id)
+
+
+def start_revalidation_task(app: Flask, task_id: int, base_url: str) -> bool:
+    """Process the task in a background thread.
+
+    Args:
+        app (Flask): the app
+        task_id (int): the id of the task to process (or resume)
+        base_url (str): the base url of the api (remote schema urls of type
+            versions are resolved against it)
+
+    Returns:
+        bool: False if the task is already running in this process
+    """
+    with _RUNNING_TASKS_LOCK:
+        if task_id in _RUNNING_TASKS:
+            return False
+        _RUNNING_TASKS.add(task_id)
+
+    def run():
+        try:
+            with app.test_request_context(base_url=base_url):
+                task = DB.session.get(ObjectRevalidationTask, task_id)
+                if task is None or task.is_finished:
+                    return
+                job = ObjectRevalidationJob(
+                    task,
+                    batch_size=app.config.get("OBJECT_REVALIDATION_BATCH_SIZE", 200),
+                    processes=app.config.get("OBJECT_REVALIDATION_PROCESSES"),
+                )
+                try:
+                    job.run()
+                except Exception:
+                    return  # already logged and recorded in the task
+        except Exception as err:
+            app.logger.exception("Could not start revalidation task %d.", task_id)
+            _fail_task(app, task_id, str(err))
+        finally:
+            with _RUNNING_TASKS_LOCK:
+                _RUNNING_TASKS.discard(task_id)
+
+    Thread(target=run, name=f"revalidation-task-{task_id}", daemon=True).start()
+    return True
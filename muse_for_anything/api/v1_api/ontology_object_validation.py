@@ -1,28 +1,48 @@
 """Module containing validation functions for objects."""
 
 from dataclasses import dataclass
-
-from urllib.parse import urlparse
+from functools import wraps
 
 from muse_for_anything.db.models.taxonomies import TaxonomyItem
-from flask.globals import request_ctx
-from werkzeug.routing import MapAdapter
 
 from http import HTTPStatus
 
 from muse_for_anything.api.json_schema.schema_tools import SchemaWalker
-from typing import Any, Dict, Optional, Set
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from flask import current_app, has_request_context, request
+from flask.globals import g
 from flask_babel import gettext
-from jsonschema import Draft7Validator
 
 from flask_smorest import abort
+from jsonschema.exceptions import ValidationError
 
 from muse_for_anything.db.models.ontology_objects import (
     OntologyObject,
     OntologyObjectTypeVersion,
     OntologyObjectVersion,
 )
-from ..json_schema import DataWalker, DataWalkerVisitor, DataVisitorException
+from .root import API_V1
+from .schema_store import TYPE_SCHEMAS
+from .validation_errors import ValidationErrorCollector
+from .validator_cache import TYPE_VERSION_VALIDATORS
+from ..json_schema import (
+    DataWalker,
+    DataWalkerException,
+    DataWalkerVisitor,
+    DataVisitorException,
+    UnsupportedSchemaError,
+    ValidationPlan,
+)
+from ..json_stream import JSONDecodeError, JsonStreamReader
+from ..util import STREAMED_JSON_ENVIRON_KEY
+
+# maximum number of ids checked with a single IN query
+REFERENCE_QUERY_BATCH_SIZE = 500
+
+# request environ key of the object data validated while streaming the request body
+STREAMED_OBJECT_DATA_ENVIRON_KEY = "muse_for_anything.streamed_object_data"
+# request environ key of the result of the view checks run before streaming the body
+VIEW_CHECK_RESULT_ENVIRON_KEY = "muse_for_anything.view_check_result"
 
 
 @dataclass
@@ -31,90 +51,75 @@ class ObjectMetadata:
     referenced_taxonomy_items: Set[TaxonomyItem]
 
 
-ALLOWED_SCHEMA_ENDPOINTS = set(["api-v1.TypeVersionView"])
+def resolve_type_version_schema_url(url_string: str):
+    """Resolver url references without creating any http request by using the schema store."""
+    return TYPE_SCHEMAS.resolve_url(url_string)
 
 
-def resolve_type_version_schema_url(url_string: str):
-    """Resolver url references without creating any http request by directly querying the database."""
-    # TODO use url cache
-    url = urlparse(url_string)
-    # url should already be from a validated type!
-    try:
-        ctx = request_ctx._get_current_object()
-    except RuntimeError:
-        raise DataVisitorException("No request context to check schema url against!")
-    url_adapter: Optional[MapAdapter] = ctx.url_adapter
-    if url_adapter is None:
-        raise DataVisitorException(
-            "No url adapter found in request context! Unable to check URL."
-            f"URL: '{url}'"
-        )
-    if url.netloc != url_adapter.get_host(None):
-        raise DataVisitorException(
-            "Only references to schemas on the same MUSE4Anything instance allowed! "
-            f"Current instance: '{url_adapter.get_host(None)}' ref: '{url}'"
-        )
-    endpoint, params = url_adapter.match(
-        path_info=url.path, query_args=url.query, method="GET"
+def validate_object_against_schema(
+    object_data: Any,
+    type_version: OntologyObjectTypeVersion,
+    collector: Optional[ValidationErrorCollector] = None,
+):
+    # validators of type versions are cached (with all resolved remote schemas)
+    validator = TYPE_VERSION_VALIDATORS.get_validator(
+        type_version, resolve_url=resolve_type_version_schema_url
     )
-    if endpoint not in ALLOWED_SCHEMA_ENDPOINTS:
-        raise DataVisitorException(
-            "Only references to schemas on the same MUSE4Anything instance allowed! "
-            f"Current instance: '{url_adapter.get_host(None)}' ref: '{url}'"
-        )
+    if collector is None:
+        collector = ValidationErrorCollector.from_config()
+    # errors are generated lazily, stop after the maximum number of errors
+    collector.collect(validator.iter_errors(object_data))
+    report_validation_errors(collector)
 
-    # should already be validated!
-    namespace: str = params.get("namespace")
-    object_type: str = params.get("object_type")
-    version: str = params.get("version")
-    if endpoint == "api-v1.TypeVersionView":
-
-        found_type_version: Optional[OntologyObjectTypeVersion] = (
-            OntologyObjectTypeVersion.query.filter(
-                OntologyObjectTypeVersion.version == int(version),
-                OntologyObjectTypeVersion.object_type_id == int(object_type),
-            ).first()
-        )
 
-        if found_type_version is None:
-            raise DataVisitorException(f"Invalid schema ref! Schema '{url}' not found!")
+def report_validation_errors(collector: ValidationErrorCollector):
+    collector.abort_if_invalid(
+        message=gettext("The object does not conform to the type json schema!"),
+        prefix="/data",
+    )
 
-        return found_type_version.data
 
+def is_resource_reference(walker: SchemaWalker) -> bool:
+    return "resourceReference" == walker.secondary_type_resolved
 
-def validate_object_against_schema(
-    object_data: Any, type_version: OntologyObjectTypeVersion
-):
-    validator = Draft7Validator(type_version.data)
-
-    # add internal resolver function
-    validator.resolver.handlers["http"] = resolve_type_version_schema_url
-    validator.resolver.handlers["https"] = resolve_type_version_schema_url
-
-    # FIXME add proper error reporting for api client
-    validation_errors = []
-    for error in sorted(validator.iter_errors(object_data), key=str):
-        print("VALIDATION ERROR", error.message)
-        validation_errors.append(error)
-    if validation_errors:
-        abort(
-            HTTPStatus.BAD_REQUEST,
-            message=gettext("The object does not conform to the type json schema!"),
-            # errors=validation_errors,
-        )
+
+@dataclass
+class PendingReference:
+    """A well formed resource reference whose target was not checked yet."""
+
+    key: Dict[str, str]
+    data: Any
+    walker: Optional[SchemaWalker]
+    type_id: Optional[str] = None
+
+
+def _batched(ids: Iterable[int]) -> Iterable[List[int]]:
+    ids = sorted(ids)
+    for start in range(0, len(ids), REFERENCE_QUERY_BATCH_SIZE):
+        yield ids[start : start + REFERENCE_QUERY_BATCH_SIZE]
 
 
 class ResourceReferenceVisitor(DataWalkerVisitor):
-    """SchemaWalker visitor for validating and extracting object and taxonomy item resource references."""
+    """SchemaWalker visitor for validating and extracting object and taxonomy item resource references.
+
+    The keys of the references are only checked for the correct format while
+    walking the data. The referenced objects and taxonomy items are loaded
+    afterwards with ``resolve_references`` using one query per namespace
+    (or taxonomy).
+    """
 
     def __init__(self, restrict_to_namespace: Optional[int] = None) -> None:
         super().__init__(always=False)
         self.taxonomy_item_references: Set[TaxonomyItem] = set()
         self.object_references: Set[OntologyObject] = set()
         self.restrict_to_namespace = restrict_to_namespace
+        # pending references by taxonomy id and taxonomy item id
+        self.pending_taxonomy_items: Dict[int, Dict[int, List[PendingReference]]] = {}
+        # pending references by namespace id and object id
+        self.pending_objects: Dict[int, Dict[int, List[PendingReference]]] = {}
 
     def test(self, data, walker: SchemaWalker) -> bool:
-        return "resourceReference" == walker.secondary_type_resolved
+        return is_resource_reference(walker)
 
     def visit(self, data, walker: SchemaWalker) -> None:
         if "ont-taxonomy" in walker.get_resolved_attribute("referenceType"):
@@ -127,7 +132,9 @@ class ResourceReferenceVisitor(DataWalkerVisitor):
                     f"Malformed taxonomy item reference! Reference must contain a resource key of a taxonomy item."
                 )
             taxonomy_key = walker.get_resolved_attribute("referenceKey")[-1]
-            self.check_taxonomy_item_key(data["referenceKey"], taxonomy_key=taxonomy_key)
+            self.check_taxonomy_item_key(
+                data["referenceKey"], taxonomy_key=taxonomy_key, data=data, walker=walker
+            )
         if "ont-type" in walker.get_resolved_attribute("referenceType"):
             if data["referenceType"] != "ont-object":
                 raise DataVisitorException(
@@ -139,9 +146,17 @@ class ResourceReferenceVisitor(DataWalkerVisitor):
                 )
             type_keys = walker.get_resolved_attribute("referenceKey")
             type_key = type_keys[-1] if type_keys else None
-            self.check_object_key(data["referenceKey"], type_key=type_key)
+            self.check_object_key(
+                data["referenceKey"], type_key=type_key, data=data, walker=walker
+            )
 
-    def check_taxonomy_item_key(self, key: Dict[str, str], taxonomy_key: Dict[str, str]):
+    def check_taxonomy_item_key(
+        self,
+        key: Dict[str, str],
+        taxonomy_key: Dict[str, str],
+        data: Any = None,
+        walker: Optional[SchemaWalker] = None,
+    ):
         namespace = key.get("namespaceId", "")
         taxonomy = key.get("taxonomyId", "")
         taxonomy_item = key.get("taxonomyItemId", "")
@@ -158,18 +173,23 @@ class ResourceReferenceVisitor(DataWalkerVisitor):
                 f"Invalid taxonomy item key! TaxonomyItemId {taxonomy_item} is not correctly formatted."
             )
 
-        found_taxonomy_item: Optional[TaxonomyItem] = TaxonomyItem.query.filter(
-            TaxonomyItem.id == int(taxonomy_item),
-            TaxonomyItem.taxonomy_id == int(taxonomy),
-        ).first()
-
-        if found_taxonomy_item is None or found_taxonomy_item.deleted_on is not None:
+        if not taxonomy or not taxonomy.isdigit():
             raise DataVisitorException(
-                f"Invalid taxonomy item key! No taxonomy item found for key {key}."
+                f"Invalid taxonomy item key! TaxonomyId {taxonomy} is not correctly formatted."
             )
-        self.taxonomy_item_references.add(found_taxonomy_item)
 
-    def check_object_key(self, key: Dict[str, str], type_key: Optional[Dict[str, str]]):
+        pending = self.pending_taxonomy_items.setdefault(int(taxonomy), {})
+        pending.setdefault(int(taxonomy_item), []).append(
+            PendingReference(key=key, data=data, walker=walker)
+        )
+
+    def check_object_key(
+        self,
+        key: Dict[str, str],
+        type_key: Optional[Dict[str, str]],
+        data: Any = None,
+        walker: Optional[SchemaWalker] = None,
+    ):
         namespace = key.get("namespaceId", "")
         object_id = key.get("objectId", "")
 
@@ -192,44 +212,395 @@ class ResourceReferenceVisitor(DataWalkerVisitor):
                 f"Invalid object type key! ObjectId {object_id} is not correctly formatted."
             )
 
-        found_object: Optional[OntologyObject] = OntologyObject.query.filter(
-            OntologyObject.id == int(object_id),
-            OntologyObject.namespace_id == int(namespace),
-        ).first()
-
-        if (
-            found_object is None
-            or (type_key and str(found_object.object_type_id) != type_key.get("typeId"))
-            or found_object.deleted_on is not None
-            or found_object.namespace.deleted_on is not None
-        ):
-            raise DataVisitorException(
-                f"Invalid object key! No object found for key {key}."
+        pending = self.pending_objects.setdefault(int(namespace), {})
+        pending.setdefault(int(object_id), []).append(
+            PendingReference(
+                key=key,
+                data=data,
+                walker=walker,
+                type_id=type_key.get("typeId") if type_key else None,
             )
-        self.object_references.add(found_object)
+        )
 
+    def resolve_references(
+        self,
+    ) -> List[Tuple[Optional[SchemaWalker], Exception, Any, Any]]:
+        """Load all pending references with batched queries.
+
+        Returns:
+            the errors of references to missing or deleted resources (in the
+            same format as the errors of a ``DataWalker``)
+        """
+        errors: List[Tuple[Optional[SchemaWalker], Exception, Any, Any]] = []
+
+        for taxonomy_id, pending_items in self.pending_taxonomy_items.items():
+            found_taxonomy_items: Dict[int, TaxonomyItem] = {}
+            for ids in _batched(pending_items.keys()):
+                query = TaxonomyItem.query.filter(
+                    TaxonomyItem.taxonomy_id == taxonomy_id,
+                    TaxonomyItem.id.in_(ids),
+                )
+                found_taxonomy_items.update((item.id, item) for item in query)
+            for item_id, references in pending_items.items():
+                found_taxonomy_item = found_taxonomy_items.get(item_id)
+                if (
+                    found_taxonomy_item is None
+                    or found_taxonomy_item.deleted_on is not None
+                ):
+                    for ref in references:
+                        err = DataVisitorException(
+                            f"Invalid taxonomy item key! No taxonomy item found for key {ref.key}."
+                        )
+                        errors.append((ref.walker, err, ref.data, self))
+                    continue
+                self.taxonomy_item_references.add(found_taxonomy_item)
+        self.pending_taxonomy_items.clear()
+
+        for namespace_id, pending_objects in self.pending_objects.items():
+            found_objects: Dict[int, OntologyObject] = {}
+            for ids in _batched(pending_objects.keys()):
+                query = OntologyObject.query.filter(
+                    OntologyObject.namespace_id == namespace_id,
+                    OntologyObject.id.in_(ids),
+                )
+                found_objects.update((object_.id, object_) for object_ in query)
+            for object_id, references in pending_objects.items():
+                found_object = found_objects.get(object_id)
+                for ref in references:
+                    if (
+                        found_object is None
+                        or (
+                            ref.type_id
+                            and str(found_object.object_type_id) != ref.type_id
+                        )
+                        or found_object.deleted_on is not None
+                        or found_object.namespace.deleted_on is not None
+                    ):
+                        err = DataVisitorException(
+                            f"Invalid object key! No object found for key {ref.key}."
+                        )
+                        errors.append((ref.walker, err, ref.data, self))
+                        continue
+                    self.object_references.add(found_object)
+        self.pending_objects.clear()
+
+        return errors
+
+
+def _visit_references(
+    visitor: ResourceReferenceVisitor, references: Iterable[Tuple[Any, SchemaWalker]]
+) -> List[Tuple[Optional[SchemaWalker], Exception, Any, Any]]:
+    errors: List[Tuple[Optional[SchemaWalker], Exception, Any, Any]] = []
+    for data, walker in references:
+        try:
+            visitor.visit(data, walker)
+        except Exception as err:
+            errors.append((walker, err, data, visitor))
+    return errors
+
+
+def _collect_object_data_errors(
+    object_data: Any,
+    type_version: OntologyObjectTypeVersion,
+    resource_reference_visitor: ResourceReferenceVisitor,
+) -> List[Tuple[Optional[SchemaWalker], Exception, Any, Any]]:
+    # validate and extract references in a single pass (if the schema is supported)
+    plan = TYPE_VERSION_VALIDATORS.get_plan(
+        type_version,
+        resolve_url=resolve_type_version_schema_url,
+        match=is_resource_reference,
+    )
+    collector = ValidationErrorCollector.from_config()
+    if plan is not None:
+        try:
+            validation_errors, references = plan.validate(
+                object_data, max_errors=collector.remaining
+            )
+        except UnsupportedSchemaError:
+            pass  # use the validator and data walker below
+        else:
+            collector.collect(validation_errors)
+            report_validation_errors(collector)
+            return _visit_references(resource_reference_visitor, references)
 
-def validate_object(
-    object_version: OntologyObjectVersion, type_version: OntologyObjectTypeVersion
-):
     # validate against object type schema
-    validate_object_against_schema(object_version.data, type_version)
+    validate_object_against_schema(object_data, type_version, collector)
 
     # setup schema walker
-    resource_reference_visitor = ResourceReferenceVisitor(
-        restrict_to_namespace=type_version.ontology_type.namespace_id,
-    )
-    walker = DataWalker(
-        object_version.data,
+    data_walker = DataWalker(
+        object_data,
         SchemaWalker(type_version.data, resolve_type_version_schema_url),
         visitors=[resource_reference_visitor],
     )
 
     # walk schema to validate and extract references
-    walker.walk()  # FIXME add proper error reporting for api client
+    try:
+        data_walker.walk()
+    except DataWalkerException:
+        pass  # errors are reported together with the missing references
+    return data_walker.errors
+
+
+def _collect_reference_errors(
+    object_data: Any,
+    type_version: OntologyObjectTypeVersion,
+    resource_reference_visitor: ResourceReferenceVisitor,
+) -> List[Tuple[Optional[SchemaWalker], Exception, Any, Any]]:
+    # only extract the references (the data is not validated again)
+    plan = TYPE_VERSION_VALIDATORS.get_plan(
+        type_version,
+        resolve_url=resolve_type_version_schema_url,
+        match=is_resource_reference,
+    )
+    if plan is not None:
+        try:
+            references = plan.collect_matches(object_data)
+        except UnsupportedSchemaError:
+            pass  # use the data walker below
+        else:
+            return _visit_references(resource_reference_visitor, references)
+
+    data_walker = DataWalker(
+        object_data,
+        SchemaWalker(type_version.data, resolve_type_version_schema_url),
+        visitors=[resource_reference_visitor],
+    )
+    try:
+        data_walker.walk()
+    except DataWalkerException:
+        pass  # errors are reported together with the missing references
+    return data_walker.errors
+
+
+def _get_object_metadata(
+    resource_reference_visitor: ResourceReferenceVisitor,
+    errors: List[Tuple[Optional[SchemaWalker], Exception, Any, Any]],
+) -> ObjectMetadata:
+    # check that all referenced resources exist
+    errors.extend(resource_reference_visitor.resolve_references())
+    if errors:  # FIXME add proper error reporting for api client
+        raise DataWalkerException(accumulated_errors=errors)
 
     # return extracted references
     return ObjectMetadata(
         referenced_objects=resource_reference_visitor.object_references,
         referenced_taxonomy_items=resource_reference_visitor.taxonomy_item_references,
     )
+
+
+def validate_object(
+    object_version: OntologyObjectVersion, type_version: OntologyObjectTypeVersion
+):
+    return validate_object_data(object_version.data, type_version)
+
+
+def validate_object_data(
+    object_data: Any, type_version: OntologyObjectTypeVersion
+) -> ObjectMetadata:
+    streamed = get_streamed_object_data(object_data, type_version)
+    if streamed is not None:
+        # data was already validated while the request body was read
+        resource_reference_visitor = streamed.resource_reference_visitor
+        errors: List[Tuple[Optional[SchemaWalker], Exception, Any, Any]] = []
+    else:
+        # load all imported schemas at once
+        TYPE_SCHEMAS.preload(type_version)
+
+        resource_reference_visitor = ResourceReferenceVisitor(
+            restrict_to_namespace=type_version.ontology_type.namespace_id,
+        )
+        errors = _collect_object_data_errors(
+            object_data, type_version, resource_reference_visitor
+        )
+    return _get_object_metadata(resource_reference_visitor, errors)
+
+
+def extract_object_references(
+    object_data: Any, type_version: OntologyObjectTypeVersion
+) -> ObjectMetadata:
+    """Extract and check the resource references of data that is valid against the type version.
+
+    Unlike ``validate_object_data`` the data is not validated against the schema.
+    """
+    resource_reference_visitor = ResourceReferenceVisitor(
+        restrict_to_namespace=type_version.ontology_type.namespace_id,
+    )
+    errors = _collect_reference_errors(
+        object_data, type_version, resource_reference_visitor
+    )
+    return _get_object_metadata(resource_reference_visitor, errors)
+
+
+@dataclass
+class StreamedObjectData:
+    """Object data that was validated while the request body was read."""
+
+    type_version_id: int
+    data: Any
+    resource_reference_visitor: ResourceReferenceVisitor
+
+
+class StreamingObjectValidator:
+    """Validate the members of the object data while the request body is read.
+
+    The request is aborted as soon as the maximum number of validation errors
+    is reached (or after all members were read), the rest of the body is not read.
+    """
+
+    def __init__(
+        self, type_version: OntologyObjectTypeVersion, plan: Optional[ValidationPlan]
+    ) -> None:
+        self.type_version = type_version
+        self.plan = plan
+        self.member_count = 0
+        self.collector = ValidationErrorCollector.from_config()
+        self.resource_reference_visitor = ResourceReferenceVisitor(
+            restrict_to_namespace=type_version.ontology_type.namespace_id,
+        )
+
+    def __call__(
+        self, path: Tuple[str, ...], key: Union[str, int], value: Any, container_type: str
+    ) -> None:
+        if self.plan is None:
+            return
+        self.member_count += 1
+        try:
+            validation_errors, references = self.plan.validate_member(
+                key, value, container_type, max_errors=self.collector.remaining
+            )
+        except UnsupportedSchemaError:
+            self.plan = None  # validate the complete data after reading the body
+            return
+        self._check(validation_errors, references)
+
+    def _check(
+        self,
+        validation_errors: List[ValidationError],
+        references: List[Tuple[Any, SchemaWalker]],
+        is_complete: bool = False,
+    ):
+        if self.collector.collect(validation_errors) or is_complete:
+            report_validation_errors(self.collector)
+        errors = _visit_references(self.resource_reference_visitor, references)
+        if errors:  # FIXME add proper error reporting for api client
+            raise DataWalkerException(accumulated_errors=errors)
+
+    def finish(self, body: Any) -> Optional[StreamedObjectData]:
+        """Validate the object data itself after all its members were validated."""
+        if self.plan is None or not isinstance(body, dict):
+            return None
+        data = body.get("data")
+        if not isinstance(data, (dict, list)) or len(data) != self.member_count:
+            return None  # members were not (only) validated while reading the body
+        self._check(
+            *self.plan.validate_root(data, max_errors=self.collector.remaining),
+            is_complete=True,
+        )
+        return StreamedObjectData(
+            type_version_id=self.type_version.id,
+            data=data,
+            resource_reference_visitor=self.resource_reference_visitor,
+        )
+
+
+def _is_streamed_request() -> bool:
+    min_size = current_app.config.get("OBJECT_STREAMING_VALIDATION_MIN_SIZE")
+    if min_size is None or not request.is_json:
+        return False
+    return request.content_length is None or request.content_length >= min_size
+
+
+def read_streamed_object_body(type_version: Optional[OntologyObjectTypeVersion]):
+    """Read the request body and validate its object data while reading it.
+
+    The parsed body is used by the argument parser of the view and the
+    validated object data by ``validate_object``.
+    """
+    validator: Optional[StreamingObjectValidator] = None
+    if type_version is not None:
+        # load all imported schemas at once
+        TYPE_SCHEMAS.preload(type_version)
+        plan = TYPE_VERSION_VALIDATORS.get_plan(
+            type_version,
+            resolve_url=resolve_type_version_schema_url,
+            match=is_resource_reference,
+        )
+        validator = StreamingObjectValidator(type_version, plan)
+
+    reader = JsonStreamReader(
+        request.stream, streamed_path=("data",), on_member=validator
+    )
+    try:
+        body = reader.read()
+    except (JSONDecodeError, UnicodeDecodeError):
+        abort(HTTPStatus.BAD_REQUEST, message=gettext("Invalid JSON body."))
+    request.environ[STREAMED_JSON_ENVIRON_KEY] = body
+
+    if validator is not None:
+        streamed = validator.finish(body)
+        if streamed is not None:
+            request.environ[STREAMED_OBJECT_DATA_ENVIRON_KEY] = streamed
+
+
+def get_streamed_object_data(
+    object_data: Any, type_version: OntologyObjectTypeVersion
+) -> Optional[StreamedObjectData]:
+    """Get the validation result of the object data if it was validated while streaming."""
+    if not has_request_context():
+        return None
+    streamed: Optional[StreamedObjectData] = request.environ.get(
+        STREAMED_OBJECT_DATA_ENVIRON_KEY
+    )
+    if streamed is None or streamed.type_version_id != type_version.id:
+        return None
+    if streamed.data is not object_data:
+        return None
+    return streamed
+
+
+def run_view_check(check: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run the checks of a view unless they already ran before the body was streamed."""
+    if has_request_context() and VIEW_CHECK_RESULT_ENVIRON_KEY in request.environ:
+        return request.environ.pop(VIEW_CHECK_RESULT_ENVIRON_KEY)
+    return check(*args, **kwargs)
+
+
+def stream_object_data(
+    check: Callable[..., Any],
+    get_type_version: Callable[[Any], Optional[OntologyObjectTypeVersion]],
+):
+    """Decorator validating the object data of large request bodies while they are read.
+
+    Apply the decorator above the arguments decorator of the request body.
+    ``check`` is called with the arguments of the view before the body is read
+    and must perform the same checks as the view (including the authorization
+    of the current user). The view gets its result with ``run_view_check``
+    instead of repeating the checks. ``get_type_version`` gets the type version
+    of the object data from the result.
+
+    Only the direct members of the object data are validated while the body is
+    read. A nested value (e.g. a large array inside a member) is read
+    completely before its member is validated.
+    """
+
+    @API_V1.require_jwt("jwt")
+    def run_authorized_check(*args, **kwargs) -> Any:
+        if g.get("current_user") is None:
+            return None  # the view handles the missing authentication
+        return check(*args, **kwargs)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _is_streamed_request():
+                type_version: Optional[OntologyObjectTypeVersion] = None
+                checked = run_authorized_check(*args, **kwargs)
+                if checked is not None:
+                    request.environ[VIEW_CHECK_RESULT_ENVIRON_KEY] = checked
+                    type_version = get_type_version(checked)
+                read_streamed_object_body(type_version)
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
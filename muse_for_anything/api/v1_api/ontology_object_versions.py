@@ -16,6 +16,7 @@ from muse_for_anything.api.pagination_util import (
     prepare_pagination_query_args,
 )
 from muse_for_anything.api.v1_api.constants import (
+    OBJECT_REL_TYPE,
     OBJECT_VERSION_EXTRA_LINK_RELATIONS,
     OBJECT_VERSION_PAGE_EXTRA_LINK_RELATIONS,
     OBJECT_VERSION_REL_TYPE,
@@ -25,6 +26,7 @@ from muse_for_anything.api.v1_api.request_helpers import (
     LinkGenerator,
     PageResource,
 )
+from muse_for_anything.api.v1_api.response_cache import IMMUTABLE_RESPONSES
 from muse_for_anything.oso_helpers import FLASK_OSO, OsoResource
 
 from ...db.db import DB
@@ -232,12 +234,29 @@ class ObjectVersionView(MethodView):
     def get(self, namespace: str, object_id: str, version: str, **kwargs: Any):
         """Get a specific version of an object."""
         self._check_path_params(namespace=namespace, object_id=object_id, version=version)
+
+        cache_key = IMMUTABLE_RESPONSES.get_key(
+            OBJECT_VERSION_REL_TYPE,
+            (OBJECT_REL_TYPE, object_id),
+            namespace,
+            object_id,
+            version,
+        )
+        cached_response = IMMUTABLE_RESPONSES.get_response(cache_key)
+        if cached_response is not None:
+            return cached_response
+
         found_object_version: OntologyObjectVersion = self._get_object_version(
             namespace=namespace, object_id=object_id, version=version
         )
 
         FLASK_OSO.authorize_and_set_resource(found_object_version)
 
-        return ApiResponseGenerator.get_api_response(
-            found_object_version, link_to_relations=OBJECT_VERSION_EXTRA_LINK_RELATIONS
+        return IMMUTABLE_RESPONSES.cache_response(
+            cache_key,
+            ApiResponseGenerator.get_api_response(
+                found_object_version,
+                link_to_relations=OBJECT_VERSION_EXTRA_LINK_RELATIONS,
+            ),
+            schema=DynamicApiResponseSchema(ObjectSchema()),
         )
@@ -2,7 +2,7 @@
 
 from datetime import datetime, timezone
 from http import HTTPStatus
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 
 from flask.globals import g
 from flask.views import MethodView
@@ -18,6 +18,12 @@ from muse_for_anything.api.pagination_util import (
     generate_page_links,
     prepare_pagination_query_args,
 )
+from muse_for_anything.api.v1_api.conditional_requests import (
+    ResourceValidator,
+    check_if_match,
+    check_not_modified,
+    get_resource_validator,
+)
 from muse_for_anything.api.v1_api.constants import (
     CHANGED_REL,
     CREATE,
@@ -35,12 +41,17 @@ from muse_for_anything.api.v1_api.constants import (
     UPDATE,
     UPDATE_REL,
 )
-from muse_for_anything.api.v1_api.ontology_object_validation import validate_object
+from muse_for_anything.api.v1_api.ontology_object_validation import (
+    run_view_check,
+    stream_object_data,
+    validate_object,
+)
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiResponseGenerator,
     LinkGenerator,
     PageResource,
 )
+from muse_for_anything.api.v1_api.response_cache import IMMUTABLE_RESPONSES
 from muse_for_anything.db.models.object_relation_tables import (
     OntologyObjectVersionToObject,
     OntologyObjectVersionToTaxonomyItem,
@@ -325,14 +336,12 @@ class ObjectsView(MethodView):
             link_to_relations=OBJECT_PAGE_EXTRA_LINK_RELATIONS,
         )
 
-    @API_V1.arguments(ObjectsCursorPageArgumentsSchema, location="query", as_kwargs=True)
-    @API_V1.arguments(ObjectSchema())
-    @API_V1.response(200, DynamicApiResponseSchema(NewApiObjectSchema()))
-    @API_V1.require_jwt("jwt")
-    def post(self, data, namespace: str, **kwargs):
-        """Create a new object."""
+    def _check_create(
+        self, namespace: str, type_id: Optional[str]
+    ) -> Tuple[Namespace, OntologyObjectType]:
+        """Check that the current user can create an object of the given type."""
         self._check_path_params(namespace=namespace)
-        self._check_type_param(type_id=kwargs.get("type_id"))
+        self._check_type_param(type_id=type_id)
 
         found_namespace = self._get_namespace(namespace=namespace)
         if found_namespace.deleted_on is not None:
@@ -344,9 +353,7 @@ class ObjectsView(MethodView):
                 ),
             )
 
-        found_object_type = self._get_ontology_type(
-            namespace=namespace, type_id=kwargs.get("type_id")
-        )
+        found_object_type = self._get_ontology_type(namespace=namespace, type_id=type_id)
         if found_object_type.deleted_on is not None:
             # cannot modify deleted object type!
             abort(
@@ -380,6 +387,23 @@ class ObjectsView(MethodView):
             ),
             action=CREATE,
         )
+        return found_namespace, found_object_type
+
+    @API_V1.arguments(ObjectsCursorPageArgumentsSchema, location="query", as_kwargs=True)
+    @stream_object_data(
+        lambda view, namespace, **kwargs: view._check_create(
+            namespace, kwargs.get("type_id")
+        ),
+        lambda checked: checked[1].current_version,
+    )
+    @API_V1.arguments(ObjectSchema())
+    @API_V1.response(200, DynamicApiResponseSchema(NewApiObjectSchema()))
+    @API_V1.require_jwt("jwt")
+    def post(self, data, namespace: str, **kwargs):
+        """Create a new object."""
+        found_namespace, found_object_type = run_view_check(
+            self._check_create, namespace, kwargs.get("type_id")
+        )
 
         name = data.get("name")
         description = data.get("description", "")
@@ -512,6 +536,9 @@ class ObjectView(MethodView):
                 ),
             )
 
+    def _get_validator(self, object: OntologyObject) -> ResourceValidator:
+        return get_resource_validator(object, object.namespace, object.ontology_type)
+
     @API_V1.response(200, DynamicApiResponseSchema(ObjectSchema()))
     @API_V1.require_jwt("jwt")
     def get(self, namespace: str, object_id: str, **kwargs: Any):
@@ -522,17 +549,22 @@ class ObjectView(MethodView):
         )
         FLASK_OSO.authorize_and_set_resource(found_object)
 
+        validator = self._get_validator(found_object)
+        not_modified = check_not_modified(validator)
+        if not_modified is not None:
+            return not_modified
+
         # TODO embed referenced objects, types and taxonomies?
 
-        return ApiResponseGenerator.get_api_response(
-            found_object, link_to_relations=OBJECT_EXTRA_LINK_RELATIONS
+        return (
+            ApiResponseGenerator.get_api_response(
+                found_object, link_to_relations=OBJECT_EXTRA_LINK_RELATIONS
+            ),
+            validator.headers,
         )
 
-    @API_V1.arguments(ObjectSchema())
-    @API_V1.response(200, DynamicApiResponseSchema(ChangedApiObjectSchema()))
-    @API_V1.require_jwt("jwt")
-    def put(self, data, namespace: str, object_id: str):
-        """Update object (creates a new version)."""
+    def _check_update(self, namespace: str, object_id: str) -> OntologyObject:
+        """Check that the current user can update the object."""
         self._check_path_params(namespace=namespace, object_id=object_id)
         found_object: OntologyObject = self._get_object(
             namespace=namespace, object_id=object_id
@@ -540,6 +572,19 @@ class ObjectView(MethodView):
         self._check_if_modifiable(found_object)
 
         FLASK_OSO.authorize_and_set_resource(found_object, action=UPDATE)
+        check_if_match(self._get_validator(found_object))
+        return found_object
+
+    @stream_object_data(
+        lambda view, namespace, object_id: view._check_update(namespace, object_id),
+        lambda checked: checked.ontology_type.current_version,
+    )
+    @API_V1.arguments(ObjectSchema())
+    @API_V1.response(200, DynamicApiResponseSchema(ChangedApiObjectSchema()))
+    @API_V1.require_jwt("jwt")
+    def put(self, data, namespace: str, object_id: str):
+        """Update object (creates a new version)."""
+        found_object = run_view_check(self._check_update, namespace, object_id)
 
         name = data.get("name")
         description = data.get("description", "")
@@ -580,6 +625,7 @@ class ObjectView(MethodView):
         DB.session.add(object_version)
         DB.session.add(found_object)
         DB.session.commit()
+        IMMUTABLE_RESPONSES.invalidate((OBJECT_REL_TYPE, object_id))
 
         object_response = ApiResponseGenerator.get_api_response(
             found_object, link_to_relations=OBJECT_EXTRA_LINK_RELATIONS
@@ -622,6 +668,7 @@ class ObjectView(MethodView):
             found_object.deleted_on = None
             DB.session.add(found_object)
             DB.session.commit()
+            IMMUTABLE_RESPONSES.invalidate((OBJECT_REL_TYPE, object_id))
 
         object_response = ApiResponseGenerator.get_api_response(
             found_object, link_to_relations=OBJECT_EXTRA_LINK_RELATIONS
@@ -655,6 +702,7 @@ class ObjectView(MethodView):
             namespace=namespace, object_id=object_id
         )
         self._check_if_namespace_and_type_modifiable(object=found_object)
+        check_if_match(self._get_validator(found_object))
 
         # only actually delete when not already deleted
         if found_object.deleted_on is None:
@@ -663,6 +711,7 @@ class ObjectView(MethodView):
             # TODO soft delete komposition objects (also implement undelete…)
             DB.session.add(found_object)
             DB.session.commit()
+            IMMUTABLE_RESPONSES.invalidate((OBJECT_REL_TYPE, object_id))
 
         object_response = ApiResponseGenerator.get_api_response(
             found_object, link_to_relations=OBJECT_EXTRA_LINK_RELATIONS
@@ -0,0 +1,287 @@
+"""Module containing the type revalidation task API endpoints of the v1 API.
+
+A revalidation task validates all objects of a type against a (new) version
+of the type in the background. The task resource reports the progress and
+the invalid objects of the task.
+"""
+
+from http import HTTPStatus
+from typing import List, Optional
+
+from flask import current_app, request, url_for
+from flask.views import MethodView
+from flask_babel import gettext
+from flask_smorest import abort
+
+from muse_for_anything.api.v1_api.constants import (
+    RESTORE_REL,
+    TYPE_REVALIDATION_REL_TYPE,
+    UP_REL,
+    UPDATE,
+)
+from muse_for_anything.api.v1_api.request_helpers import LinkGenerator
+from muse_for_anything.oso_helpers import FLASK_OSO
+
+from .models.ontology import (
+    ObjectRevalidationResultData,
+    ObjectRevalidationTaskCreateSchema,
+    ObjectRevalidationTaskData,
+    ObjectRevalidationTaskSchema,
+)
+from .object_revalidation import (
+    is_task_running,
+    is_task_stale,
+    start_revalidation_task,
+)
+from .root import API_V1
+from ..base_models import ApiLink, ApiResponse, DynamicApiResponseSchema
+from ...db.db import DB
+from ...db.models.ontology_objects import OntologyObjectType, OntologyObjectTypeVersion
+from ...db.models.revalidation import REVALIDATION_RUNNING, ObjectRevalidationTask
+
+# import type specific generators to load them
+from .generators import type as type_  # noqa
+from .generators import type_version  # noqa
+
+# the maximum number of invalid objects included in the task resource
+MAX_REPORTED_INVALID_OBJECTS = 100
+
+
+def _check_path_params(namespace: str, object_type: str, task_id: Optional[str] = None):
+    if not namespace or not namespace.isdigit():
+        abort(
+            HTTPStatus.BAD_REQUEST,
+            message=gettext("The requested namespace id has the wrong format!"),
+        )
+    if not object_type or not object_type.isdigit():
+        abort(
+            HTTPStatus.BAD_REQUEST,
+            message=gettext("The requested type id has the wrong format!"),
+        )
+    if task_id is not None and not task_id.isdigit():
+        abort(
+            HTTPStatus.BAD_REQUEST,
+            message=gettext("The requested revalidation task id has the wrong format!"),
+        )
+
+
+def _get_object_type(namespace: str, object_type: str) -> OntologyObjectType:
+    found_object_type: Optional[OntologyObjectType] = OntologyObjectType.query.filter(
+        OntologyObjectType.id == int(object_type),
+        OntologyObjectType.namespace_id == int(namespace),
+    ).first()
+
+    if found_object_type is None:
+        abort(HTTPStatus.NOT_FOUND, message=gettext("Object Type not found."))
+    return found_object_type  # is not None because abort raises exception
+
+
+def _get_task(object_type: OntologyObjectType, task_id: str) -> ObjectRevalidationTask:
+    found_task: Optional[ObjectRevalidationTask] = ObjectRevalidationTask.query.filter(
+        ObjectRevalidationTask.id == int(task_id),
+        ObjectRevalidationTask.object_type_id == object_type.id,
+    ).first()
+
+    if found_task is None:
+        abort(HTTPStatus.NOT_FOUND, message=gettext("Revalidation task not found."))
+    return found_task  # is not None because abort raises exception
+
+
+def _get_task_link(task: ObjectRevalidationTask, *extra_rels: str) -> ApiLink:
+    return ApiLink(
+        href=url_for(
+            "api-v1.TypeRevalidationView",
+            namespace=str(task.ontology_type.namespace_id),
+            object_type=str(task.object_type_id),
+            task_id=str(task.id),
+            _external=True,
+        ),
+        rel=extra_rels,
+        resource_type=TYPE_REVALIDATION_REL_TYPE,
+        resource_key={
+            "namespaceId": str(task.ontology_type.namespace_id),
+            "typeId": str(task.object_type_id),
+            "revalidationId": str(task.id),
+        },
+    )
+
+
+def _get_task_data(
+    task: ObjectRevalidationTask, include_invalid_objects: bool = True
+) -> ObjectRevalidationTaskData:
+    invalid_objects: List[ObjectRevalidationResultData] = []
+    if include_invalid_objects:
+        invalid_objects = [
+            ObjectRevalidationResultData(
+                object_id=result.object_id,
+                object_version_id=result.object_version_id,
+                errors=result.errors,
+            )
+            for result in task.get_invalid_results(limit=MAX_REPORTED_INVALID_OBJECTS)
+        ]
+    return ObjectRevalidationTaskData(
+        self=_get_task_link(task),
+        created_on=task.created_on,
+        updated_on=task.updated_on,
+        type_version=task.type_version.version,
+        create_versions=task.create_versions,
+        status=task.status,
+        message=task.message,
+        progress=task.progress,
+        objects_total=task.objects_total,
+        objects_checked=task.objects_checked,
+        objects_valid=task.objects_valid,
+        objects_invalid=task.objects_invalid,
+        versions_created=task.versions_created,
+        finished_on=task.finished_on,
+        invalid_objects=invalid_objects,
+    )
+
+
+def _get_task_links(task: ObjectRevalidationTask) -> List[ApiLink]:
+    links = [
+        LinkGenerator.get_link_of(task.ontology_type, extra_relations=(UP_REL,)),
+        LinkGenerator.get_link_of(task.type_version),
+    ]
+    if not task.is_finished:
+        links.append(_get_task_link(task, RESTORE_REL))
+    return [link for link in links if link is not None]
+
+
+def _start_task(task: ObjectRevalidationTask):
+    # remote schema urls of the type versions are resolved against the current url
+    start_revalidation_task(
+        current_app._get_current_object(), task.id, base_url=request.url_root
+    )
+
+
+@API_V1.route("/namespaces/<string:namespace>/types/<string:object_type>/revalidations/")
+class TypeRevalidationsView(MethodView):
+    """Endpoint for all revalidation tasks of a type."""
+
+    @API_V1.response(200, DynamicApiResponseSchema(ObjectRevalidationTaskSchema()))
+    @API_V1.require_jwt("jwt")
+    def get(self, namespace: str, object_type: str):
+        """Get all revalidation tasks of a type (newest first)."""
+        _check_path_params(namespace=namespace, object_type=object_type)
+        found_object_type = _get_object_type(namespace=namespace, object_type=object_type)
+        FLASK_OSO.authorize_and_set_resource(found_object_type)
+
+        tasks: List[ObjectRevalidationTask] = (
+            ObjectRevalidationTask.query.filter(
+                ObjectRevalidationTask.object_type_id == found_object_type.id
+            )
+            .order_by(ObjectRevalidationTask.id.desc())
+            .all()
+        )
+
+        up_link = LinkGenerator.get_link_of(found_object_type, extra_relations=(UP_REL,))
+        return ApiResponse(
+            links=[up_link] if up_link is not None else [],
+            data=[_get_task_data(task, include_invalid_objects=False) for task in tasks],
+        )
+
+    @API_V1.arguments(ObjectRevalidationTaskCreateSchema())
+    @API_V1.response(200, DynamicApiResponseSchema(ObjectRevalidationTaskSchema()))
+    @API_V1.require_jwt("jwt")
+    def post(self, data, namespace: str, object_type: str):
+        """Revalidate all objects of the type against a type version.
+
+        Objects whose current version already uses the type version are skipped.
+        """
+        _check_path_params(namespace=namespace, object_type=object_type)
+        found_object_type = _get_object_type(namespace=namespace, object_type=object_type)
+        if found_object_type.deleted_on is not None:
+            abort(
+                HTTPStatus.CONFLICT,
+                message=gettext(
+                    "Object type is marked as deleted and objects of that type cannot be modified further."
+                ),
+            )
+        FLASK_OSO.authorize_and_set_resource(found_object_type, action=UPDATE)
+
+        create_versions: bool = data.get("create_versions", False)
+        if create_versions and not FLASK_OSO.is_admin():
+            # new versions are created for objects of all users
+            abort(
+                HTTPStatus.FORBIDDEN,
+                message=gettext("Only admins can create new object versions."),
+            )
+
+        version: Optional[int] = data.get("type_version")
+        if version is None:
+            found_type_version = found_object_type.current_version
+        else:
+            found_type_version = OntologyObjectTypeVersion.query.filter(
+                OntologyObjectTypeVersion.object_type_id == found_object_type.id,
+                OntologyObjectTypeVersion.version == version,
+            ).first()
+        if found_type_version is None or found_type_version.deleted_on is not None:
+            abort(HTTPStatus.NOT_FOUND, message=gettext("Type version not found."))
+
+        task = ObjectRevalidationTask(
+            ontology_type=found_object_type,
+            type_version=found_type_version,
+            create_versions=create_versions,
+        )
+        DB.session.add(task)
+        DB.session.commit()
+
+        _start_task(task)
+
+        return ApiResponse(
+            links=_get_task_links(task),
+            data=_get_task_data(task),
+        )
+
+
+@API_V1.route(
+    "/namespaces/<string:namespace>/types/<string:object_type>/revalidations/<string:task_id>/"
+)
+class TypeRevalidationView(MethodView):
+    """Endpoint for a single revalidation task of a type."""
+
+    @API_V1.response(200, DynamicApiResponseSchema(ObjectRevalidationTaskSchema()))
+    @API_V1.require_jwt("jwt")
+    def get(self, namespace: str, object_type: str, task_id: str):
+        """Get the progress and the invalid objects of a revalidation task."""
+        _check_path_params(namespace=namespace, object_type=object_type, task_id=task_id)
+        found_object_type = _get_object_type(namespace=namespace, object_type=object_type)
+        FLASK_OSO.authorize_and_set_resource(found_object_type)
+        found_task = _get_task(found_object_type, task_id)
+
+        return ApiResponse(
+            links=_get_task_links(found_task),
+            data=_get_task_data(found_task),
+        )
+
+    @API_V1.response(200, DynamicApiResponseSchema(ObjectRevalidationTaskSchema()))
+    @API_V1.require_jwt("jwt")
+    def post(self, namespace: str, object_type: str, task_id: str):  # resume action
+        """Resume an interrupted revalidation task."""
+        _check_path_params(namespace=namespace, object_type=object_type, task_id=task_id)
+        found_object_type = _get_object_type(namespace=namespace, object_type=object_type)
+        FLASK_OSO.authorize_and_set_resource(found_object_type, action=UPDATE)
+        found_task = _get_task(found_object_type, task_id)
+
+        if found_task.create_versions and not FLASK_OSO.is_admin():
+            abort(
+                HTTPStatus.FORBIDDEN,
+                message=gettext("Only admins can create new object versions."),
+            )
+
+        # only actually resume when the task is not finished or still running
+        if not found_task.is_finished and not is_task_running(found_task.id):
+            if found_task.status == REVALIDATION_RUNNING and not is_task_stale(
+                found_task
+            ):
+                abort(
+                    HTTPStatus.CONFLICT,
+                    message=gettext("The revalidation task is still running."),
+                )
+            _start_task(found_task)
+
+        return ApiResponse(
+            links=_get_task_links(found_task),
+            data=_get_task_data(found_task),
+        )
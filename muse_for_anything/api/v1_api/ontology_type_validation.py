@@ -1,13 +1,13 @@
 """Module containing validation functions for object types."""
 
 from dataclasses import dataclass
-from http import HTTPStatus
+from functools import lru_cache
 from typing import Any, Callable, Deque, Dict, Optional, Sequence, Set, Tuple
 from urllib.parse import urlparse
 
+from flask import current_app
 from flask.globals import request_ctx
 from flask_babel import gettext
-from flask_smorest import abort
 from jsonschema import Draft7Validator
 from werkzeug.routing import MapAdapter
 
@@ -20,6 +20,8 @@ from muse_for_anything.db.models.taxonomies import Taxonomy
 
 from ..json_schema import DataVisitorException, DataWalker, DataWalkerVisitor
 from .models.schema import TYPE_SCHEMA
+from .validation_errors import VALIDATION_LOGGER, ValidationErrorCollector
+from ...util.logging import get_logger
 
 SCHEMA_VALIDATOR = Draft7Validator(TYPE_SCHEMA)
 
@@ -35,21 +37,82 @@ class SchemaMetadata:
 
 
 def validate_against_type_schema(schema: Any):
-    # FIXME add proper error reporting for api client
-    validation_errors = []
-    for error in sorted(SCHEMA_VALIDATOR.iter_errors(schema), key=str):
-        print("VALIDATION ERROR", error.message)
-        validation_errors.append(error)
-    if validation_errors:
-        abort(
-            HTTPStatus.BAD_REQUEST,
-            message=gettext("The object type does not conform to the json schema!"),
-            # errors=validation_errors,
-        )
+    collector = ValidationErrorCollector.from_config()
+    # errors are generated lazily, stop after the maximum number of errors
+    collector.collect(SCHEMA_VALIDATOR.iter_errors(schema))
+    collector.abort_if_invalid(
+        message=gettext("The object type does not conform to the json schema!")
+    )
+
+
+# the definition of the type schema matching a type definition (by json type)
+TYPE_DEFINITION_REFS: Dict[str, str] = {
+    "boolean": "#/definitions/boolean",
+    "integer": "#/definitions/integer",
+    "number": "#/definitions/number",
+    "string": "#/definitions/string",
+}
+
+
+def _get_array_definition_ref(data: Dict[str, Any]) -> str:
+    if data.get("arrayType") == "tuple":
+        return "#/definitions/tuple"
+    return "#/definitions/array"
+
+
+def _get_object_definition_ref(data: Dict[str, Any]) -> str:
+    if data.get("customType") == "resourceReference":
+        return "#/definitions/resourceReference"
+    return "#/definitions/object"
+
+
+# the definition getters of json types with multiple type schema definitions
+TYPE_DEFINITION_REF_GETTERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "array": _get_array_definition_ref,
+    "object": _get_object_definition_ref,
+}
+
+
+def _get_typed_definition_ref(data: Dict[str, Any]) -> Optional[str]:
+    data_type = data["type"]
+    if isinstance(data_type, str):
+        data_type = (data_type,)
+    for json_type, ref in TYPE_DEFINITION_REFS.items():
+        if json_type in data_type:
+            return ref
+    for json_type, get_ref in TYPE_DEFINITION_REF_GETTERS.items():
+        if json_type in data_type:
+            return get_ref(data)
+    get_logger(current_app, VALIDATION_LOGGER).warning(
+        "Unknown type definition with the type %r.", data["type"]
+    )
+    return None
+
+
+def get_type_definition_ref(data: Any) -> Optional[str]:
+    """Get the ref of the type schema definition that applies to a type definition."""
+    if "type" in data:
+        return _get_typed_definition_ref(data)
+    if "enum" in data:
+        return "#/definitions/enum"
+    if "$ref" in data:
+        return "#/definitions/ref"
+    return None
 
 
 class TypeSchemaDataWalker(DataWalker):
-    """SchemaWalker for decending with the type schema."""
+    """SchemaWalker for decending with the type schema.
+
+    The walkers with the injected schema ref of a type definition only depend
+    on the resolved schema of the type definition walker and the injected ref.
+    They are built once and shared by all walks (their path is the path of the
+    first type definition they were built for).
+    """
+
+    __slots__ = tuple()
+
+    # injected walkers by resolved schemas of the typeDefinition walker and ref
+    _injected_walkers: Dict[Tuple[Tuple[Tuple[str, int], ...], str], SchemaWalker] = {}
 
     def __init__(
         self,
@@ -68,6 +131,19 @@ class TypeSchemaDataWalker(DataWalker):
             path=walker.path,
         )
 
+    def _get_injected_walker(
+        self, walker: SchemaWalker, inject_schema_ref: str
+    ) -> SchemaWalker:
+        if walker.cache.get("ROOT") is not TYPE_SCHEMA:
+            # only walkers of the (immutable) type schema can be shared
+            return self._copy_walker(walker, inject_schema_ref)
+        key = (tuple((a, id(s)) for a, s in walker.resolved_schema), inject_schema_ref)
+        injected_walker = self._injected_walkers.get(key)
+        if injected_walker is None:
+            injected_walker = self._copy_walker(walker, inject_schema_ref)
+            self._injected_walkers[key] = injected_walker
+        return injected_walker
+
     def transform_decend_step(
         self, step: Tuple[Any, SchemaWalker]
     ) -> Tuple[Any, SchemaWalker]:
@@ -76,38 +152,9 @@ class TypeSchemaDataWalker(DataWalker):
         if walker.secondary_type_resolved == "typeDefinition":
             # typeDefinitions use "oneOf" which is not supported by default
             # this transformation manually applies the correct schema
-            if "type" in data:
-                data_type = data["type"]
-                if isinstance(data_type, str):
-                    data_type = (data_type,)
-                if "boolean" in data_type:
-                    return data, self._copy_walker(walker, "#/definitions/boolean")
-                elif "integer" in data_type:
-                    return data, self._copy_walker(walker, "#/definitions/integer")
-                elif "number" in data_type:
-                    return data, self._copy_walker(walker, "#/definitions/number")
-                elif "string" in data_type:
-                    return data, self._copy_walker(walker, "#/definitions/string")
-                elif "array" in data_type:
-                    if data.get("arrayType") == "tuple":
-                        return data, self._copy_walker(walker, "#/definitions/tuple")
-                    else:
-                        return data, self._copy_walker(walker, "#/definitions/array")
-                elif "object" in data_type:
-                    # print(data)
-                    if "resourceReference" == data.get("customType"):
-                        return data, self._copy_walker(
-                            walker, "#/definitions/resourceReference"
-                        )
-                    else:
-                        return data, self._copy_walker(walker, "#/definitions/object")
-                else:
-                    # TODO extend this function for new type definitions
-                    print("Unknown type definition!")
-            elif "enum" in data:
-                return data, self._copy_walker(walker, "#/definitions/enum")
-            elif "$ref" in data:
-                return data, self._copy_walker(walker, "#/definitions/ref")
+            ref = get_type_definition_ref(data)
+            if ref is not None:
+                return data, self._get_injected_walker(walker, ref)
         return step
 
     def decend(
@@ -116,6 +163,12 @@ class TypeSchemaDataWalker(DataWalker):
         super().decend(data, walker, stack, transform_step=self.transform_decend_step)
 
 
+@lru_cache(maxsize=1)
+def get_type_schema_walker() -> SchemaWalker:
+    """Get the shared (memoizing) schema walker of the type schema."""
+    return SchemaWalker(TYPE_SCHEMA, lambda x: None)
+
+
 class RefVisitor(DataWalkerVisitor):
     """SchemaWalker visitor for validating and extracting json schema references ('$ref' attribute)."""
 
@@ -355,7 +408,7 @@ def validate_object_type(type_version: OntologyObjectTypeVersion) -> SchemaMetad
     )
     walker = TypeSchemaDataWalker(
         type_version.data,
-        SchemaWalker(TYPE_SCHEMA, lambda x: None),
+        get_type_schema_walker(),
         visitors=[ref_visitor, resource_reference_visitor],
     )
 
@@ -17,6 +17,7 @@ from muse_for_anything.api.pagination_util import (
     prepare_pagination_query_args,
 )
 from muse_for_anything.api.v1_api.constants import (
+    TYPE_REL_TYPE,
     TYPE_VERSION_EXTRA_LINK_RELATIONS,
     TYPE_VERSION_PAGE_EXTRA_LINK_RELATIONS,
     TYPE_VERSION_REL_TYPE,
@@ -26,6 +27,7 @@ from muse_for_anything.api.v1_api.request_helpers import (
     LinkGenerator,
     PageResource,
 )
+from muse_for_anything.api.v1_api.response_cache import IMMUTABLE_RESPONSES
 from muse_for_anything.oso_helpers import FLASK_OSO, OsoResource
 
 from .models.ontology import ObjectTypeSchema, ObjectTypeVersionsPageParamsSchema
@@ -241,6 +243,24 @@ class TypeVersionView(MethodView):
         self._check_path_params(
             namespace=namespace, object_type=object_type, version=version
         )
+
+        match = request.accept_mimetypes.best_match(
+            (JSON_MIMETYPE, JSON_SCHEMA_MIMETYPE),
+            default=JSON_MIMETYPE,
+        )
+
+        cache_key = IMMUTABLE_RESPONSES.get_key(
+            TYPE_VERSION_REL_TYPE,
+            (TYPE_REL_TYPE, object_type),
+            namespace,
+            object_type,
+            version,
+            mimetype=match,
+        )
+        cached_response = IMMUTABLE_RESPONSES.get_response(cache_key)
+        if cached_response is not None:
+            return cached_response
+
         found_object_type_version: OntologyObjectTypeVersion = (
             self._get_object_type_version(
                 namespace=namespace, object_type=object_type, version=version
@@ -249,17 +269,23 @@ class TypeVersionView(MethodView):
 
         FLASK_OSO.authorize_and_set_resource(found_object_type_version)
 
-        match = request.accept_mimetypes.best_match(
-            (JSON_MIMETYPE, JSON_SCHEMA_MIMETYPE),
-            default=JSON_MIMETYPE,
-        )
-
         if match == JSON_SCHEMA_MIMETYPE:
             # only return jsonschema if schema mimetype is requested
+            if cache_key is not None:
+                return IMMUTABLE_RESPONSES.cache_response(
+                    cache_key,
+                    found_object_type_version.data,
+                    mimetype=JSON_SCHEMA_MIMETYPE,
+                )
             response: Response = jsonify(found_object_type_version.data)
             response.mimetype = JSON_SCHEMA_MIMETYPE
             return response
 
-        return ApiResponseGenerator.get_api_response(
-            found_object_type_version, link_to_relations=TYPE_VERSION_EXTRA_LINK_RELATIONS
+        return IMMUTABLE_RESPONSES.cache_response(
+            cache_key,
+            ApiResponseGenerator.get_api_response(
+                found_object_type_version,
+                link_to_relations=TYPE_VERSION_EXTRA_LINK_RELATIONS,
+            ),
+            schema=DynamicApiResponseSchema(ObjectTypeSchema()),
         )
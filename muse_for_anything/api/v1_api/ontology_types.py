@@ -18,6 +18,12 @@ from muse_for_anything.api.pagination_util import (
     generate_page_links,
     prepare_pagination_query_args,
 )
+from muse_for_anything.api.v1_api.conditional_requests import (
+    ResourceValidator,
+    check_if_match,
+    check_not_modified,
+    get_resource_validator,
+)
 from muse_for_anything.api.v1_api.constants import (
     CHANGED_REL,
     CREATE,
@@ -39,6 +45,7 @@ from muse_for_anything.api.v1_api.request_helpers import (
     LinkGenerator,
     PageResource,
 )
+from muse_for_anything.api.v1_api.response_cache import IMMUTABLE_RESPONSES
 from muse_for_anything.db.models.users import User
 from muse_for_anything.oso_helpers import FLASK_OSO, OsoResource
 
@@ -367,6 +374,9 @@ class TypeView(MethodView):
                 ),
             )
 
+    def _get_validator(self, object_type: OntologyObjectType) -> ResourceValidator:
+        return get_resource_validator(object_type, object_type.namespace)
+
     @API_V1.response(200, DynamicApiResponseSchema(ObjectTypeSchema()))
     @API_V1.require_jwt("jwt")
     def get(self, namespace: str, object_type: str, **kwargs: Any):
@@ -377,10 +387,18 @@ class TypeView(MethodView):
         )
         FLASK_OSO.authorize_and_set_resource(found_object_type)
 
+        validator = self._get_validator(found_object_type)
+        not_modified = check_not_modified(validator)
+        if not_modified is not None:
+            return not_modified
+
         # TODO embed referenced types and taxonomies?
 
-        return ApiResponseGenerator.get_api_response(
-            found_object_type, link_to_relations=TYPE_EXTRA_LINK_RELATIONS
+        return (
+            ApiResponseGenerator.get_api_response(
+                found_object_type, link_to_relations=TYPE_EXTRA_LINK_RELATIONS
+            ),
+            validator.headers,
         )
 
     @API_V1.arguments(JSONSchemaSchema(unknown=INCLUDE))
@@ -395,6 +413,7 @@ class TypeView(MethodView):
         self._check_if_modifiable(found_object_type)
 
         FLASK_OSO.authorize_and_set_resource(found_object_type, action=UPDATE)
+        check_if_match(self._get_validator(found_object_type))
 
         object_type_version = OntologyObjectTypeVersion(
             ontology_type=found_object_type,
@@ -432,6 +451,7 @@ class TypeView(MethodView):
         DB.session.add(object_type_version)
         DB.session.add(found_object_type)
         DB.session.commit()
+        IMMUTABLE_RESPONSES.invalidate((TYPE_REL_TYPE, object_type))
 
         object_type_response = ApiResponseGenerator.get_api_response(
             found_object_type, link_to_relations=TYPE_EXTRA_LINK_RELATIONS
@@ -474,6 +494,7 @@ class TypeView(MethodView):
             found_object_type.deleted_on = None
             DB.session.add(found_object_type)
             DB.session.commit()
+            IMMUTABLE_RESPONSES.invalidate((TYPE_REL_TYPE, object_type))
 
         object_type_response = ApiResponseGenerator.get_api_response(
             found_object_type, link_to_relations=TYPE_EXTRA_LINK_RELATIONS
@@ -509,6 +530,7 @@ class TypeView(MethodView):
         self._check_if_namespace_modifiable(object_type=found_object_type)
 
         FLASK_OSO.authorize_and_set_resource(found_object_type)
+        check_if_match(self._get_validator(found_object_type))
 
         # only actually delete when not already deleted
         if found_object_type.deleted_on is None:
@@ -516,6 +538,7 @@ class TypeView(MethodView):
             found_object_type.deleted_on = datetime.now(timezone.utc)
             DB.session.add(found_object_type)
             DB.session.commit()
+            IMMUTABLE_RESPONSES.invalidate((TYPE_REL_TYPE, object_type))
 
         object_type_response = ApiResponseGenerator.get_api_response(
             found_object_type, link_to_relations=TYPE_EXTRA_LINK_RELATIONS
@@ -0,0 +1,205 @@
+"""Module containing a response cache for the immutable version resources.
+
+Versions of objects, types and taxonomy items never change after they are
+created. Only the deleted state of their parents (and the names of their
+parents in the embedded links) can change. The rendered responses are cached
+per (resource, permission fingerprint) and are invalidated by the endpoints
+changing the parents (delete, restore and update). Cached responses also
+expire after ``IMMUTABLE_RESPONSE_CACHE_TTL`` seconds, as the cache is per
+process and cannot see changes made by other workers.
+
+Cached responses carry a strong ETag and a short private ``max-age`` (the
+embedded links can still change). A request with a matching
+``If-None-Match`` header is answered with 304 before the resource is loaded.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha256
+from http import HTTPStatus
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from flask import Flask, Response, current_app, request
+from flask.globals import g
+from marshmallow import Schema
+
+from ...db.models.users import Guest, User
+from ...oso_helpers import FLASK_OSO
+
+# the scope of all cached responses (invalidated by namespace changes)
+ALL_SCOPES = "*"
+
+
+@dataclass(frozen=True)
+class ResponseCacheKey:
+    """Key of a cached response."""
+
+    resource_type: str
+    scope: Hashable
+    path: Tuple[str, ...]
+    generation: int
+    fingerprint: str
+    mimetype: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A rendered response body with its strong ETag."""
+
+    etag: str
+    body: bytes
+    mimetype: str
+    # the monotonic time the response was rendered at
+    created: float
+
+
+def permission_fingerprint(actor: Any) -> Optional[str]:
+    """Get a fingerprint of everything the authorization of the actor depends on.
+
+    The fingerprint contains the roles and all resource grants (including the
+    owner grants) of the user.
+
+    Returns None for actors that cannot be fingerprinted.
+    """
+    if isinstance(actor, Guest):
+        return "guest"
+    if isinstance(actor, User) and actor.id is not None:
+        roles = ",".join(sorted(role.role for role in actor.roles))
+        grants = ",".join(
+            sorted(
+                f"{role}:{resource_type}:{resource_id}"
+                for role, resource_type, resource_id in actor.grant_index
+            )
+        )
+        grants_hash = sha256(grants.encode()).hexdigest()[:16]
+        return f"user:{actor.id}:{roles}:{grants_hash}"
+    return None
+
+
+class ImmutableResponseCache:
+    """LRU cache of rendered responses of immutable resources."""
+
+    def __init__(self) -> None:
+        self.enabled = True
+        self.max_entries = 5_000
+        self.ttl = 300
+        self.max_age = 60
+        self._responses: "OrderedDict[ResponseCacheKey, CachedResponse]" = OrderedDict()
+        self._generations: Dict[Hashable, int] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def init_app(self, app: Flask):
+        self.enabled = app.config.get("IMMUTABLE_RESPONSE_CACHE_ENABLED", True)
+        self.max_entries = app.config.get(
+            "IMMUTABLE_RESPONSE_CACHE_MAX_ENTRIES", self.max_entries
+        )
+        self.ttl = app.config.get("IMMUTABLE_RESPONSE_CACHE_TTL", self.ttl)
+        self.max_age = app.config.get("IMMUTABLE_RESPONSE_MAX_AGE", self.max_age)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+            self._generations.clear()
+
+    def invalidate(self, scope: Hashable = ALL_SCOPES):
+        """Invalidate all cached responses of the scope (or all responses)."""
+        if scope == ALL_SCOPES:
+            self.clear()
+            return
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def get_key(
+        self,
+        resource_type: str,
+        scope: Hashable,
+        *path: str,
+        mimetype: Optional[str] = None,
+    ) -> Optional[ResponseCacheKey]:
+        """Get the cache key of a response for the current user.
+
+        Returns None if the response cannot be cached.
+        """
+        if not self.enabled:
+            return None
+        fingerprint = permission_fingerprint(g.get("current_user"))
+        if fingerprint is None:
+            return None
+        with self._lock:
+            generation = self._generations.get(scope, 0)
+        return ResponseCacheKey(
+            resource_type=resource_type,
+            scope=scope,
+            path=tuple(path),
+            generation=generation,
+            fingerprint=fingerprint,
+            mimetype=mimetype,
+        )
+
+    def get_response(self, key: Optional[ResponseCacheKey]) -> Optional[Response]:
+        """Get the cached response (or a 304 response) for the key."""
+        if key is None:
+            return None
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None and monotonic() - cached.created > self.ttl:
+                del self._responses[key]
+                cached = None
+            if cached is None:
+                self.misses += 1
+                return None
+            self._responses.move_to_end(key)
+            self.hits += 1
+        # the cached response was authorized for the same permission fingerprint
+        FLASK_OSO.skip_authorization()
+        return self._make_response(cached)
+
+    def cache_response(
+        self,
+        key: Optional[ResponseCacheKey],
+        api_response: Any,
+        schema: Optional[Schema] = None,
+        mimetype: Optional[str] = None,
+    ) -> Any:
+        """Render and cache the api response.
+
+        Returns the api response unchanged if it cannot be cached.
+        """
+        if key is None or api_response is None:
+            return api_response
+        data = schema.dump(api_response) if schema is not None else api_response
+        rendered: Response = current_app.json.response(data)
+        body = rendered.get_data()
+        cached = CachedResponse(
+            etag=sha256(body).hexdigest()[:32],
+            body=body,
+            mimetype=mimetype or rendered.mimetype,
+            created=monotonic(),
+        )
+        with self._lock:
+            self._responses[key] = cached
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+        return self._make_response(cached)
+
+    def _make_response(self, cached: CachedResponse) -> Response:
+        if cached.etag in request.if_none_match:
+            self.not_modified += 1
+            response = Response(status=HTTPStatus.NOT_MODIFIED)
+        else:
+            response = Response(cached.body, mimetype=cached.mimetype)
+        response.set_etag(cached.etag)
+        response.cache_control.private = True
+        response.cache_control.max_age = self.max_age
+        response.vary.update(("Authorization", "Accept"))
+        return response
+
+
+IMMUTABLE_RESPONSES = ImmutableResponseCache()
@@ -0,0 +1,182 @@
+"""Module containing a process wide store of type version schemas.
+
+Type version schemas are immutable and referenced by the url of their type
+version resource. The store maps these urls to (type id, version) keys and
+the keys to the schemas, so that resolving a remote ``$ref`` (for jsonschema
+validation and for the ``SchemaWalker``) does not need a database query.
+
+``preload`` loads the schemas of all type versions imported (transitively)
+by a type version with a single query.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Tuple
+from urllib.parse import urlparse
+
+from flask import Flask
+from flask.globals import request_ctx
+from sqlalchemy.sql.expression import select
+from werkzeug.routing import MapAdapter
+
+from ..json_schema import DataVisitorException
+from ...db.db import DB
+from ...db.models.object_relation_tables import OntologyTypeVersionToTypeVersion
+from ...db.models.ontology_objects import OntologyObjectTypeVersion
+
+ALLOWED_SCHEMA_ENDPOINTS = set(["api-v1.TypeVersionView"])
+
+SchemaKey = Tuple[int, int]  # (object type id, version)
+
+
+class TypeSchemaStore:
+    """LRU store of type version schemas keyed by (object type id, version)."""
+
+    def __init__(self) -> None:
+        self.max_entries = 2048
+        self._schemas: "OrderedDict[SchemaKey, Dict[str, Any]]" = OrderedDict()
+        self._url_keys: Dict[Hashable, SchemaKey] = {}
+        # the keys of the imported schemas by preloaded type version id (LRU)
+        self._preloaded: "OrderedDict[int, Tuple[SchemaKey, ...]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app: Flask):
+        self.max_entries = app.config.get(
+            "TYPE_SCHEMA_STORE_MAX_ENTRIES", self.max_entries
+        )
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._schemas.clear()
+            self._url_keys.clear()
+            self._preloaded.clear()
+
+    def _add(self, key: SchemaKey, schema: Dict[str, Any]):
+        with self._lock:
+            self._schemas[key] = schema
+            self._schemas.move_to_end(key)
+            while len(self._schemas) > self.max_entries:
+                self._schemas.popitem(last=False)
+
+    def get_schema(self, object_type_id: int, version: int) -> Optional[Dict[str, Any]]:
+        """Get the schema of a type version (loads the schema if it is not in the store)."""
+        key = (object_type_id, version)
+        with self._lock:
+            schema = self._schemas.get(key)
+            if schema is not None:
+                self._schemas.move_to_end(key)
+                self.hits += 1
+                return schema
+            self.misses += 1
+
+        found_type_version: Optional[OntologyObjectTypeVersion] = (
+            OntologyObjectTypeVersion.query.filter(
+                OntologyObjectTypeVersion.version == version,
+                OntologyObjectTypeVersion.object_type_id == object_type_id,
+            ).first()
+        )
+        if found_type_version is None:
+            return None
+        self._add(key, found_type_version.data)
+        return found_type_version.data
+
+    def preload(self, type_version: OntologyObjectTypeVersion):
+        """Load the schemas of the type version and all (transitively) imported type versions."""
+        root_key = (type_version.object_type_id, type_version.version)
+        self._add(root_key, type_version.data)
+
+        with self._lock:
+            keys = self._preloaded.get(type_version.id)
+            if keys is not None:
+                self._preloaded.move_to_end(type_version.id)
+        if keys is not None and all(key in self._schemas for key in keys):
+            return
+
+        imports = (
+            select(OntologyTypeVersionToTypeVersion.type_version_target_id.label("id"))
+            .where(
+                OntologyTypeVersionToTypeVersion.type_version_source_id == type_version.id
+            )
+            .cte("imports", recursive=True)
+        )
+        imports = imports.union(
+            select(OntologyTypeVersionToTypeVersion.type_version_target_id).join(
+                imports,
+                OntologyTypeVersionToTypeVersion.type_version_source_id == imports.c.id,
+            )
+        )
+        # do not flush objects that are still being created (e.g. a new object version)
+        with DB.session.no_autoflush:
+            rows = DB.session.execute(
+                select(
+                    OntologyObjectTypeVersion.object_type_id,
+                    OntologyObjectTypeVersion.version,
+                    OntologyObjectTypeVersion.data,
+                ).where(OntologyObjectTypeVersion.id.in_(select(imports.c.id)))
+            ).all()
+        keys = []
+        for object_type_id, version, data in rows:
+            keys.append((object_type_id, version))
+            self._add((object_type_id, version), data)
+        with self._lock:
+            self._preloaded[type_version.id] = tuple(keys)
+            self._preloaded.move_to_end(type_version.id)
+            while len(self._preloaded) > self.max_entries:
+                self._preloaded.popitem(last=False)
+
+    def _get_url_key(self, url_string: str) -> SchemaKey:
+        """Match a schema url against the url map of the current request."""
+        url = urlparse(url_string)
+        # url should already be from a validated type!
+        try:
+            ctx = request_ctx._get_current_object()
+        except RuntimeError:
+            raise DataVisitorException("No request context to check schema url against!")
+        url_adapter: Optional[MapAdapter] = ctx.url_adapter
+        if url_adapter is None:
+            raise DataVisitorException(
+                "No url adapter found in request context! Unable to check URL."
+                f"URL: '{url}'"
+            )
+
+        cache_key = (url_adapter.get_host(None), url_adapter.script_name, url_string)
+        key = self._url_keys.get(cache_key)
+        if key is not None:
+            return key
+
+        if url.netloc != url_adapter.get_host(None):
+            raise DataVisitorException(
+                "Only references to schemas on the same MUSE4Anything instance allowed! "
+                f"Current instance: '{url_adapter.get_host(None)}' ref: '{url}'"
+            )
+        endpoint, params = url_adapter.match(
+            path_info=url.path, query_args=url.query, method="GET"
+        )
+        if endpoint not in ALLOWED_SCHEMA_ENDPOINTS:
+            raise DataVisitorException(
+                "Only references to schemas on the same MUSE4Anything instance allowed! "
+                f"Current instance: '{url_adapter.get_host(None)}' ref: '{url}'"
+            )
+
+        # should already be validated!
+        key = (int(params.get("object_type")), int(params.get("version")))
+        with self._lock:
+            if len(self._url_keys) >= self.max_entries:
+                self._url_keys.clear()
+            self._url_keys[cache_key] = key
+        return key
+
+    def resolve_url(self, url_string: str) -> Dict[str, Any]:
+        """Resolve the url of a type version schema to the schema."""
+        schema = self.get_schema(*self._get_url_key(url_string))
+        if schema is None:
+            raise DataVisitorException(
+                f"Invalid schema ref! Schema '{urlparse(url_string)}' not found!"
+            )
+        return schema
+
+
+TYPE_SCHEMAS = TypeSchemaStore()
@@ -18,12 +18,20 @@ from muse_for_anything.api.pagination_util import (
     generate_page_links,
     prepare_pagination_query_args,
 )
+from muse_for_anything.api.v1_api.conditional_requests import (
+    ResourceValidator,
+    check_if_match,
+    check_not_modified,
+    get_resource_validator,
+    get_taxonomy_content_state,
+)
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiResponseGenerator,
     LinkGenerator,
     PageResource,
     skip_slow_policy_checks_for_links_in_embedded_responses,
 )
+from muse_for_anything.api.v1_api.response_cache import IMMUTABLE_RESPONSES
 from muse_for_anything.db.models.users import User
 from muse_for_anything.oso_helpers import FLASK_OSO, OsoResource
 
@@ -32,6 +40,7 @@ from .constants import (
     CREATE,
     CREATE_REL,
     DELETE_REL,
+    GET,
     NEW_REL,
     RESTORE,
     RESTORE_REL,
@@ -345,6 +354,14 @@ class TaxonomyView(MethodView):
                 ),
             )
 
+    def _get_validator(self, taxonomy: Taxonomy) -> ResourceValidator:
+        # the response embeds all current items and relations of the taxonomy
+        return get_resource_validator(
+            taxonomy,
+            taxonomy.namespace,
+            extra_state=get_taxonomy_content_state(taxonomy.id),
+        )
+
     @API_V1.response(200, DynamicApiResponseSchema(TaxonomySchema()))
     @API_V1.require_jwt("jwt")
     def get(self, namespace: str, taxonomy: str):
@@ -355,13 +372,32 @@ class TaxonomyView(MethodView):
         )
         FLASK_OSO.authorize_and_set_resource(found_taxonomy)
 
+        validator = self._get_validator(found_taxonomy)
+        not_modified = check_not_modified(validator)
+        if not_modified is not None:
+            return not_modified
+
         embedded_items: List[ApiResponse] = []
 
         item_schema = TaxonomyItemSchema()
         relation_schema = TaxonomyItemRelationSchema()
 
+        current_items = found_taxonomy.current_items
+        # authorize all embedded resources at once, the generators reuse the decisions
+        FLASK_OSO.filter_allowed(
+            [
+                *current_items,
+                *(
+                    relation
+                    for item in current_items
+                    for relation in item.current_related
+                ),
+            ],
+            action=GET,
+        )
+
         with skip_slow_policy_checks_for_links_in_embedded_responses():
-            for item in found_taxonomy.current_items:
+            for item in current_items:
                 item_response = ApiResponseGenerator.get_api_response(item)
                 if item_response:
                     item_response.data = item_schema.dump(item_response.data)
@@ -374,10 +410,13 @@ class TaxonomyView(MethodView):
                         )
                         embedded_items.append(relation_response)
 
-        return ApiResponseGenerator.get_api_response(
-            found_taxonomy,
-            link_to_relations=TAXONOMY_EXTRA_LINK_RELATIONS,
-            extra_embedded=embedded_items,
+        return (
+            ApiResponseGenerator.get_api_response(
+                found_taxonomy,
+                link_to_relations=TAXONOMY_EXTRA_LINK_RELATIONS,
+                extra_embedded=embedded_items,
+            ),
+            validator.headers,
         )
 
     @API_V1.arguments(TaxonomySchema())
@@ -393,6 +432,7 @@ class TaxonomyView(MethodView):
         self._check_if_modifiable(found_taxonomy)
 
         FLASK_OSO.authorize_and_set_resource(found_taxonomy, action=UPDATE)
+        check_if_match(self._get_validator(found_taxonomy))
 
         if found_taxonomy.name != data.get("name"):
             existing: bool = (
@@ -417,6 +457,7 @@ class TaxonomyView(MethodView):
         )
         DB.session.add(found_taxonomy)
         DB.session.commit()
+        IMMUTABLE_RESPONSES.invalidate()
 
         taxonomy_response = ApiResponseGenerator.get_api_response(
             found_taxonomy, link_to_relations=TAXONOMY_EXTRA_LINK_RELATIONS
@@ -459,6 +500,7 @@ class TaxonomyView(MethodView):
             found_taxonomy.deleted_on = None
             DB.session.add(found_taxonomy)
             DB.session.commit()
+            IMMUTABLE_RESPONSES.invalidate()
 
         taxonomy_response = ApiResponseGenerator.get_api_response(
             found_taxonomy, link_to_relations=TAXONOMY_EXTRA_LINK_RELATIONS
@@ -494,6 +536,7 @@ class TaxonomyView(MethodView):
         self._check_if_namespace_modifiable(found_taxonomy.namespace)
 
         FLASK_OSO.authorize_and_set_resource(found_taxonomy)
+        check_if_match(self._get_validator(found_taxonomy))
 
         # only actually delete when not already deleted
         if found_taxonomy.deleted_on is None:
@@ -501,6 +544,7 @@ class TaxonomyView(MethodView):
             found_taxonomy.deleted_on = datetime.now(timezone.utc)
             DB.session.add(found_taxonomy)
             DB.session.commit()
+            IMMUTABLE_RESPONSES.invalidate()
 
         taxonomy_response = ApiResponseGenerator.get_api_response(
             found_taxonomy, link_to_relations=TAXONOMY_EXTRA_LINK_RELATIONS
@@ -618,15 +662,13 @@ class TaxonomyItemsView(MethodView):
         if search:
             taxonomy_item_filter = (
                 *taxonomy_item_filter,
-                exists(
-                    select(TaxonomyItemVersion)
-                    .where(TaxonomyItem.current_version_id == TaxonomyItemVersion.id)
-                    .where(
-                        or_(
-                            TaxonomyItemVersion.name.contains(search),
-                            TaxonomyItemVersion.description.contains(search),
-                        ),
-                    )
+                or_(
+                    TaxonomyItem.current_name.contains(search),
+                    exists(
+                        select(TaxonomyItemVersion)
+                        .where(TaxonomyItem.current_version_id == TaxonomyItemVersion.id)
+                        .where(TaxonomyItemVersion.description.contains(search))
+                    ),
                 ),
             )
 
@@ -634,7 +676,13 @@ class TaxonomyItemsView(MethodView):
             TaxonomyItem,
             taxonomy_item_filter,
             pagination_options,
-            [TaxonomyItem.created_on, TaxonomyItem.updated_on],
+            [
+                TaxonomyItem.created_on,
+                TaxonomyItem.updated_on,
+                TaxonomyItem.current_name,
+                TaxonomyItem.current_sort_key,
+                TaxonomyItem.path,
+            ],
         )
 
         taxonomy_items: List[TaxonomyItem] = pagination_info.page_items_query.all()
@@ -667,6 +715,9 @@ class TaxonomyItemsView(MethodView):
                 options=[
                     CollectionFilterOption("created_on"),
                     CollectionFilterOption("updated_on"),
+                    CollectionFilterOption("current_name"),
+                    CollectionFilterOption("current_sort_key"),
+                    CollectionFilterOption("path"),
                 ],
             ),
         ]
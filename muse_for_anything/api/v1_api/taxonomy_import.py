@@ -0,0 +1,164 @@
+"""Module containing the bulk import endpoint for taxonomy items of the v1 API."""
+
+from http import HTTPStatus
+from typing import Optional
+
+from flask import url_for
+from flask.views import MethodView
+from flask_babel import gettext
+from flask_smorest import abort
+
+from muse_for_anything.api.v1_api.request_helpers import LinkGenerator
+from muse_for_anything.oso_helpers import FLASK_OSO, OsoResource
+
+from .constants import (
+    CREATE,
+    TAXONOMY_IMPORT_REL_TYPE,
+    TAXONOMY_ITEM_REL_TYPE,
+    TAXONOMY_TREE_REL_TYPE,
+    UP_REL,
+)
+from .models.ontology import (
+    TaxonomyImportResultData,
+    TaxonomyImportResultSchema,
+    TaxonomyImportSchema,
+)
+from .root import API_V1
+from ..base_models import ApiLink, ApiResponse, DynamicApiResponseSchema
+from ...db.db import DB
+from ...db.models.taxonomies import Taxonomy, TaxonomyItem
+from ...db.taxonomy_import import (
+    TaxonomyImport,
+    TaxonomyImportError,
+    import_taxonomy_items,
+)
+
+
+@API_V1.route("/namespaces/<string:namespace>/taxonomies/<string:taxonomy>/import/")
+class TaxonomyImportView(MethodView):
+    """Endpoint for importing many taxonomy items at once."""
+
+    def _check_path_params(self, namespace: str, taxonomy: str):
+        if not namespace or not namespace.isdigit():
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                message=gettext("The requested namespace id has the wrong format!"),
+            )
+        if not taxonomy or not taxonomy.isdigit():
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                message=gettext("The requested taxonomy id has the wrong format!"),
+            )
+
+    def _get_taxonomy(self, namespace: str, taxonomy: str) -> Taxonomy:
+        found_taxonomy: Optional[Taxonomy] = Taxonomy.query.filter(
+            Taxonomy.id == int(taxonomy),
+            Taxonomy.namespace_id == int(namespace),
+        ).first()
+
+        if found_taxonomy is None:
+            abort(HTTPStatus.NOT_FOUND, message=gettext("Taxonomy not found."))
+        return found_taxonomy  # is not None because abort raises exception
+
+    def _check_if_modifiable(self, taxonomy: Taxonomy):
+        if taxonomy.namespace.deleted_on is not None:
+            # cannot modify deleted namespace!
+            abort(
+                HTTPStatus.CONFLICT,
+                message=gettext(
+                    "Namespace is marked as deleted and cannot be modified further."
+                ),
+            )
+        if taxonomy.deleted_on is not None:
+            # cannot modify deleted taxonomy!
+            abort(
+                HTTPStatus.CONFLICT,
+                message=gettext(
+                    "Taxonomy is marked as deleted and cannot be modified further."
+                ),
+            )
+
+    def _get_parent(self, taxonomy: Taxonomy, parent: str) -> TaxonomyItem:
+        found_parent: Optional[TaxonomyItem] = TaxonomyItem.query.filter(
+            TaxonomyItem.id == int(parent),
+            TaxonomyItem.taxonomy_id == taxonomy.id,
+        ).first()
+        if found_parent is None:
+            abort(HTTPStatus.NOT_FOUND, message=gettext("Taxonomy item not found."))
+        if found_parent.deleted_on is not None:
+            abort(
+                HTTPStatus.CONFLICT,
+                message=gettext(
+                    "Taxonomy item is marked as deleted and cannot be modified further."
+                ),
+            )
+        return found_parent
+
+    def _get_link(self, taxonomy: Taxonomy, endpoint: str, resource_type: str, *rels):
+        return ApiLink(
+            href=url_for(
+                endpoint,
+                namespace=str(taxonomy.namespace_id),
+                taxonomy=str(taxonomy.id),
+                _external=True,
+            ),
+            rel=rels,
+            resource_type=resource_type,
+            resource_key={
+                "namespaceId": str(taxonomy.namespace_id),
+                "taxonomyId": str(taxonomy.id),
+            },
+        )
+
+    @API_V1.arguments(TaxonomyImportSchema())
+    @API_V1.response(200, DynamicApiResponseSchema(TaxonomyImportResultSchema()))
+    @API_V1.require_jwt("jwt")
+    def post(self, data, namespace: str, taxonomy: str):
+        """Import many taxonomy items (and their relations) at once.
+
+        The items can be nested (with ``children``) or reference each other
+        by their ``key`` in ``relations`` (or both). All items are imported in
+        a single transaction. Items without a parent in the import become
+        toplevel items (or children of the ``parent`` item if given).
+        """
+        self._check_path_params(namespace=namespace, taxonomy=taxonomy)
+        found_taxonomy = self._get_taxonomy(namespace=namespace, taxonomy=taxonomy)
+        self._check_if_modifiable(found_taxonomy)
+
+        FLASK_OSO.authorize_and_set_resource(
+            OsoResource(TAXONOMY_ITEM_REL_TYPE, parent_resource=found_taxonomy),
+            action=CREATE,
+        )
+
+        parent: Optional[TaxonomyItem] = None
+        if data.get("parent"):
+            parent = self._get_parent(found_taxonomy, data["parent"])
+
+        try:
+            taxonomy_import = TaxonomyImport.from_data(
+                data["items"], data.get("relations", ())
+            )
+            result = import_taxonomy_items(found_taxonomy, taxonomy_import, parent=parent)
+        except TaxonomyImportError as err:
+            DB.session.rollback()
+            abort(HTTPStatus.BAD_REQUEST, message=str(err))
+        DB.session.commit()
+
+        return ApiResponse(
+            links=[
+                LinkGenerator.get_link_of(found_taxonomy, extra_relations=(UP_REL,)),
+                self._get_link(
+                    found_taxonomy, "api-v1.TaxonomyTreeView", TAXONOMY_TREE_REL_TYPE
+                ),
+            ],
+            data=TaxonomyImportResultData(
+                self=self._get_link(
+                    found_taxonomy, "api-v1.TaxonomyImportView", TAXONOMY_IMPORT_REL_TYPE
+                ),
+                items_created=result.items_created,
+                relations_created=result.relations_created,
+                toplevel_items=result.toplevel_items,
+                max_depth=result.max_depth,
+                ids={key: str(item_id) for key, item_id in result.ids.items()},
+            ),
+        )
@@ -17,18 +17,27 @@ from muse_for_anything.api.pagination_util import (
     generate_page_links,
     prepare_pagination_query_args,
 )
+from muse_for_anything.api.v1_api.conditional_requests import (
+    ResourceValidator,
+    check_if_match,
+    check_not_modified,
+    get_resource_validator,
+    get_taxonomy_item_relations_state,
+)
 from muse_for_anything.api.v1_api.request_helpers import (
     ApiResponseGenerator,
     LinkGenerator,
     PageResource,
     skip_slow_policy_checks_for_links_in_embedded_responses,
 )
+from muse_for_anything.api.v1_api.response_cache import IMMUTABLE_RESPONSES
 from muse_for_anything.db.models.taxonomies import (
     Taxonomy,
     TaxonomyItem,
     TaxonomyItemRelation,
     TaxonomyItemVersion,
 )
+from muse_for_anything.db.models.taxonomy_closure import TaxonomyItemClosure
 from muse_for_anything.oso_helpers import FLASK_OSO, OsoResource
 
 from ...db.db import DB
@@ -51,6 +60,7 @@ from .constants import (
     CREATE,
     CREATE_REL,
     DELETE_REL,
+    GET,
     NEW_REL,
     PARENT_REL,
     RESTORE,
@@ -160,6 +170,15 @@ class TaxonomyItemView(MethodView):
                 ),
             )
 
+    def _get_validator(self, taxonomy_item: TaxonomyItem) -> ResourceValidator:
+        # the response embeds the direct parents and children of the item
+        return get_resource_validator(
+            taxonomy_item,
+            taxonomy_item.taxonomy,
+            taxonomy_item.taxonomy.namespace,
+            extra_state=get_taxonomy_item_relations_state(taxonomy_item.id),
+        )
+
     @API_V1.response(200, DynamicApiResponseSchema(TaxonomyItemSchema()))
     @API_V1.require_jwt("jwt")
     def get(self, namespace: str, taxonomy: str, taxonomy_item: str, **kwargs: Any):
@@ -173,9 +192,30 @@ class TaxonomyItemView(MethodView):
 
         FLASK_OSO.authorize_and_set_resource(found_taxonomy_item)
 
+        validator = self._get_validator(found_taxonomy_item)
+        not_modified = check_not_modified(validator)
+        if not_modified is not None:
+            return not_modified
+
         embedded: List[ApiResponse] = []
         extra_links: List[ApiLink] = []
 
+        # authorize all embedded resources at once, the generators reuse the decisions
+        FLASK_OSO.filter_allowed(
+            [
+                *(
+                    relation.taxonomy_item_source
+                    for relation in found_taxonomy_item.current_ancestors
+                ),
+                *found_taxonomy_item.current_related,
+                *(
+                    relation.taxonomy_item_target
+                    for relation in found_taxonomy_item.current_related
+                ),
+            ],
+            action=GET,
+        )
+
         with skip_slow_policy_checks_for_links_in_embedded_responses():
             item_dump = TaxonomyItemSchema().dump
             relation_dump = TaxonomyItemRelationSchema().dump
@@ -205,11 +245,14 @@ class TaxonomyItemView(MethodView):
                     child_response.data = item_dump(child_response.data)
                     embedded.append(child_response)
 
-        return ApiResponseGenerator.get_api_response(
-            found_taxonomy_item,
-            link_to_relations=TAXONOMY_ITEM_EXTRA_LINK_RELATIONS,
-            extra_links=extra_links,
-            extra_embedded=embedded,
+        return (
+            ApiResponseGenerator.get_api_response(
+                found_taxonomy_item,
+                link_to_relations=TAXONOMY_ITEM_EXTRA_LINK_RELATIONS,
+                extra_links=extra_links,
+                extra_embedded=embedded,
+            ),
+            validator.headers,
         )
 
     @API_V1.arguments(TaxonomyItemSchema())
@@ -226,6 +269,7 @@ class TaxonomyItemView(MethodView):
         self._check_if_modifiable(found_taxonomy_item)
 
         FLASK_OSO.authorize_and_set_resource(found_taxonomy_item, action=UPDATE)
+        check_if_match(self._get_validator(found_taxonomy_item))
 
         taxonomy_item_version = TaxonomyItemVersion(
             taxonomy_item=found_taxonomy_item,
@@ -238,6 +282,7 @@ class TaxonomyItemView(MethodView):
         DB.session.add(found_taxonomy_item)
         DB.session.add(taxonomy_item_version)
         DB.session.commit()
+        IMMUTABLE_RESPONSES.invalidate((TAXONOMY_ITEM_REL_TYPE, taxonomy_item))
 
         taxonomy_item_response = ApiResponseGenerator.get_api_response(
             found_taxonomy_item, link_to_relations=TAXONOMY_ITEM_EXTRA_LINK_RELATIONS
@@ -271,6 +316,15 @@ class TaxonomyItemView(MethodView):
     ) -> Tuple[List[ApiResponse], List[ApiLink]]:
         embedded = []
         links = []
+        # authorize all embedded resources at once, the generators reuse the decisions
+        FLASK_OSO.filter_allowed(
+            [
+                *ancestors,
+                *related,
+                *(relation.taxonomy_item_target for relation in (*ancestors, *related)),
+            ],
+            action=GET,
+        )
         with skip_slow_policy_checks_for_links_in_embedded_responses():
             item_dump = TaxonomyItemSchema().dump
             relation_dump = TaxonomyItemRelationSchema().dump
@@ -335,22 +389,14 @@ class TaxonomyItemView(MethodView):
                 TaxonomyItemRelation.taxonomy_item_target_id == found_taxonomy_item.id,
                 TaxonomyItemRelation.deleted_on == deleted_timestamp,
             ).all()
-            ancestor_ids = set()
             relation: TaxonomyItemRelation
             for relation in ancestors:
                 if relation.taxonomy_item_source.deleted_on is not None:
                     continue  # do not restore relations to deleted items
-                ancestor_ids.add(relation.taxonomy_item_source_id)
                 relation.deleted_on = None
                 DB.session.add(relation)
-
-            def produces_circle(relation: TaxonomyItemRelation) -> bool:
-                if relation.taxonomy_item_target_id in ancestor_ids:
-                    return True
-                for rel in relation.taxonomy_item_target.current_related:
-                    if produces_circle(rel):
-                        return True
-                return False
+            # update the closure table with the restored relations
+            DB.session.flush()
 
             children: Sequence[TaxonomyItemRelation] = TaxonomyItemRelation.query.filter(
                 TaxonomyItemRelation.taxonomy_item_source_id == found_taxonomy_item.id,
@@ -359,12 +405,17 @@ class TaxonomyItemView(MethodView):
             for relation in children:
                 if relation.taxonomy_item_target.deleted_on is not None:
                     continue  # do not restore relations to deleted items
-                if produces_circle(relation):
+                if TaxonomyItemClosure.would_create_circle(
+                    source_id=found_taxonomy_item.id,
+                    target_id=relation.taxonomy_item_target_id,
+                ):
                     continue
                 relation.deleted_on = None
                 DB.session.add(relation)
+                DB.session.flush()  # restored relation is part of the next circle check
             DB.session.add(found_taxonomy_item)
             DB.session.commit()
+            IMMUTABLE_RESPONSES.invalidate((TAXONOMY_ITEM_REL_TYPE, taxonomy_item))
 
             # add changed items to be embedded into the response
             embedded, changed_links = self._get_embedded_changed_related_resources(
@@ -416,6 +467,7 @@ class TaxonomyItemView(MethodView):
         self._check_if_taxonomy_modifiable(found_taxonomy_item.taxonomy)
 
         FLASK_OSO.authorize_and_set_resource(found_taxonomy_item)
+        check_if_match(self._get_validator(found_taxonomy_item))
 
         changed_links: List[ApiLink] = []
         embedded: List[ApiResponse] = []
@@ -437,6 +489,7 @@ class TaxonomyItemView(MethodView):
                 DB.session.add(relation)
             DB.session.add(found_taxonomy_item)
             DB.session.commit()
+            IMMUTABLE_RESPONSES.invalidate((TAXONOMY_ITEM_REL_TYPE, taxonomy_item))
 
             # add changed items to be embedded into the response
             embedded, changed_links = self._get_embedded_changed_related_resources(
@@ -543,34 +596,19 @@ class TaxonomyItemRelationsView(MethodView):
                 ),
             )
 
-    def _check_item_circle(
-        self,
-        item_target: TaxonomyItem,
-        item_source: TaxonomyItem,
-        original_target: Optional[TaxonomyItem] = None,
-    ):
+    def _check_item_circle(self, item_target: TaxonomyItem, item_source: TaxonomyItem):
         """Check for a path from target to source which would form a circular dependency. Abort if such a path is found!"""
-        if original_target is None:
-            original_target = item_target
-        relation: TaxonomyItemRelation
-        for relation in item_target.current_related:
-            if relation.taxonomy_item_target.deleted_on is not None:
-                continue  # exclude deleted items as targets
-            if relation.taxonomy_item_target_id == item_source.id:
-                abort(
-                    HTTPStatus.CONFLICT,
-                    message=gettext(
-                        "Cannot add a relation from %(target)s to %(source)s as it would create a circle!",
-                        target=original_target.name,
-                        source=item_source.name,
-                    ),
-                )
-            else:
-                self._check_item_circle(
-                    item_target=relation.taxonomy_item_target,
-                    item_source=item_source,
-                    original_target=original_target,
-                )
+        if TaxonomyItemClosure.would_create_circle(
+            source_id=item_source.id, target_id=item_target.id
+        ):
+            abort(
+                HTTPStatus.CONFLICT,
+                message=gettext(
+                    "Cannot add a relation from %(target)s to %(source)s as it would create a circle!",
+                    target=item_target.name,
+                    source=item_source.name,
+                ),
+            )
 
     @API_V1.arguments(CursorPageArgumentsSchema, location="query", as_kwargs=True)
     @API_V1.response(200, DynamicApiResponseSchema(CursorPageSchema()))
@@ -1187,6 +1225,19 @@ class TaxonomyItemVersionView(MethodView):
             taxonomy_item=taxonomy_item,
             version=version,
         )
+
+        cache_key = IMMUTABLE_RESPONSES.get_key(
+            TAXONOMY_ITEM_VERSION_REL_TYPE,
+            (TAXONOMY_ITEM_REL_TYPE, taxonomy_item),
+            namespace,
+            taxonomy,
+            taxonomy_item,
+            version,
+        )
+        cached_response = IMMUTABLE_RESPONSES.get_response(cache_key)
+        if cached_response is not None:
+            return cached_response
+
         found_taxonomy_item_version = self._get_taxonomy_item_version(
             namespace=namespace,
             taxonomy=taxonomy,
@@ -1195,7 +1246,11 @@ class TaxonomyItemVersionView(MethodView):
         )
         FLASK_OSO.authorize_and_set_resource(found_taxonomy_item_version)
 
-        return ApiResponseGenerator.get_api_response(
-            found_taxonomy_item_version,
-            link_to_relations=TAXONOMY_ITEM_VERSION_EXTRA_LINK_RELATIONS,
+        return IMMUTABLE_RESPONSES.cache_response(
+            cache_key,
+            ApiResponseGenerator.get_api_response(
+                found_taxonomy_item_version,
+                link_to_relations=TAXONOMY_ITEM_VERSION_EXTRA_LINK_RELATIONS,
+            ),
+            schema=DynamicApiResponseSchema(TaxonomyItemSchema()),
         )
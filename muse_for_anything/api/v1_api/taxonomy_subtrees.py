@@ -0,0 +1,276 @@
+"""Module containing the taxonomy item subtree API endpoints of the v1 API.
+
+The subtree of a taxonomy item contains the item and all its (transitive)
+children. Subtrees can be deleted, restored and moved to a new parent with
+set based database operations (see :py:mod:`muse_for_anything.db.taxonomy_subtrees`).
+"""
+
+from http import HTTPStatus
+from typing import List, Optional
+
+from flask import url_for
+from flask.views import MethodView
+from flask_babel import gettext
+from flask_smorest import abort
+
+from muse_for_anything.api.v1_api.conditional_requests import (
+    ResourceValidator,
+    check_if_match,
+    get_resource_validator,
+    get_taxonomy_item_relations_state,
+)
+from muse_for_anything.api.v1_api.request_helpers import LinkGenerator
+from muse_for_anything.api.v1_api.response_cache import IMMUTABLE_RESPONSES
+from muse_for_anything.oso_helpers import FLASK_OSO, OsoResource
+
+from .constants import (
+    CREATE,
+    DELETE,
+    RESTORE,
+    TAXONOMY_ITEM_REL_TYPE,
+    TAXONOMY_ITEM_RELATION_REL_TYPE,
+    TAXONOMY_SUBTREE_REL_TYPE,
+    UP_REL,
+    UPDATE,
+)
+from .models.ontology import (
+    TaxonomySubtreeChangeData,
+    TaxonomySubtreeChangeSchema,
+    TaxonomySubtreeMoveSchema,
+)
+from .root import API_V1
+from ..base_models import ApiLink, ApiResponse, DynamicApiResponseSchema
+from ...db.db import DB
+from ...db.models.taxonomies import Taxonomy, TaxonomyItem
+from ...db.taxonomy_subtrees import (
+    SubtreeChange,
+    delete_subtree,
+    get_parent_relations,
+    get_removed_parent_relations,
+    get_subtree_ids,
+    move_subtree,
+    restore_subtree,
+)
+
+
+@API_V1.route(
+    "/namespaces/<string:namespace>/taxonomies/<string:taxonomy>/items/<string:taxonomy_item>/subtree/"
+)
+class TaxonomySubtreeView(MethodView):
+    """Endpoint for the subtree of a taxonomy item."""
+
+    def _check_path_params(self, namespace: str, taxonomy: str, taxonomy_item: str):
+        if not namespace or not namespace.isdigit():
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                message=gettext("The requested namespace id has the wrong format!"),
+            )
+        if not taxonomy or not taxonomy.isdigit():
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                message=gettext("The requested taxonomy id has the wrong format!"),
+            )
+        if not taxonomy_item or not taxonomy_item.isdigit():
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                message=gettext("The requested taxonomy item id has the wrong format!"),
+            )
+
+    def _get_taxonomy_item(
+        self, namespace: str, taxonomy: str, taxonomy_item: str
+    ) -> TaxonomyItem:
+        found_taxonomy_item: Optional[TaxonomyItem] = TaxonomyItem.query.filter(
+            TaxonomyItem.id == int(taxonomy_item),
+            TaxonomyItem.taxonomy_id == int(taxonomy),
+        ).first()
+
+        if (
+            found_taxonomy_item is None
+            or found_taxonomy_item.taxonomy.namespace_id != int(namespace)
+        ):
+            abort(HTTPStatus.NOT_FOUND, message=gettext("Taxonomy item not found."))
+        return found_taxonomy_item  # is not None because abort raises exception
+
+    def _check_if_taxonomy_modifiable(self, taxonomy: Taxonomy):
+        if taxonomy.namespace.deleted_on is not None:
+            # cannot modify deleted namespace!
+            abort(
+                HTTPStatus.CONFLICT,
+                message=gettext(
+                    "Namespace is marked as deleted and cannot be modified further."
+                ),
+            )
+        if taxonomy.deleted_on is not None:
+            # cannot modify deleted taxonomy!
+            abort(
+                HTTPStatus.CONFLICT,
+                message=gettext(
+                    "Taxonomy is marked as deleted and cannot be modified further."
+                ),
+            )
+
+    def _check_if_modifiable(self, taxonomy_item: TaxonomyItem):
+        self._check_if_taxonomy_modifiable(taxonomy=taxonomy_item.taxonomy)
+        if taxonomy_item.deleted_on is not None:
+            # cannot modify deleted taxonomy item!
+            abort(
+                HTTPStatus.CONFLICT,
+                message=gettext(
+                    "Taxonomy item is marked as deleted and cannot be modified further."
+                ),
+            )
+
+    def _get_validator(self, taxonomy_item: TaxonomyItem) -> ResourceValidator:
+        # same validator as the taxonomy item resource
+        return get_resource_validator(
+            taxonomy_item,
+            taxonomy_item.taxonomy,
+            taxonomy_item.taxonomy.namespace,
+            extra_state=get_taxonomy_item_relations_state(taxonomy_item.id),
+        )
+
+    def _get_new_parent(
+        self, taxonomy_item: TaxonomyItem, parent: Optional[str]
+    ) -> Optional[TaxonomyItem]:
+        if parent is None:
+            return None
+        found_parent: Optional[TaxonomyItem] = TaxonomyItem.query.filter(
+            TaxonomyItem.id == int(parent),
+            TaxonomyItem.taxonomy_id == taxonomy_item.taxonomy_id,
+        ).first()
+        if found_parent is None:
+            abort(HTTPStatus.NOT_FOUND, message=gettext("Taxonomy item not found."))
+        self._check_if_modifiable(found_parent)
+        return found_parent
+
+    def _get_response(
+        self, taxonomy_item: TaxonomyItem, change: SubtreeChange
+    ) -> ApiResponse:
+        # the responses of the item versions embed the deleted state of the items
+        for item_id in change.item_ids:
+            IMMUTABLE_RESPONSES.invalidate((TAXONOMY_ITEM_REL_TYPE, str(item_id)))
+
+        root_link = LinkGenerator.get_link_of(taxonomy_item, ignore_deleted=True)
+        links: List[ApiLink] = [
+            LinkGenerator.get_link_of(taxonomy_item.taxonomy, extra_relations=(UP_REL,)),
+            root_link,
+        ]
+        return ApiResponse(
+            links=links,
+            data=TaxonomySubtreeChangeData(
+                self=ApiLink(
+                    href=url_for(
+                        "api-v1.TaxonomySubtreeView",
+                        namespace=str(taxonomy_item.taxonomy.namespace_id),
+                        taxonomy=str(taxonomy_item.taxonomy_id),
+                        taxonomy_item=str(taxonomy_item.id),
+                        _external=True,
+                    ),
+                    rel=tuple(),
+                    resource_type=TAXONOMY_SUBTREE_REL_TYPE,
+                    resource_key=root_link.resource_key,
+                ),
+                root=root_link,
+                items=change.items,
+                relations=change.relations,
+                skipped_relations=change.skipped_relations,
+            ),
+        )
+
+    @API_V1.arguments(TaxonomySubtreeMoveSchema())
+    @API_V1.response(200, DynamicApiResponseSchema(TaxonomySubtreeChangeSchema()))
+    @API_V1.require_jwt("jwt")
+    def put(self, data, namespace: str, taxonomy: str, taxonomy_item: str):
+        """Move the subtree of a taxonomy item to a new parent.
+
+        The new parent replaces all current parents of the item. Use null as
+        parent to make the item a toplevel item.
+        """
+        self._check_path_params(
+            namespace=namespace, taxonomy=taxonomy, taxonomy_item=taxonomy_item
+        )
+        found_taxonomy_item = self._get_taxonomy_item(
+            namespace=namespace, taxonomy=taxonomy, taxonomy_item=taxonomy_item
+        )
+        self._check_if_modifiable(found_taxonomy_item)
+
+        FLASK_OSO.authorize_and_set_resource(found_taxonomy_item, action=UPDATE)
+        check_if_match(self._get_validator(found_taxonomy_item))
+
+        new_parent = self._get_new_parent(found_taxonomy_item, data.get("parent"))
+
+        # check for circles once against the complete subtree
+        subtree_ids = get_subtree_ids(found_taxonomy_item.id)
+        if new_parent is not None and new_parent.id in subtree_ids:
+            abort(
+                HTTPStatus.CONFLICT,
+                message=gettext(
+                    "Cannot move %(item)s below %(parent)s as it would create a circle!",
+                    item=found_taxonomy_item.name,
+                    parent=new_parent.name,
+                ),
+            )
+
+        # a move deletes the old parent relations and creates a new relation
+        parent_relations = get_parent_relations(found_taxonomy_item)
+        for relation in get_removed_parent_relations(parent_relations, new_parent):
+            FLASK_OSO.authorize(relation, action=DELETE)
+        if new_parent is not None and not any(
+            relation.taxonomy_item_source_id == new_parent.id
+            for relation in parent_relations
+        ):
+            FLASK_OSO.authorize(
+                OsoResource(TAXONOMY_ITEM_RELATION_REL_TYPE, parent_resource=new_parent),
+                action=CREATE,
+            )
+
+        change = move_subtree(
+            found_taxonomy_item,
+            new_parent,
+            item_ids=subtree_ids,
+            parent_relations=parent_relations,
+        )
+        DB.session.commit()
+        # only the parents of the root item changed
+        change.item_ids = {found_taxonomy_item.id}
+        return self._get_response(found_taxonomy_item, change)
+
+    @API_V1.response(200, DynamicApiResponseSchema(TaxonomySubtreeChangeSchema()))
+    @API_V1.require_jwt("jwt")
+    def post(self, namespace: str, taxonomy: str, taxonomy_item: str):  # restore action
+        """Restore a deleted taxonomy item and all items deleted together with it."""
+        self._check_path_params(
+            namespace=namespace, taxonomy=taxonomy, taxonomy_item=taxonomy_item
+        )
+        found_taxonomy_item = self._get_taxonomy_item(
+            namespace=namespace, taxonomy=taxonomy, taxonomy_item=taxonomy_item
+        )
+        self._check_if_taxonomy_modifiable(found_taxonomy_item.taxonomy)
+
+        FLASK_OSO.authorize_and_set_resource(found_taxonomy_item, action=RESTORE)
+
+        change = restore_subtree(found_taxonomy_item)
+        DB.session.commit()
+        return self._get_response(found_taxonomy_item, change)
+
+    @API_V1.response(200, DynamicApiResponseSchema(TaxonomySubtreeChangeSchema()))
+    @API_V1.require_jwt("jwt")
+    def delete(self, namespace: str, taxonomy: str, taxonomy_item: str):
+        """Delete a taxonomy item and all its (transitive) children."""
+        self._check_path_params(
+            namespace=namespace, taxonomy=taxonomy, taxonomy_item=taxonomy_item
+        )
+        found_taxonomy_item = self._get_taxonomy_item(
+            namespace=namespace, taxonomy=taxonomy, taxonomy_item=taxonomy_item
+        )
+        self._check_if_taxonomy_modifiable(found_taxonomy_item.taxonomy)
+
+        FLASK_OSO.authorize_and_set_resource(found_taxonomy_item)
+        check_if_match(self._get_validator(found_taxonomy_item))
+
+        change = SubtreeChange()
+        # only actually delete when not already deleted
+        if found_taxonomy_item.deleted_on is None:
+            change = delete_subtree(found_taxonomy_item)
+            DB.session.commit()
+        return self._get_response(found_taxonomy_item, change)
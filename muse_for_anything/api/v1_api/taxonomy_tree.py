@@ -0,0 +1,326 @@
+"""Module containing the taxonomy tree API endpoint of the v1 API.
+
+The tree resource contains all current items of a taxonomy (or of some
+subtrees of the taxonomy) together with the ids of their parents and
+children. It is loaded with a fixed number of queries (items with their
+current versions and relations) independent of the depth of the taxonomy.
+"""
+
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from flask import url_for
+from flask.views import MethodView
+from flask_babel import gettext
+from flask_smorest import abort
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.expression import or_, select
+
+from muse_for_anything.api.v1_api.conditional_requests import (
+    check_not_modified,
+    get_resource_validator,
+    get_taxonomy_content_state,
+)
+from muse_for_anything.api.v1_api.constants import (
+    TAXONOMY_ITEM_REL_TYPE,
+    TAXONOMY_ITEM_RESOURCE,
+    TAXONOMY_TREE_REL_TYPE,
+    UP_REL,
+)
+from muse_for_anything.api.v1_api.link_templates import cached_url_for
+from muse_for_anything.api.v1_api.request_helpers import LinkGenerator
+from muse_for_anything.oso_helpers import FLASK_OSO, OsoResource
+
+from .models.ontology import (
+    TaxonomyTreeData,
+    TaxonomyTreeItemData,
+    TaxonomyTreeParamsSchema,
+    TaxonomyTreeSchema,
+)
+from .root import API_V1
+from ..base_models import ApiLink, ApiResponse, DynamicApiResponseSchema
+from ...db.db import DB
+from ...db.models.taxonomies import (
+    Taxonomy,
+    TaxonomyItem,
+    TaxonomyItemRelation,
+    TaxonomyItemVersion,
+)
+from ...db.models.taxonomy_closure import TaxonomyItemClosure
+
+
+@dataclass
+class TreeItem:
+    id: int
+    name: str
+    description: str
+    sort_key: float
+    version: int
+
+
+@dataclass
+class TaxonomyTree:
+    """The current items of a taxonomy (or subtrees) and their relations."""
+
+    # in display order (sort key, name, id)
+    items: Dict[int, TreeItem]
+    parents: Dict[int, List[int]]
+    children: Dict[int, List[int]]
+    positions: Dict[int, int] = field(init=False)
+
+    def __post_init__(self):
+        self.positions = {item_id: index for index, item_id in enumerate(self.items)}
+
+    def sort_key(self, item_id: int) -> int:
+        return self.positions[item_id]
+
+    def get_toplevel_items(self) -> List[int]:
+        return [item_id for item_id in self.items if not self.parents.get(item_id)]
+
+    def walk(
+        self, roots: Sequence[int], max_depth: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """Walk the tree breadth first starting from the roots.
+
+        Items reachable by multiple paths are only visited once (with the
+        smallest depth).
+
+        Returns:
+            List[Tuple[int, int]]: the item ids with their depth
+        """
+        visited: Set[int] = set(roots)
+        queue = deque((root, 0) for root in roots)
+        result: List[Tuple[int, int]] = []
+        while queue:
+            item_id, depth = queue.popleft()
+            result.append((item_id, depth))
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for child_id in self.children.get(item_id, ()):
+                if child_id not in visited:
+                    visited.add(child_id)
+                    queue.append((child_id, depth + 1))
+        return result
+
+
+def load_taxonomy_tree(
+    taxonomy_id: int, root_ids: Optional[Sequence[int]] = None
+) -> TaxonomyTree:
+    """Load the current items and relations of a taxonomy with two queries.
+
+    Args:
+        taxonomy_id (int): the taxonomy
+        root_ids (Optional[Sequence[int]], optional): only load the subtrees
+            of these items. Defaults to None (all items).
+    """
+    # sorted with the (denormalized) sort columns of the items
+    item_query = (
+        select(
+            TaxonomyItem.id,
+            TaxonomyItem.current_name,
+            TaxonomyItemVersion.description,
+            TaxonomyItem.current_sort_key,
+            TaxonomyItemVersion.version,
+        )
+        .outerjoin(
+            TaxonomyItemVersion,
+            TaxonomyItemVersion.id == TaxonomyItem.current_version_id,
+        )
+        .where(TaxonomyItem.taxonomy_id == taxonomy_id, TaxonomyItem.deleted_on == None)
+        .order_by(
+            TaxonomyItem.current_sort_key,
+            TaxonomyItem.current_name.collate(TaxonomyItem.current_name.info["collate"]),
+            TaxonomyItem.id,
+        )
+    )
+    if root_ids is not None:
+        descendants = select(TaxonomyItemClosure.descendant_id).where(
+            TaxonomyItemClosure.ancestor_id.in_(root_ids)
+        )
+        item_query = item_query.where(
+            or_(TaxonomyItem.id.in_(root_ids), TaxonomyItem.id.in_(descendants))
+        )
+    items: Dict[int, TreeItem] = {}
+    for item_id, name, description, sort_key, version in DB.session.execute(item_query):
+        items[item_id] = TreeItem(
+            id=item_id,
+            name=name if name is not None else "",
+            description=description if description is not None else "",
+            sort_key=sort_key if sort_key is not None else 10,
+            version=version if version is not None else 0,
+        )
+
+    source_item = aliased(TaxonomyItem)
+    target_item = aliased(TaxonomyItem)
+    relation_query = (
+        select(
+            TaxonomyItemRelation.taxonomy_item_source_id,
+            TaxonomyItemRelation.taxonomy_item_target_id,
+        )
+        .join(source_item, source_item.id == TaxonomyItemRelation.taxonomy_item_source_id)
+        .join(target_item, target_item.id == TaxonomyItemRelation.taxonomy_item_target_id)
+        .where(
+            source_item.taxonomy_id == taxonomy_id,
+            source_item.deleted_on == None,
+            target_item.deleted_on == None,
+            TaxonomyItemRelation.deleted_on == None,
+        )
+        .order_by(TaxonomyItemRelation.id)
+    )
+    parents: Dict[int, List[int]] = defaultdict(list)
+    children: Dict[int, List[int]] = defaultdict(list)
+    for source_id, target_id in DB.session.execute(relation_query):
+        if target_id not in items:
+            continue  # not part of the loaded subtrees
+        parents[target_id].append(source_id)
+        if source_id in items:
+            children[source_id].append(target_id)
+
+    tree = TaxonomyTree(items=items, parents=parents, children=children)
+    for child_ids in children.values():
+        child_ids.sort(key=tree.sort_key)
+    return tree
+
+
+@API_V1.route("/namespaces/<string:namespace>/taxonomies/<string:taxonomy>/tree/")
+class TaxonomyTreeView(MethodView):
+    """Endpoint for the item hierarchy of a taxonomy."""
+
+    def _check_path_params(self, namespace: str, taxonomy: str):
+        if not namespace or not namespace.isdigit():
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                message=gettext("The requested namespace id has the wrong format!"),
+            )
+        if not taxonomy or not taxonomy.isdigit():
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                message=gettext("The requested taxonomy id has the wrong format!"),
+            )
+
+    def _get_taxonomy(self, namespace: str, taxonomy: str) -> Taxonomy:
+        found_taxonomy: Optional[Taxonomy] = Taxonomy.query.filter(
+            Taxonomy.id == int(taxonomy),
+            Taxonomy.namespace_id == int(namespace),
+        ).first()
+
+        if found_taxonomy is None:
+            abort(HTTPStatus.NOT_FOUND, message=gettext("Taxonomy not found."))
+        return found_taxonomy  # is not None because abort raises exception
+
+    def _get_self_link(
+        self,
+        taxonomy: Taxonomy,
+        root_ids: Optional[Sequence[int]],
+        max_depth: Optional[int],
+    ) -> ApiLink:
+        query_params = {}
+        if root_ids:
+            query_params["root"] = [str(root_id) for root_id in root_ids]
+        if max_depth is not None:
+            query_params["depth"] = str(max_depth)
+        return ApiLink(
+            href=url_for(
+                "api-v1.TaxonomyTreeView",
+                namespace=str(taxonomy.namespace_id),
+                taxonomy=str(taxonomy.id),
+                **query_params,
+                _external=True,
+            ),
+            rel=tuple(),
+            resource_type=TAXONOMY_TREE_REL_TYPE,
+            resource_key={
+                "namespaceId": str(taxonomy.namespace_id),
+                "taxonomyId": str(taxonomy.id),
+            },
+        )
+
+    @API_V1.arguments(TaxonomyTreeParamsSchema, location="query", as_kwargs=True)
+    @API_V1.response(200, DynamicApiResponseSchema(TaxonomyTreeSchema()))
+    @API_V1.require_jwt("jwt")
+    def get(
+        self,
+        namespace: str,
+        taxonomy: str,
+        root: Optional[List[str]] = None,
+        depth: Optional[int] = None,
+    ):
+        """Get the current items of a taxonomy as a tree.
+
+        Every item is contained once (breadth first from the roots) with the
+        ids of its parents and children. Use ``root`` to only get the subtrees
+        of some items and ``depth`` to limit the depth of the items below the
+        roots (the children of items at the maximum depth are not included).
+        """
+        self._check_path_params(namespace=namespace, taxonomy=taxonomy)
+        found_taxonomy = self._get_taxonomy(namespace=namespace, taxonomy=taxonomy)
+        FLASK_OSO.authorize_and_set_resource(
+            OsoResource(
+                TAXONOMY_ITEM_REL_TYPE, is_collection=True, parent_resource=found_taxonomy
+            )
+        )
+
+        validator = get_resource_validator(
+            found_taxonomy,
+            found_taxonomy.namespace,
+            extra_state=get_taxonomy_content_state(found_taxonomy.id),
+        )
+        not_modified = check_not_modified(validator)
+        if not_modified is not None:
+            return not_modified
+
+        root_ids: Optional[List[int]] = None
+        if root:
+            root_ids = sorted({int(root_id) for root_id in root})
+
+        tree = load_taxonomy_tree(found_taxonomy.id, root_ids)
+
+        if root_ids is None:
+            roots = tree.get_toplevel_items()
+        else:
+            if any(root_id not in tree.items for root_id in root_ids):
+                abort(HTTPStatus.NOT_FOUND, message=gettext("Taxonomy item not found."))
+            roots = sorted(root_ids, key=tree.sort_key)
+
+        url_values = {
+            "namespace": str(found_taxonomy.namespace_id),
+            "taxonomy": str(found_taxonomy.id),
+        }
+        tree_items: List[TaxonomyTreeItemData] = []
+        for item_id, item_depth in tree.walk(roots, max_depth=depth):
+            item = tree.items[item_id]
+            tree_items.append(
+                TaxonomyTreeItemData(
+                    id=str(item_id),
+                    href=cached_url_for(
+                        TAXONOMY_ITEM_RESOURCE,
+                        taxonomy_item=str(item_id),
+                        _external=True,
+                        **url_values,
+                    ),
+                    name=item.name,
+                    description=item.description,
+                    sort_key=item.sort_key,
+                    version=item.version,
+                    depth=item_depth,
+                    parents=[str(parent) for parent in tree.parents.get(item_id, ())],
+                    children=[str(child) for child in tree.children.get(item_id, ())],
+                )
+            )
+
+        return (
+            ApiResponse(
+                links=[
+                    LinkGenerator.get_link_of(found_taxonomy, extra_relations=(UP_REL,))
+                ],
+                data=TaxonomyTreeData(
+                    self=self._get_self_link(found_taxonomy, root_ids, depth),
+                    roots=[str(root_id) for root_id in roots],
+                    max_depth=depth,
+                    items=tree_items,
+                ),
+            ),
+            validator.headers,
+        )
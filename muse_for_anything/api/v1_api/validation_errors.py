@@ -0,0 +1,115 @@
+"""Module containing a collector for json schema validation errors.
+
+The collector stops consuming (lazily produced) validation errors once the
+configured maximum number of errors is reached, so rejecting invalid data
+does not require finding every error. Collected errors are reported to the
+api client keyed by the json pointer of the invalid value.
+"""
+
+from http import HTTPStatus
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from flask import current_app
+from flask_smorest import abort
+from jsonschema.exceptions import ValidationError
+
+from ...util.logging import get_logger
+
+VALIDATION_LOGGER = "validation"
+
+
+def json_pointer(path: Iterable[Union[str, int]], prefix: str = "") -> str:
+    """Build a json pointer (RFC 6901) from the path segments."""
+    segments = (str(segment).replace("~", "~0").replace("/", "~1") for segment in path)
+    return prefix + "".join(f"/{segment}" for segment in segments)
+
+
+class ValidationErrorCollector:
+    """Collect validation errors until the maximum number of errors is reached."""
+
+    def __init__(self, max_errors: Optional[int] = None, fail_fast: bool = False) -> None:
+        """Create a new collector.
+
+        Args:
+            max_errors (Optional[int], optional): the maximum number of collected
+                errors. Defaults to None (collect all errors).
+            fail_fast (bool, optional): stop after the first error. Defaults to False.
+        """
+        self.max_errors = 1 if fail_fast else max_errors
+        self.errors: List[ValidationError] = []
+
+    @classmethod
+    def from_config(cls) -> "ValidationErrorCollector":
+        """Create a collector configured by the config of the current app."""
+        config = current_app.config
+        return cls(
+            max_errors=config.get("SCHEMA_VALIDATION_MAX_ERRORS"),
+            fail_fast=config.get("SCHEMA_VALIDATION_FAIL_FAST", False),
+        )
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """The number of errors that can still be collected (None if unlimited)."""
+        if self.max_errors is None:
+            return None
+        return max(self.max_errors - len(self.errors), 0)
+
+    @property
+    def is_full(self) -> bool:
+        return self.max_errors is not None and len(self.errors) >= self.max_errors
+
+    def collect(self, errors: Iterable[ValidationError]) -> bool:
+        """Collect the errors until the collector is full.
+
+        Errors after the maximum number of errors are not consumed.
+
+        Returns:
+            bool: True if the collector is full
+        """
+        if self.is_full:
+            return True
+        for error in errors:
+            self.errors.append(error)
+            if self.is_full:
+                return True
+        return False
+
+    def to_json(self, prefix: str = "") -> Dict[str, List[str]]:
+        """Get the error messages keyed by the json pointer of the invalid values.
+
+        Args:
+            prefix (str, optional): json pointer prepended to the paths of the errors
+        """
+        messages: Dict[str, List[str]] = {}
+        for error in self.errors:
+            pointer = json_pointer(error.absolute_path, prefix=prefix)
+            messages.setdefault(pointer, []).append(error.message)
+        return messages
+
+    def abort_if_invalid(self, message: str, prefix: str = "", location: str = "json"):
+        """Abort the request with a 400 response if any errors were collected.
+
+        Args:
+            message (str): the message of the error response
+            prefix (str, optional): json pointer of the validated data in the
+                request body
+            location (str, optional): the request location of the validated data
+        """
+        if not self.errors:
+            return
+        get_logger(current_app, VALIDATION_LOGGER).debug(
+            "Rejected request with %d validation error(s)%s: %s",
+            len(self.errors),
+            " (limit reached)" if self.is_full else "",
+            "; ".join(_describe(self.errors[:5], prefix)),
+        )
+        abort(
+            HTTPStatus.BAD_REQUEST,
+            message=message,
+            errors={location: self.to_json(prefix=prefix)},
+        )
+
+
+def _describe(errors: Sequence[ValidationError], prefix: str) -> Iterable[str]:
+    for error in errors:
+        yield f"{json_pointer(error.absolute_path, prefix=prefix) or '/'}: {error.message}"
@@ -0,0 +1,200 @@
+"""Module containing a process wide cache of prepared json schema validators.
+
+Type version schemas never change after they are created. The validator of a
+type version (and every remote schema resolved while validating objects
+against it) is therefore prepared once and reused for all objects of that
+type version. Validation plans (for validating objects and extracting
+resource references in a single pass) are cached with the validator. The
+cache is bounded by the number of entries and by the
+approximate size of the cached schemas.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from json import dumps
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from flask import Flask
+from jsonschema import Draft7Validator
+from referencing import Registry, Resource
+from referencing.jsonschema import DRAFT7
+
+from ..json_schema import SchemaWalker, UnsupportedSchemaError, ValidationPlan
+from ...db.models.ontology_objects import OntologyObjectTypeVersion
+
+
+def _schema_size(schema: Any) -> int:
+    """Approximate the memory used by a schema by the size of its json representation."""
+    return len(dumps(schema, separators=(",", ":")))
+
+
+@dataclass
+class PreparedValidator:
+    """A validator of a type version with the store of its resolved ``$ref`` urls."""
+
+    type_version_id: int
+    validator: Draft7Validator = field(repr=False)
+    store: Dict[str, Resource] = field(default_factory=dict, repr=False)
+    size: int = 0
+    # validation plans by match predicate (None if the schema is not supported)
+    plans: Dict[Callable, Optional[ValidationPlan]] = field(
+        default_factory=dict, repr=False
+    )
+
+
+class TypeVersionValidatorCache:
+    """LRU cache of prepared validators keyed by the id of the type version."""
+
+    def __init__(self) -> None:
+        self.max_entries = 512
+        self.max_size = 64_000_000
+        self._validators: "OrderedDict[int, PreparedValidator]" = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def init_app(self, app: Flask):
+        self.max_entries = app.config.get(
+            "SCHEMA_VALIDATOR_CACHE_MAX_ENTRIES", self.max_entries
+        )
+        self.max_size = app.config.get("SCHEMA_VALIDATOR_CACHE_MAX_SIZE", self.max_size)
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._validators.clear()
+            self._size = 0
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the metrics of the cache (e.g. for logging)."""
+        return {
+            "entries": len(self._validators),
+            "size": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def get_validator(
+        self,
+        type_version: OntologyObjectTypeVersion,
+        resolve_url: Callable[[str], Any],
+    ) -> Draft7Validator:
+        """Get the (cached) validator of the type version.
+
+        Args:
+            type_version (OntologyObjectTypeVersion): the type version to validate against
+            resolve_url (Callable[[str], Any]): function resolving the (remote)
+                ``$ref`` urls of the schema to the referenced schema
+        """
+        return self._get_prepared(type_version, resolve_url).validator
+
+    def get_plan(
+        self,
+        type_version: OntologyObjectTypeVersion,
+        resolve_url: Callable[[str], Any],
+        match: Callable[[SchemaWalker], bool],
+    ) -> Optional[ValidationPlan]:
+        """Get the (cached) validation plan of the type version.
+
+        Returns None if the schema of the type version is not supported by
+        validation plans (use the validator instead).
+
+        Args:
+            type_version (OntologyObjectTypeVersion): the type version to validate against
+            resolve_url (Callable[[str], Any]): function resolving the (remote)
+                ``$ref`` urls of the schema to the referenced schema
+            match (Callable[[SchemaWalker], bool]): the predicate selecting the
+                data nodes collected by the plan
+        """
+        prepared = self._get_prepared(type_version, resolve_url)
+        if match not in prepared.plans:
+            try:
+                plan: Optional[ValidationPlan] = ValidationPlan(
+                    prepared.validator, type_version.data, resolve_url, match
+                )
+            except UnsupportedSchemaError:
+                plan = None
+            prepared.plans[match] = plan
+        plan = prepared.plans[match]
+        if plan is None or plan.unsupported is not None:
+            return None
+        return plan
+
+    def _get_prepared(
+        self,
+        type_version: OntologyObjectTypeVersion,
+        resolve_url: Callable[[str], Any],
+    ) -> PreparedValidator:
+        with self._lock:
+            prepared = self._validators.get(type_version.id)
+            if prepared is not None:
+                self._validators.move_to_end(type_version.id)
+                self.hits += 1
+                return prepared
+            self.misses += 1
+
+        prepared = self._prepare(type_version, resolve_url)
+
+        with self._lock:
+            if type_version.id not in self._validators:
+                self._validators[type_version.id] = prepared
+                self._size += prepared.size
+                self._evict()
+        return prepared
+
+    def _prepare(
+        self,
+        type_version: OntologyObjectTypeVersion,
+        resolve_url: Callable[[str], Any],
+    ) -> PreparedValidator:
+        schema = type_version.data
+        store: Dict[str, Resource] = {}
+        prepared: Optional[PreparedValidator] = None
+
+        def retrieve(url: str) -> Resource:
+            resource = store.get(url)
+            if resource is None:
+                contents = resolve_url(url)
+                resource = Resource.from_contents(contents, default_specification=DRAFT7)
+                store[url] = resource
+                if prepared is not None:
+                    self._add_size(prepared, _schema_size(contents))
+            return resource
+
+        validator = Draft7Validator(schema, registry=Registry(retrieve=retrieve))
+        prepared = PreparedValidator(
+            type_version_id=type_version.id,
+            validator=validator,
+            store=store,
+            size=_schema_size(schema),
+        )
+        return prepared
+
+    def _add_size(self, prepared: PreparedValidator, size: int):
+        with self._lock:
+            prepared.size += size
+            if self._validators.get(prepared.type_version_id) is prepared:
+                self._size += size
+                self._evict()
+
+    def _evict(self):
+        # always keep the most recently used entry
+        while len(self._validators) > 1 and (
+            len(self._validators) > self.max_entries or self._size > self.max_size
+        ):
+            _, evicted = self._validators.popitem(last=False)
+            self._size -= evicted.size
+            self.evictions += 1
+
+
+TYPE_VERSION_VALIDATORS = TypeVersionValidatorCache()
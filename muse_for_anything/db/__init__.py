@@ -4,6 +4,7 @@ from flask import Flask
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
 
+from .collection_sizes import COLLECTION_SIZES
 from .db import DB, MIGRATE
 from .cli import register_cli_blueprint
 
@@ -18,6 +19,8 @@ def register_db(app: Flask):
     DB.init_app(app)
     app.logger.info(f'Connected to db "{app.config["SQLALCHEMY_DATABASE_URI"]}".')
 
+    COLLECTION_SIZES.init_app(app)
+
     register_cli_blueprint(app)
 
     MIGRATE.init_app(app, DB)
@@ -1,6 +1,7 @@
 """CLI functions for the db module."""
 
-from typing import Optional
+import json
+from typing import Any, Callable, Dict, Optional
 
 import click
 from flask import Blueprint, Flask, current_app
@@ -12,7 +13,17 @@ from . import models  # noqa
 from .db import DB
 from .models import owl
 from .models.namespace import Namespace
+from .models.ontology_objects import OntologyObjectType, OntologyObjectTypeVersion
+from .models.revalidation import ObjectRevalidationTask
+from .models.taxonomies import Taxonomy, TaxonomyItem
+from .models.taxonomy_closure import rebuild_taxonomy_closure
 from .models.users import ALLOWED_USER_ROLES, User, UserRole
+from .taxonomy_import import (
+    TaxonomyImport,
+    TaxonomyImportError,
+    TaxonomyImportResult,
+    import_taxonomy_items,
+)
 
 DB_CLI_BLP = Blueprint("db_cli", __name__, cli_group=None)
 DB_CLI = DB_CLI_BLP.cli  # expose as attribute for autodoc generation
@@ -193,6 +204,256 @@ def remove_user_role_cli(username: str, role: str):
         click.echo(f"could not find user with name {username}")
 
 
+@DB_CLI.command("revalidate-objects")
+@click.option("-t", "--type-id", type=int, default=None, help="The object type.")
+@click.option(
+    "-v",
+    "--version",
+    type=int,
+    default=None,
+    help="The type version to validate against (defaults to the current version).",
+)
+@click.option(
+    "--create-versions",
+    is_flag=True,
+    default=False,
+    help="Create new object versions for all valid objects.",
+)
+@click.option(
+    "-r", "--resume", "task_id", type=int, default=None, help="Resume the task."
+)
+@click.option("-b", "--batch-size", type=int, default=None)
+@click.option(
+    "-p",
+    "--processes",
+    type=int,
+    default=None,
+    help="The number of worker processes (0 to validate in the current process).",
+)
+@click.option(
+    "--base-url",
+    default=None,
+    help="The base url of the api (used in the schema urls of the type versions).",
+)
+def revalidate_objects_cli(
+    type_id: Optional[int],
+    version: Optional[int],
+    create_versions: bool,
+    task_id: Optional[int],
+    batch_size: Optional[int],
+    processes: Optional[int],
+    base_url: Optional[str],
+):
+    """Validate all objects of a type against a (new) version of the type.
+
+    Objects whose current version already uses the type version are skipped.
+    Interrupted revalidation tasks can be resumed with --resume.
+    """
+    app = current_app._get_current_object()
+    # schema references are resolved against the url map of a request context
+    with app.test_request_context(base_url=base_url):
+        task = get_revalidation_task(type_id, version, create_versions, task_id)
+        if task is None:
+            return
+        if task.is_finished:
+            click.echo(f"Revalidation task {task.id} is already finished.")
+            return
+        click.echo(
+            f"Revalidating objects of type {task.object_type_id} against type "
+            f"version {task.type_version.version} (task {task.id})."
+        )
+        revalidate_objects(
+            app,
+            task,
+            batch_size=batch_size,
+            processes=processes,
+            on_progress=lambda t: click.echo(
+                f"{t.objects_checked}/{t.objects_total} objects checked "
+                f"({t.objects_invalid} invalid)."
+            ),
+        )
+        click.echo(
+            f"Revalidation task {task.id} finished: {task.objects_valid} valid, "
+            f"{task.objects_invalid} invalid, {task.versions_created} new versions."
+        )
+        for result in task.get_invalid_results(limit=20):
+            click.echo(f"Object {result.object_id} is invalid: {result.errors}")
+
+
+def get_revalidation_task(
+    type_id: Optional[int],
+    version: Optional[int],
+    create_versions: bool = False,
+    task_id: Optional[int] = None,
+) -> Optional[ObjectRevalidationTask]:
+    if task_id is not None:
+        task = DB.session.get(ObjectRevalidationTask, task_id)
+        if task is None:
+            click.echo(f"could not find revalidation task {task_id}")
+        return task
+    object_type: Optional[OntologyObjectType] = None
+    if type_id is not None:
+        object_type = DB.session.get(OntologyObjectType, type_id)
+    if object_type is None:
+        click.echo(f"could not find object type {type_id}")
+        return None
+    type_version: Optional[OntologyObjectTypeVersion] = object_type.current_version
+    if version is not None:
+        type_version = OntologyObjectTypeVersion.query.filter(
+            OntologyObjectTypeVersion.object_type_id == object_type.id,
+            OntologyObjectTypeVersion.version == version,
+        ).first()
+    if type_version is None:
+        click.echo(f"could not find version {version} of object type {type_id}")
+        return None
+    task = ObjectRevalidationTask(
+        ontology_type=object_type,
+        type_version=type_version,
+        create_versions=create_versions,
+    )
+    DB.session.add(task)
+    DB.session.commit()
+    return task
+
+
+def revalidate_objects(
+    app: Flask,
+    task: ObjectRevalidationTask,
+    batch_size: Optional[int] = None,
+    processes: Optional[int] = None,
+    on_progress: Optional[Callable[[ObjectRevalidationTask], None]] = None,
+):
+    # import late to avoid circular imports (the api depends on the db module)
+    from ..api.v1_api.object_revalidation import ObjectRevalidationJob
+
+    if batch_size is None:
+        batch_size = app.config.get("OBJECT_REVALIDATION_BATCH_SIZE", 200)
+    if processes is None:
+        processes = app.config.get("OBJECT_REVALIDATION_PROCESSES")
+    ObjectRevalidationJob(
+        task, batch_size=batch_size, processes=processes, on_progress=on_progress
+    ).run()
+    get_logger(app, DB_COMMAND_LOGGER).info(f"Revalidation task {task.id} finished.")
+
+
+@DB_CLI.command("rebuild-taxonomy-closure")
+@click.option(
+    "-t",
+    "--taxonomy-id",
+    type=int,
+    default=None,
+    help="The taxonomy (defaults to all taxonomies).",
+)
+def rebuild_taxonomy_closure_cli(taxonomy_id: Optional[int]):
+    """Rebuild the closure table of the taxonomy item hierarchy."""
+    rows = rebuild_taxonomy_closures(current_app, taxonomy_id)
+    if rows is None:
+        click.echo(f"could not find taxonomy {taxonomy_id}")
+    else:
+        click.echo(f"Taxonomy closure rebuilt ({rows} ancestor descendant pairs).")
+
+
+def rebuild_taxonomy_closures(app: Flask, taxonomy_id: Optional[int] = None):
+    if taxonomy_id is None:
+        taxonomy_ids = DB.session.execute(DB.select(Taxonomy.id)).scalars().all()
+    elif DB.session.get(Taxonomy, taxonomy_id) is None:
+        return None
+    else:
+        taxonomy_ids = [taxonomy_id]
+    connection = DB.session.connection()
+    rows = sum(
+        rebuild_taxonomy_closure(connection, taxonomy_id) for taxonomy_id in taxonomy_ids
+    )
+    DB.session.commit()
+    get_logger(app, DB_COMMAND_LOGGER).info(
+        f"Rebuilt the closure table of {len(taxonomy_ids)} taxonomies."
+    )
+    return rows
+
+
+@DB_CLI.command("import-taxonomy")
+@click.option("-t", "--taxonomy-id", type=int, required=True, help="The taxonomy.")
+@click.option(
+    "-p",
+    "--parent-id",
+    type=int,
+    default=None,
+    help="An existing item that becomes the parent of all toplevel imported items.",
+)
+@click.argument("file", type=click.File("r"))
+def import_taxonomy_cli(taxonomy_id: int, parent_id: Optional[int], file):
+    """Import taxonomy items from a json file.
+
+    The file uses the format of the taxonomy import api: an object with the
+    (nested) "items" and optional "relations" between the item keys. A
+    plain list of (nested) items is accepted as well.
+    """
+    # import late to avoid circular imports (the api depends on the db module)
+    from marshmallow import ValidationError
+
+    from ..api.v1_api.models.ontology import TaxonomyImportSchema
+
+    data = json.load(file)
+    if isinstance(data, list):
+        data = {"items": data}
+    try:
+        data = TaxonomyImportSchema().load(data)
+    except ValidationError as err:
+        click.echo(f"Invalid import file: {err.messages}")
+        return
+    if parent_id is None and data.get("parent"):
+        parent_id = int(data["parent"])
+    try:
+        result = import_taxonomy(current_app, taxonomy_id, data, parent_id)
+    except TaxonomyImportError as err:
+        click.echo(f"Could not import the taxonomy items: {err}")
+        return
+    if result is None:
+        if parent_id is None:
+            click.echo(f"could not find taxonomy {taxonomy_id}")
+        else:
+            click.echo(f"could not find item {parent_id} in taxonomy {taxonomy_id}")
+        return
+    click.echo(
+        f"Imported {result.items_created} items ({result.toplevel_items} toplevel "
+        f"items) and {result.relations_created} relations into taxonomy {taxonomy_id}."
+    )
+
+
+def import_taxonomy(
+    app: Flask,
+    taxonomy_id: int,
+    data: Dict[str, Any],
+    parent_id: Optional[int] = None,
+) -> Optional[TaxonomyImportResult]:
+    taxonomy: Optional[Taxonomy] = DB.session.get(Taxonomy, taxonomy_id)
+    if taxonomy is None:
+        return None
+    parent: Optional[TaxonomyItem] = None
+    if parent_id is not None:
+        parent = DB.session.get(TaxonomyItem, parent_id)
+        if (
+            parent is None
+            or parent.taxonomy_id != taxonomy.id
+            or parent.deleted_on is not None
+        ):
+            return None
+    try:
+        result = import_taxonomy_items(
+            taxonomy,
+            TaxonomyImport.from_data(data["items"], data.get("relations", ())),
+            parent=parent,
+        )
+    except TaxonomyImportError:
+        DB.session.rollback()
+        raise
+    DB.session.commit()
+    get_logger(app, DB_COMMAND_LOGGER).info(
+        f"Imported {result.items_created} items into taxonomy {taxonomy_id}."
+    )
+    return result
+
+
 @DB_CLI.command("drop-db")
 def drop_db():
     """Drop all db tables."""
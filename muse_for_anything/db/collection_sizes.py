@@ -0,0 +1,370 @@
+"""Module containing a cache for the sizes of (filtered) collections.
+
+Counting the items of a collection is the most expensive part of a paginated
+listing. The cache distinguishes two kinds of filters:
+
+Simple filters only compare columns of the model table with constant values
+(e.g. ``deleted_on == None`` and ``namespace_id == 1``). Their counts are
+kept up to date on commit by evaluating the filter against the old and new
+state of every flushed row. This effectively keeps per namespace (or per
+parent resource) counters for the listings.
+
+All other filters (e.g. search filters) are cached until one of the tables
+they reference is changed. The counts are always exact, as the pagination
+derives the pages from them.
+
+The cache is local to the process. Commits of other worker processes are
+not seen, so their changes only become visible once the cached sizes expire
+(``COLLECTION_SIZE_CACHE_TTL``).
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import RLock
+from time import monotonic
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
+
+from flask import Flask
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, Null
+from sqlalchemy.sql.schema import Column, Table
+from sqlalchemy.sql.util import find_tables
+
+from ..util.logging import get_logger
+from .db import DB, MODEL
+
+_PENDING_DELTAS_KEY = "collection_size_deltas"
+_PENDING_TABLES_KEY = "collection_size_changed_tables"
+
+# (column key, operator, value)
+SimpleCriterion = Tuple[str, str, Hashable]
+
+
+@dataclass
+class CollectionSize:
+    """A cached collection size."""
+
+    count: int
+    tables: FrozenSet[str]
+    created_on: float
+    is_simple: bool
+
+
+def _parse_simple_criterion(
+    table: Table, criterion: Any
+) -> Optional[Tuple[str, str, Hashable]]:
+    """Parse a filter criterion of the form ``column <op> constant``.
+
+    Returns None if the criterion is not a simple criterion on the given table.
+    """
+    if not isinstance(criterion, BinaryExpression):
+        return None
+    left, right = criterion.left, criterion.right
+    if not isinstance(left, Column) or left.table is not table:
+        return None
+    if isinstance(right, Null):
+        if criterion.operator is operators.is_:
+            return (left.key, "is", None)
+        if criterion.operator is operators.is_not:
+            return (left.key, "is_not", None)
+        return None
+    if not isinstance(right, BindParameter):
+        return None
+    value = right.effective_value
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    if criterion.operator is operators.eq:
+        return (left.key, "eq", value)
+    if criterion.operator is operators.ne:
+        return (left.key, "ne", value)
+    return None
+
+
+def _matches(values: Dict[str, Any], criteria: Iterable[SimpleCriterion]) -> bool:
+    """Evaluate simple criteria against the column values of a row."""
+    for key, op, value in criteria:
+        current = values.get(key)
+        if op == "is" and current is not None:
+            return False
+        if op == "is_not" and current is None:
+            return False
+        if op == "eq" and current != value:
+            return False
+        if op == "ne" and (current is None or current == value):
+            return False
+    return True
+
+
+class CollectionSizeCache:
+    """Cache for the sizes of (filtered) collections used in paginated listings.
+
+    Settings can be changed in the app config.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.enabled: bool = False
+        self.ttl: float = 60
+        self.max_entries: int = 10_000
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[Hashable, CollectionSize]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = RLock()
+        self._listeners_registered = False
+        self._logger = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        """Initializes the cache with the flask app settings."""
+        self.enabled = app.config.get("COLLECTION_SIZE_CACHE_ENABLED", False)
+        # bounds the staleness of counts in multi process deployments
+        self.ttl = app.config.get("COLLECTION_SIZE_CACHE_TTL", 60)
+        self.max_entries = app.config.get("COLLECTION_SIZE_CACHE_MAX_ENTRIES", 10_000)
+        self._logger = get_logger(app, "collection_sizes")
+        self.clear()
+
+        if not self._listeners_registered:
+            event.listen(DB.session, "after_flush", self._record_flush)
+            event.listen(DB.session, "do_orm_execute", self._record_statement)
+            event.listen(DB.session, "after_commit", self._apply_changes)
+            event.listen(DB.session, "after_rollback", self._discard_changes)
+            self._listeners_registered = True
+
+    def clear(self):
+        """Remove all cached collection sizes."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def invalidate(self, model: Optional[Type[MODEL]] = None):
+        """Remove all cached collection sizes that depend on the table of the model.
+
+        Invalidates all cached sizes if no model is given.
+        """
+        if model is None:
+            with self._lock:
+                self._entries.clear()
+            return
+        self._invalidate_tables({model.__table__.name})
+
+    def get_collection_size(
+        self, model: Type[MODEL], filter_criteria: Sequence[Any] = tuple()
+    ) -> int:
+        """Get the number of rows of the model matching the filter criteria.
+
+        Args:
+            model (Type[MODEL]): the db model
+            filter_criteria (Sequence[Any], optional): the filter criteria. Defaults to tuple().
+
+        Returns:
+            int: the (cached) collection size
+        """
+        if not self.enabled:
+            return self._count(model, filter_criteria)
+
+        table: Table = model.__table__
+        simple_criteria = [_parse_simple_criterion(table, c) for c in filter_criteria]
+        is_simple = all(c is not None for c in simple_criteria)
+
+        key: Hashable
+        tables: FrozenSet[str]
+        if is_simple:
+            key = (table.name, frozenset(simple_criteria))
+            tables = frozenset((table.name,))
+        else:
+            key = self._complex_key(table, filter_criteria)
+            tables = frozenset(
+                t.name
+                for c in filter_criteria
+                for t in find_tables(c, include_aliases=True)
+                if isinstance(t, Table)
+            ) | {table.name}
+
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.created_on <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.count
+            self.misses += 1
+            generations = {t: self._generations.get(t, 0) for t in tables}
+
+        count = self._count(model, filter_criteria)
+
+        if tables & self._pending_tables(DB.session()):
+            # the count includes uncommitted changes of the current transaction
+            return count
+
+        with self._lock:
+            if any(self._generations.get(t, 0) != g for t, g in generations.items()):
+                return count  # a concurrent commit changed the collection
+            self._entries[key] = CollectionSize(
+                count=count,
+                tables=tables,
+                created_on=now,
+                is_simple=is_simple,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return count
+
+    def _count(self, model: Type[MODEL], filter_criteria: Sequence[Any]) -> int:
+        return model.query.filter(*filter_criteria).enable_eagerloads(False).count()
+
+    def _complex_key(self, table: Table, filter_criteria: Sequence[Any]) -> Hashable:
+        criteria_keys = []
+        for criterion in filter_criteria:
+            compiled = criterion.compile()
+            params = tuple(sorted((k, repr(v)) for k, v in compiled.params.items()))
+            criteria_keys.append((str(compiled), params))
+        return (table.name, tuple(criteria_keys))
+
+    def _pending_tables(self, session: Session) -> Set[str]:
+        tables: Set[str] = {
+            t.removeprefix("bulk:") for t in session.info.get(_PENDING_TABLES_KEY, ())
+        }
+        tables.update(t for t, _ in session.info.get(_PENDING_DELTAS_KEY, {}))
+        return tables
+
+    def _invalidate_tables(self, tables: Set[str]):
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [k for k, e in self._entries.items() if e.tables & tables]
+            for key in stale:
+                del self._entries[key]
+
+    def _record_flush(self, session: Session, flush_context):
+        """Record the changes of all simple collection sizes affected by the flush."""
+        if not self.enabled:
+            return
+        changed_tables: Set[str] = session.info.setdefault(_PENDING_TABLES_KEY, set())
+        deltas: Dict[Tuple[str, Hashable], int] = session.info.setdefault(
+            _PENDING_DELTAS_KEY, {}
+        )
+
+        with self._lock:
+            simple_entries: Dict[str, list] = {}
+            for key, entry in self._entries.items():
+                if entry.is_simple:
+                    simple_entries.setdefault(key[0], []).append(key)
+
+        for instance, is_new, is_deleted in self._flushed_instances(session):
+            table = getattr(type(instance), "__table__", None)
+            if not isinstance(table, Table):
+                continue
+            changed_tables.add(table.name)
+            keys = simple_entries.get(table.name)
+            if not keys:
+                continue
+            old_values, new_values, is_complete = self._row_values(instance)
+            if not is_complete and not is_new:
+                # the change cannot be evaluated, invalidate all sizes of the table
+                changed_tables.add(f"bulk:{table.name}")
+                continue
+            for key in keys:
+                old_match = not is_new and _matches(old_values, key[1])
+                new_match = not is_deleted and _matches(new_values, key[1])
+                if old_match != new_match:
+                    delta_key = (table.name, key)
+                    deltas[delta_key] = deltas.get(delta_key, 0) + (
+                        1 if new_match else -1
+                    )
+
+    def _flushed_instances(self, session: Session):
+        for instance in session.new:
+            yield instance, True, False
+        for instance in session.deleted:
+            yield instance, False, True
+        for instance in session.dirty:
+            yield instance, False, False
+
+    def _row_values(self, instance: Any) -> Tuple[Dict[str, Any], Dict[str, Any], bool]:
+        """Get the old and new column values of a flushed instance.
+
+        The last value is False if not all column values were loaded.
+        """
+        state = inspect(instance)
+        old_values: Dict[str, Any] = {}
+        new_values: Dict[str, Any] = {}
+        is_complete = state.unloaded.isdisjoint(state.mapper.column_attrs.keys())
+        for column_attr in state.mapper.column_attrs:
+            history = state.attrs[column_attr.key].history
+            for column in column_attr.columns:
+                new_value = state.dict.get(column_attr.key)
+                old_value = history.deleted[0] if history.deleted else new_value
+                old_values[column.key] = old_value
+                new_values[column.key] = new_value
+        return old_values, new_values, is_complete
+
+    def _record_statement(self, orm_execute_state: ORMExecuteState):
+        """Record the tables changed by bulk statements that bypass the unit of work."""
+        if not self.enabled:
+            return
+        if not (
+            orm_execute_state.is_insert
+            or orm_execute_state.is_update
+            or orm_execute_state.is_delete
+        ):
+            return
+        table = getattr(orm_execute_state.statement, "table", None)
+        if isinstance(table, Table):
+            orm_execute_state.session.info.setdefault(_PENDING_TABLES_KEY, set()).add(
+                f"bulk:{table.name}"
+            )
+
+    def _apply_changes(self, session: Session):
+        """Apply the recorded changes to the cached collection sizes on commit."""
+        changed_tables: Set[str] = session.info.pop(_PENDING_TABLES_KEY, set())
+        deltas: Dict[Tuple[str, Hashable], int] = session.info.pop(
+            _PENDING_DELTAS_KEY, {}
+        )
+        if not changed_tables and not deltas:
+            return
+        bulk_changed = {
+            t.removeprefix("bulk:") for t in changed_tables if t.startswith("bulk:")
+        }
+        changed_tables = {t for t in changed_tables if not t.startswith("bulk:")}
+
+        with self._lock:
+            for table in changed_tables | bulk_changed:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            for (table, key), delta in deltas.items():
+                entry = self._entries.get(key)
+                if entry is not None and table not in bulk_changed:
+                    entry.count = max(entry.count + delta, 0)
+            stale = [
+                k
+                for k, e in self._entries.items()
+                if (not e.is_simple and e.tables & changed_tables)
+                or e.tables & bulk_changed
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def _discard_changes(self, session: Session):
+        """Discard the recorded changes on rollback."""
+        session.info.pop(_PENDING_TABLES_KEY, None)
+        session.info.pop(_PENDING_DELTAS_KEY, None)
+
+
+COLLECTION_SIZES = CollectionSizeCache()
@@ -3,5 +3,8 @@
 from . import namespace  # noqa
 from . import ontology_objects  # noqa
 from . import taxonomies  # noqa
+from . import taxonomy_closure  # noqa
+from . import taxonomy_paths  # noqa
 from . import object_relation_tables  # noqa
 from . import users  # noqa
+from . import revalidation  # noqa
@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 from jinja2 import Environment, FileSystemLoader
 
 from muse_for_anything.db.models.namespace import Namespace
@@ -19,17 +21,29 @@ def map_namespace_to_owl(namespace: Namespace):
         str: The rendered OWL representation as a string.
     """
     taxonomies = Taxonomy.query.filter(
-        Taxonomy.deleted_on is None,
+        Taxonomy.deleted_on == None,
         Taxonomy.namespace_id == namespace.id,
     ).all()
 
+    # sorted by path to declare every class after its (first) superclass
+    taxonomy_items: Dict[int, List[TaxonomyItem]] = {
+        taxonomy.id: [] for taxonomy in taxonomies
+    }
+    if taxonomy_items:
+        items = TaxonomyItem.query.filter(
+            TaxonomyItem.deleted_on == None,
+            TaxonomyItem.taxonomy_id.in_(taxonomy_items),
+        ).order_by(TaxonomyItem.taxonomy_id, TaxonomyItem.path)
+        for item in items:
+            taxonomy_items[item.taxonomy_id].append(item)
+
     ontology_object_types = OntologyObjectType.query.filter(
-        OntologyObjectType.deleted_on is None,
+        OntologyObjectType.deleted_on == None,
         OntologyObjectType.namespace_id == namespace.id,
     ).all()
 
     ontology_objects = OntologyObject.query.filter(
-        OntologyObject.deleted_on is None,
+        OntologyObject.deleted_on == None,
         OntologyObject.namespace_id == namespace.id,
     ).all()
 
@@ -45,6 +59,7 @@ def map_namespace_to_owl(namespace: Namespace):
         "name": namespace.name,
         "description": namespace.description,
         "taxonomy_list": taxonomies,
+        "taxonomy_items": taxonomy_items,
         "type_list": ontology_object_types,
         "object_list": [
             (object, get_ontology_object_variables(object)) for object in ontology_objects
@@ -0,0 +1,169 @@
+"""Module containing the table definitions of object revalidation tasks."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.declarative import declared_attr
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.schema import ForeignKey, Index
+from sqlalchemy.types import DateTime, Text
+
+from ..db import DB, MODEL
+from .model_helpers import ChangesMixin, IdMixin
+from .ontology_objects import (
+    OntologyObject,
+    OntologyObjectType,
+    OntologyObjectTypeVersion,
+    OntologyObjectVersion,
+)
+
+REVALIDATION_PENDING = "pending"
+REVALIDATION_RUNNING = "running"
+REVALIDATION_FINISHED = "finished"
+REVALIDATION_FAILED = "failed"
+
+
+class ObjectRevalidationTask(MODEL, IdMixin, ChangesMixin):
+    """Task validating all objects of a type against a (new) version of the type.
+
+    The task is processed in batches of objects ordered by their id. The id of
+    the last processed object is stored with every batch, so an interrupted
+    task can be resumed.
+    """
+
+    __tablename__ = "ObjectRevalidationTask"
+
+    object_type_id: Mapped[int] = mapped_column(
+        ForeignKey(OntologyObjectType.id), nullable=False, index=True
+    )
+    type_version_id: Mapped[int] = mapped_column(
+        ForeignKey(OntologyObjectTypeVersion.id), nullable=False
+    )
+    create_versions: Mapped[bool] = mapped_column(nullable=False, default=False)
+    status: Mapped[str] = mapped_column(
+        DB.String(20), nullable=False, default=REVALIDATION_PENDING
+    )
+    message: Mapped[str] = mapped_column(DB.UnicodeText, nullable=True)
+    # resume after this object id
+    last_object_id: Mapped[int] = mapped_column(nullable=False, default=0)
+    objects_total: Mapped[int] = mapped_column(nullable=False, default=0)
+    objects_checked: Mapped[int] = mapped_column(nullable=False, default=0)
+    objects_valid: Mapped[int] = mapped_column(nullable=False, default=0)
+    objects_invalid: Mapped[int] = mapped_column(nullable=False, default=0)
+    versions_created: Mapped[int] = mapped_column(nullable=False, default=0)
+    finished_on: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # relationships
+    ontology_type: Mapped[OntologyObjectType] = relationship(
+        innerjoin=True, lazy="select"
+    )
+    type_version: Mapped[OntologyObjectTypeVersion] = relationship(
+        innerjoin=True, lazy="select"
+    )
+    results: Mapped[List["ObjectRevalidationResult"]] = relationship(
+        lazy="select",
+        order_by="ObjectRevalidationResult.object_id",
+        back_populates="task",
+    )
+
+    @property
+    def progress(self) -> float:
+        if not self.objects_total:
+            return 1.0 if self.status == REVALIDATION_FINISHED else 0.0
+        return min(self.objects_checked / self.objects_total, 1.0)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status == REVALIDATION_FINISHED
+
+    def get_invalid_results(
+        self, limit: Optional[int] = None
+    ) -> List["ObjectRevalidationResult"]:
+        """Get the results of the invalid objects (ordered by object id)."""
+        query = ObjectRevalidationResult.query.filter(
+            ObjectRevalidationResult.task_id == self.id,
+            ObjectRevalidationResult.valid == False,
+        ).order_by(ObjectRevalidationResult.object_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def __init__(
+        self,
+        ontology_type: OntologyObjectType,
+        type_version: OntologyObjectTypeVersion,
+        create_versions: bool = False,
+        **kwargs,
+    ) -> None:
+        if kwargs:
+            raise ValueError("Got unknown keyword arguments!")
+        self.ontology_type = ontology_type
+        self.type_version = type_version
+        self.create_versions = create_versions
+        self.status = REVALIDATION_PENDING
+        self.last_object_id = 0
+        self.objects_total = 0
+        self.objects_checked = 0
+        self.objects_valid = 0
+        self.objects_invalid = 0
+        self.versions_created = 0
+
+
+class ObjectRevalidationResult(MODEL, IdMixin):
+    """The result of validating a single object in a revalidation task."""
+
+    __tablename__ = "ObjectRevalidationResult"
+
+    task_id: Mapped[int] = mapped_column(
+        ForeignKey(ObjectRevalidationTask.id), nullable=False
+    )
+    object_id: Mapped[int] = mapped_column(ForeignKey(OntologyObject.id), nullable=False)
+    # the validated object version
+    object_version_id: Mapped[int] = mapped_column(
+        ForeignKey(OntologyObjectVersion.id), nullable=False
+    )
+    valid: Mapped[bool] = mapped_column(nullable=False)
+    # validation error messages keyed by json pointer
+    errors: Mapped[Text] = mapped_column(DB.JSON, nullable=True)
+    # the object version created for the new type version
+    new_version_id: Mapped[int] = mapped_column(
+        ForeignKey(OntologyObjectVersion.id), nullable=True
+    )
+
+    @declared_attr
+    def __table_args__(cls):
+        return (
+            Index(
+                f"ix_uq_task_object_{cls.__tablename__}",
+                "task_id",
+                "object_id",
+                unique=True,
+            ),
+        )
+
+    # relationships
+    task: Mapped[ObjectRevalidationTask] = relationship(
+        innerjoin=True, lazy="select", back_populates="results"
+    )
+    new_version: Mapped[Optional[OntologyObjectVersion]] = relationship(
+        lazy="select", foreign_keys=[new_version_id]
+    )
+
+    def __init__(
+        self,
+        task: ObjectRevalidationTask,
+        object_id: int,
+        object_version_id: int,
+        valid: bool,
+        errors: Optional[Dict[str, List[str]]] = None,
+        new_version: Optional[OntologyObjectVersion] = None,
+        **kwargs: Any,
+    ) -> None:
+        if kwargs:
+            raise ValueError("Got unknown keyword arguments!")
+        self.task = task
+        self.object_id = object_id
+        self.object_version_id = object_version_id
+        self.valid = valid
+        self.errors = errors
+        self.new_version = new_version
@@ -1,6 +1,7 @@
 """Module containing ontology object table definitions."""
 
 from typing import Any, Dict, List, Optional, cast
+from sqlalchemy import event
 from sqlalchemy.orm.query import Query
 from sqlalchemy.sql.schema import ForeignKey, Column, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
@@ -87,6 +88,25 @@ class TaxonomyItem(MODEL, IdMixin, ChangesMixin):
     current_version_id: Mapped[int] = mapped_column(
         ForeignKey("TaxonomyItemVersion.id"), nullable=True
     )
+    # copied from the current version to sort and filter items without a join
+    current_name: Mapped[str] = mapped_column(
+        DB.Unicode, nullable=True, index=True, info={"collate": "NOCASE"}
+    )
+    current_sort_key: Mapped[float] = mapped_column(nullable=True)
+    # the ids of the first parents from a toplevel item down to this item,
+    # e.g. "/1/5/9/" (see taxonomy_paths.py)
+    path: Mapped[str] = mapped_column(DB.String, nullable=True, index=True)
+
+    @declared_attr
+    def __table_args__(cls):
+        return (
+            Index(
+                f"ix_sort_{cls.__tablename__}",
+                "taxonomy_id",
+                "current_sort_key",
+                "current_name",
+            ),
+        )
 
     # relationships
     taxonomy: Mapped[Taxonomy] = relationship(
@@ -183,6 +203,14 @@ class TaxonomyItem(MODEL, IdMixin, ChangesMixin):
         self.taxonomy = taxonomy
 
 
+@event.listens_for(TaxonomyItem.current_version, "set")
+def _copy_current_version_columns(
+    target: TaxonomyItem, value: Optional["TaxonomyItemVersion"], oldvalue, initiator
+):
+    target.current_name = value.name if value is not None else None
+    target.current_sort_key = value.sort_key if value is not None else None
+
+
 class TaxonomyItemVersion(MODEL, IdMixin, NameDescriptionMixin, CreateDeleteMixin):
     """Taxonomy Item version model."""
 
@@ -0,0 +1,395 @@
+"""Module containing the closure table of the taxonomy item hierarchy.
+
+The closure table contains a row for every pair of taxonomy items where the
+descendant can be reached from the ancestor by following current (not deleted)
+taxonomy item relations. Taxonomies are directed acyclic graphs (an item can
+have multiple parents), so every row counts the distinct paths from the
+ancestor to the descendant. A row is only removed when the last path between
+the two items is removed.
+
+The table is maintained by the mapper events of the taxonomy item relations
+(creating, deleting and restoring a relation). Bulk updates bypassing the
+ORM must update the table themselves (e.g. with ``rebuild_taxonomy_closure``).
+"""
+
+from collections import Counter, defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.declarative import declared_attr
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.expression import bindparam, delete, insert, select, update
+from sqlalchemy.sql.schema import ForeignKey, Index
+from sqlalchemy.types import BigInteger
+
+from ..db import DB, MODEL
+from .model_helpers import IdMixin
+from .taxonomies import Taxonomy, TaxonomyItem, TaxonomyItemRelation
+
+# maximum number of ids in a single "IN" clause
+CLOSURE_QUERY_BATCH_SIZE = 500
+
+
+class TaxonomyItemClosure(MODEL, IdMixin):
+    """All (transitive) ancestor descendant pairs of taxonomy items."""
+
+    __tablename__ = "TaxonomyItemClosure"
+
+    taxonomy_id: Mapped[int] = mapped_column(
+        ForeignKey(Taxonomy.id), nullable=False, index=True
+    )
+    ancestor_id: Mapped[int] = mapped_column(ForeignKey(TaxonomyItem.id), nullable=False)
+    descendant_id: Mapped[int] = mapped_column(
+        ForeignKey(TaxonomyItem.id), nullable=False, index=True
+    )
+    # the number of distinct paths from the ancestor to the descendant
+    path_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=1)
+
+    @declared_attr
+    def __table_args__(cls):
+        return (
+            Index(
+                f"ix_uq_ancestor_descendant_{cls.__tablename__}",
+                "ancestor_id",
+                "descendant_id",
+                unique=True,
+            ),
+        )
+
+    def __init__(
+        self,
+        taxonomy_id: int,
+        ancestor_id: int,
+        descendant_id: int,
+        path_count: int = 1,
+        **kwargs,
+    ) -> None:
+        if kwargs:
+            raise ValueError("Got unknown keyword arguments!")
+        self.taxonomy_id = taxonomy_id
+        self.ancestor_id = ancestor_id
+        self.descendant_id = descendant_id
+        self.path_count = path_count
+
+    @staticmethod
+    def get_descendant_ids(taxonomy_item_id: int) -> Set[int]:
+        """Get the ids of all (transitive) children of a taxonomy item."""
+        return set(
+            DB.session.execute(
+                select(TaxonomyItemClosure.descendant_id).where(
+                    TaxonomyItemClosure.ancestor_id == taxonomy_item_id
+                )
+            ).scalars()
+        )
+
+    @staticmethod
+    def get_ancestor_ids(taxonomy_item_id: int) -> Set[int]:
+        """Get the ids of all (transitive) parents of a taxonomy item."""
+        return set(
+            DB.session.execute(
+                select(TaxonomyItemClosure.ancestor_id).where(
+                    TaxonomyItemClosure.descendant_id == taxonomy_item_id
+                )
+            ).scalars()
+        )
+
+    @staticmethod
+    def is_descendant(taxonomy_item_id: int, ancestor_id: int) -> bool:
+        """Check if a taxonomy item can be reached from the ancestor item."""
+        return (
+            DB.session.execute(
+                select(TaxonomyItemClosure.id)
+                .where(
+                    TaxonomyItemClosure.ancestor_id == ancestor_id,
+                    TaxonomyItemClosure.descendant_id == taxonomy_item_id,
+                )
+                .limit(1)
+            ).first()
+            is not None
+        )
+
+    @staticmethod
+    def would_create_circle(source_id: int, target_id: int) -> bool:
+        """Check if a new relation from source to target would create a circle."""
+        return source_id == target_id or TaxonomyItemClosure.is_descendant(
+            source_id, ancestor_id=target_id
+        )
+
+
+CLOSURE_TABLE = TaxonomyItemClosure.__table__
+
+
+def _batched(ids: Iterable[int]) -> Iterable[List[int]]:
+    id_list = sorted(ids)
+    for start in range(0, len(id_list), CLOSURE_QUERY_BATCH_SIZE):
+        yield id_list[start : start + CLOSURE_QUERY_BATCH_SIZE]
+
+
+def _get_path_counts(
+    connection: Connection, item_id: int, ancestors: bool
+) -> Dict[int, int]:
+    """Get the path counts of all ancestors (or descendants) including the item."""
+    if ancestors:
+        query = select(CLOSURE_TABLE.c.ancestor_id, CLOSURE_TABLE.c.path_count).where(
+            CLOSURE_TABLE.c.descendant_id == item_id
+        )
+    else:
+        query = select(CLOSURE_TABLE.c.descendant_id, CLOSURE_TABLE.c.path_count).where(
+            CLOSURE_TABLE.c.ancestor_id == item_id
+        )
+    counts: Dict[int, int] = {item_id: 1}
+    for other_id, path_count in connection.execute(query):
+        counts[other_id] = path_count
+    return counts
+
+
+def _change_relation_paths(
+    connection: Connection, source_id: int, target_id: int, direction: int
+):
+    """Add (direction 1) or remove (direction -1) the paths using a relation."""
+    taxonomy_id: Optional[int] = connection.execute(
+        select(TaxonomyItem.taxonomy_id).where(TaxonomyItem.id == source_id)
+    ).scalar()
+    if taxonomy_id is None:
+        return
+
+    # every path from an ancestor of the source to a descendant of the target
+    ancestors = _get_path_counts(connection, source_id, ancestors=True)
+    descendants = _get_path_counts(connection, target_id, ancestors=False)
+
+    existing: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    for ancestor_batch in _batched(ancestors):
+        for descendant_batch in _batched(descendants):
+            rows = connection.execute(
+                select(
+                    CLOSURE_TABLE.c.id,
+                    CLOSURE_TABLE.c.ancestor_id,
+                    CLOSURE_TABLE.c.descendant_id,
+                    CLOSURE_TABLE.c.path_count,
+                ).where(
+                    CLOSURE_TABLE.c.ancestor_id.in_(ancestor_batch),
+                    CLOSURE_TABLE.c.descendant_id.in_(descendant_batch),
+                )
+            )
+            for row_id, ancestor_id, descendant_id, path_count in rows:
+                existing[(ancestor_id, descendant_id)] = (row_id, path_count)
+
+    inserts: List[Dict[str, int]] = []
+    updates: List[Dict[str, int]] = []
+    deletes: List[int] = []
+    for ancestor_id, ancestor_count in ancestors.items():
+        for descendant_id, descendant_count in descendants.items():
+            paths = direction * ancestor_count * descendant_count
+            row = existing.get((ancestor_id, descendant_id))
+            if row is None:
+                if paths > 0:
+                    inserts.append(
+                        {
+                            "taxonomy_id": taxonomy_id,
+                            "ancestor_id": ancestor_id,
+                            "descendant_id": descendant_id,
+                            "path_count": paths,
+                        }
+                    )
+                continue
+            row_id, path_count = row
+            if path_count + paths > 0:
+                updates.append({"row_id": row_id, "new_count": path_count + paths})
+            else:
+                deletes.append(row_id)
+
+    if inserts:
+        connection.execute(insert(CLOSURE_TABLE), inserts)
+    if updates:
+        connection.execute(
+            update(CLOSURE_TABLE)
+            .where(CLOSURE_TABLE.c.id == bindparam("row_id"))
+            .values(path_count=bindparam("new_count")),
+            updates,
+        )
+    for batch in _batched(deletes):
+        connection.execute(delete(CLOSURE_TABLE).where(CLOSURE_TABLE.c.id.in_(batch)))
+
+
+def add_relation_paths(connection: Connection, source_id: int, target_id: int):
+    """Add all paths using a new (or restored) relation to the closure table."""
+    _change_relation_paths(connection, source_id, target_id, direction=1)
+
+
+def remove_relation_paths(connection: Connection, source_id: int, target_id: int):
+    """Remove all paths using a deleted relation from the closure table."""
+    _change_relation_paths(connection, source_id, target_id, direction=-1)
+
+
+def compute_closure(edges: Iterable[Tuple[int, int]]) -> Dict[int, Counter]:
+    """Compute the path counts of all descendants for every item with children.
+
+    Items that are part of a circle are ignored.
+
+    Args:
+        edges (Iterable[Tuple[int, int]]): the (source, target) pairs of the relations
+
+    Returns:
+        Dict[int, Counter]: the path counts of the descendants by ancestor id
+    """
+    children: Dict[int, List[int]] = defaultdict(list)
+    child_count: Counter = Counter()
+    parent_count: Counter = Counter()
+    for source_id, target_id in edges:
+        children[source_id].append(target_id)
+        child_count[source_id] += 1
+        parent_count[target_id] += 1
+
+    # process the items in reverse topological order (leaves first)
+    leaves = deque(item_id for item_id in parent_count if not child_count[item_id])
+    parents: Dict[int, List[int]] = defaultdict(list)
+    for source_id, targets in children.items():
+        for target_id in targets:
+            parents[target_id].append(source_id)
+    closure: Dict[int, Counter] = {}
+    while leaves:
+        item_id = leaves.popleft()
+        descendants: Counter = Counter()
+        for child_id in children.get(item_id, ()):
+            descendants[child_id] += 1
+            descendants.update(closure.get(child_id, {}))
+        if descendants:
+            closure[item_id] = descendants
+        for parent_id in parents.get(item_id, ()):
+            child_count[parent_id] -= 1
+            if not child_count[parent_id]:
+                leaves.append(parent_id)
+    return closure
+
+
+def add_new_item_paths(
+    connection: Connection,
+    taxonomy_id: int,
+    edges: Iterable[Tuple[int, int]],
+    toplevel_ids: Iterable[int] = tuple(),
+    parent_id: Optional[int] = None,
+) -> int:
+    """Add the paths of new items (inserted in bulk) to the closure table.
+
+    The new items must not have any relations except the given edges between
+    new items and the relations from the parent to the toplevel items. The
+    closure table does not contain any row of the new items yet, so all
+    paths can be inserted without reading the existing paths (except the
+    ancestors of the parent).
+
+    Args:
+        connection (Connection): the connection to use
+        taxonomy_id (int): the taxonomy of the new items
+        edges (Iterable[Tuple[int, int]]): the (source, target) pairs of the new relations between new items
+        toplevel_ids (Iterable[int], optional): the new items that are children of the parent
+        parent_id (Optional[int], optional): an existing item all toplevel items are added to
+
+    Returns:
+        int: the number of inserted closure table rows
+    """
+    closure = compute_closure(edges)
+    paths: Dict[Tuple[int, int], int] = {}
+    for ancestor_id, descendants in closure.items():
+        for descendant_id, path_count in descendants.items():
+            paths[(ancestor_id, descendant_id)] = path_count
+
+    if parent_id is not None:
+        # every path to a new item from the parent (or an ancestor of the parent)
+        below_parent: Counter = Counter()
+        for toplevel_id in toplevel_ids:
+            below_parent[toplevel_id] += 1
+            below_parent.update(closure.get(toplevel_id, {}))
+        ancestors = _get_path_counts(connection, parent_id, ancestors=True)
+        for ancestor_id, ancestor_count in ancestors.items():
+            for descendant_id, path_count in below_parent.items():
+                paths[(ancestor_id, descendant_id)] = ancestor_count * path_count
+
+    rows = [
+        {
+            "taxonomy_id": taxonomy_id,
+            "ancestor_id": ancestor_id,
+            "descendant_id": descendant_id,
+            "path_count": path_count,
+        }
+        for (ancestor_id, descendant_id), path_count in paths.items()
+    ]
+    if rows:
+        connection.execute(insert(CLOSURE_TABLE), rows)
+    return len(rows)
+
+
+def rebuild_taxonomy_closure(connection: Connection, taxonomy_id: int) -> int:
+    """Rebuild the closure table of a taxonomy from its current relations.
+
+    Returns:
+        int: the number of closure table rows of the taxonomy
+    """
+    source_item = TaxonomyItem.__table__.alias("source_item")
+    relations = TaxonomyItemRelation.__table__
+    edges = connection.execute(
+        select(relations.c.taxonomy_item_source_id, relations.c.taxonomy_item_target_id)
+        .join(source_item, source_item.c.id == relations.c.taxonomy_item_source_id)
+        .where(source_item.c.taxonomy_id == taxonomy_id, relations.c.deleted_on == None)
+    ).all()
+    connection.execute(
+        delete(CLOSURE_TABLE).where(CLOSURE_TABLE.c.taxonomy_id == taxonomy_id)
+    )
+    rows = [
+        {
+            "taxonomy_id": taxonomy_id,
+            "ancestor_id": ancestor_id,
+            "descendant_id": descendant_id,
+            "path_count": path_count,
+        }
+        for ancestor_id, descendants in compute_closure(edges).items()
+        for descendant_id, path_count in descendants.items()
+    ]
+    if rows:
+        connection.execute(insert(CLOSURE_TABLE), rows)
+    return len(rows)
+
+
+@event.listens_for(TaxonomyItemRelation, "after_insert")
+def _add_paths_of_new_relation(mapper, connection, target: TaxonomyItemRelation):
+    if target.deleted_on is None:
+        add_relation_paths(
+            connection, target.taxonomy_item_source_id, target.taxonomy_item_target_id
+        )
+
+
+@event.listens_for(TaxonomyItemRelation, "before_update")
+def _update_paths_of_relation(mapper, connection, target: TaxonomyItemRelation):
+    history = inspect(target).attrs.deleted_on.history
+    if not history.has_changes():
+        return
+    if history.deleted:
+        was_deleted = history.deleted[0] is not None
+    else:
+        # old value was not loaded, the database still contains the old value
+        was_deleted = (
+            connection.execute(
+                select(TaxonomyItemRelation.deleted_on).where(
+                    TaxonomyItemRelation.id == target.id
+                )
+            ).scalar()
+            is not None
+        )
+    if was_deleted == (target.deleted_on is not None):
+        return  # deletion timestamp changed without restoring the relation
+    if target.deleted_on is None:
+        add_relation_paths(
+            connection, target.taxonomy_item_source_id, target.taxonomy_item_target_id
+        )
+    else:
+        remove_relation_paths(
+            connection, target.taxonomy_item_source_id, target.taxonomy_item_target_id
+        )
+
+
+@event.listens_for(TaxonomyItemRelation, "after_delete")
+def _remove_paths_of_deleted_relation(mapper, connection, target: TaxonomyItemRelation):
+    if inspect(target).attrs.deleted_on.loaded_value is None:
+        remove_relation_paths(
+            connection, target.taxonomy_item_source_id, target.taxonomy_item_target_id
+        )
@@ -0,0 +1,225 @@
+"""Module containing the materialized paths of taxonomy items.
+
+The path of a taxonomy item contains the ids of the items from a toplevel item
+down to the item (e.g. ``/1/5/9/`` for item 9 below item 5 below item 1).
+Taxonomies are directed acyclic graphs, so only the first parent of an item
+(the source of its oldest current relation) is part of the path. Items without
+a parent have the path ``/<id>/``. Sorting by the path lists every item after
+its first parent, and all items with a path starting with the path of an item
+are descendants of that item (use the closure table to also find the
+descendants reachable over other parents).
+
+The paths are maintained by the mapper events of the taxonomy items and their
+relations. Bulk updates bypassing the ORM must update the paths themselves
+(e.g. with ``update_item_path``). The paths of deleted items are not
+maintained; they are recomputed when the items are restored.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql.expression import bindparam, func, select, update
+
+from .taxonomies import TaxonomyItem, TaxonomyItemRelation
+from .taxonomy_closure import CLOSURE_QUERY_BATCH_SIZE
+
+PATH_SEPARATOR = "/"
+
+ITEM_TABLE = TaxonomyItem.__table__
+RELATION_TABLE = TaxonomyItemRelation.__table__
+
+
+def _batched(ids: Iterable[int]) -> Iterable[List[int]]:
+    id_list = sorted(ids)
+    for start in range(0, len(id_list), CLOSURE_QUERY_BATCH_SIZE):
+        yield id_list[start : start + CLOSURE_QUERY_BATCH_SIZE]
+
+
+def get_item_path(item_id: int, parent_path: Optional[str] = None) -> str:
+    """Get the path of an item below a parent with the given path."""
+    if parent_path is None:
+        parent_path = PATH_SEPARATOR
+    return f"{parent_path}{item_id}{PATH_SEPARATOR}"
+
+
+def get_item_paths(connection: Connection, item_ids: Iterable[int]) -> Dict[int, str]:
+    """Get the stored paths of the items."""
+    paths: Dict[int, str] = {}
+    for batch in _batched(item_ids):
+        paths.update(
+            connection.execute(
+                select(ITEM_TABLE.c.id, ITEM_TABLE.c.path).where(
+                    ITEM_TABLE.c.id.in_(batch)
+                )
+            ).all()
+        )
+    return paths
+
+
+def get_first_parents(connection: Connection, item_ids: Iterable[int]) -> Dict[int, int]:
+    """Get the source of the oldest current relation of every item with a parent."""
+    first_parents: Dict[int, int] = {}
+    for batch in _batched(item_ids):
+        rows = connection.execute(
+            select(
+                RELATION_TABLE.c.taxonomy_item_target_id,
+                RELATION_TABLE.c.taxonomy_item_source_id,
+            )
+            .where(
+                RELATION_TABLE.c.taxonomy_item_target_id.in_(batch),
+                RELATION_TABLE.c.deleted_on == None,
+            )
+            .order_by(RELATION_TABLE.c.id)
+        )
+        for target_id, source_id in rows:
+            first_parents.setdefault(target_id, source_id)
+    return first_parents
+
+
+def compute_item_paths(
+    item_ids: Iterable[int],
+    first_parents: Mapping[int, int],
+    parent_paths: Mapping[int, Optional[str]],
+) -> Dict[int, str]:
+    """Compute the paths of a set of items.
+
+    Args:
+        item_ids (Iterable[int]): the items to compute the paths for
+        first_parents (Mapping[int, int]): the first parent of every item with a parent
+        parent_paths (Mapping[int, Optional[str]]): the paths of all first
+            parents that are not part of the items
+
+    Returns:
+        Dict[int, str]: the path by item id
+    """
+    item_id_set = set(item_ids)
+    paths: Dict[int, str] = {}
+    for item_id in sorted(item_id_set):
+        # follow the first parents up to an item with a known path
+        chain: List[int] = []
+        parent_id: Optional[int] = item_id
+        while parent_id in item_id_set and parent_id not in paths:
+            if parent_id in chain:
+                break  # circle (cannot happen for valid taxonomies)
+            chain.append(parent_id)
+            parent_id = first_parents.get(parent_id)
+        parent_path: Optional[str] = None
+        if parent_id in paths:
+            parent_path = paths[parent_id]
+        elif parent_id is not None and parent_id not in chain:
+            parent_path = parent_paths.get(parent_id)
+        for chain_id in reversed(chain):
+            parent_path = paths[chain_id] = get_item_path(chain_id, parent_path)
+    return paths
+
+
+def set_item_paths(connection: Connection, paths: Mapping[int, str]):
+    """Store the paths of items no other current item depends on (e.g. new items)."""
+    if not paths:
+        return
+    connection.execute(
+        update(ITEM_TABLE).where(ITEM_TABLE.c.id == bindparam("item_id"))
+        # the path is derived data and must not change the update timestamp
+        .values(path=bindparam("new_path"), updated_on=ITEM_TABLE.c.updated_on),
+        [{"item_id": item_id, "new_path": path} for item_id, path in paths.items()],
+    )
+
+
+def update_item_path(connection: Connection, item_id: int) -> bool:
+    """Recompute the path of an item after its (first) parent changed.
+
+    Moves the paths of all items below the item to the new path of the item.
+
+    Returns:
+        bool: True if the path of the item changed
+    """
+    parent_item = ITEM_TABLE.alias("parent_item")
+    parent_path: Optional[str] = connection.execute(
+        select(parent_item.c.path)
+        .select_from(RELATION_TABLE)
+        .join(parent_item, parent_item.c.id == RELATION_TABLE.c.taxonomy_item_source_id)
+        .where(
+            RELATION_TABLE.c.taxonomy_item_target_id == item_id,
+            RELATION_TABLE.c.deleted_on == None,
+        )
+        .order_by(RELATION_TABLE.c.id)
+        .limit(1)
+    ).scalar()
+    old_path: Optional[str] = connection.execute(
+        select(ITEM_TABLE.c.path).where(ITEM_TABLE.c.id == item_id)
+    ).scalar()
+    new_path = get_item_path(item_id, parent_path)
+    if new_path == old_path:
+        return False
+    if old_path is None:
+        set_item_paths(connection, {item_id: new_path})
+        return True
+    connection.execute(
+        update(ITEM_TABLE)
+        .where(ITEM_TABLE.c.path.startswith(old_path))
+        .values(
+            path=new_path + func.substr(ITEM_TABLE.c.path, len(old_path) + 1),
+            updated_on=ITEM_TABLE.c.updated_on,
+        )
+    )
+    return True
+
+
+def update_restored_item_paths(connection: Connection, item_ids: Iterable[int]) -> int:
+    """Recompute the paths of restored items (after restoring their relations).
+
+    No current item can be below a deleted item, so only the paths of the
+    restored items change.
+
+    Returns:
+        int: the number of restored items
+    """
+    item_id_set = set(item_ids)
+    first_parents = get_first_parents(connection, item_id_set)
+    parent_paths = get_item_paths(
+        connection,
+        {
+            parent_id
+            for parent_id in first_parents.values()
+            if parent_id not in item_id_set
+        },
+    )
+    set_item_paths(
+        connection, compute_item_paths(item_id_set, first_parents, parent_paths)
+    )
+    return len(item_id_set)
+
+
+@event.listens_for(TaxonomyItem, "after_insert")
+def _set_path_of_new_item(mapper, connection, target: TaxonomyItem):
+    # new items have no parents yet
+    path = get_item_path(target.id)
+    set_item_paths(connection, {target.id: path})
+    set_committed_value(target, "path", path)
+
+
+@event.listens_for(TaxonomyItem, "after_update")
+def _update_path_of_restored_item(mapper, connection, target: TaxonomyItem):
+    if target.deleted_on is not None:
+        return
+    if inspect(target).attrs.deleted_on.history.has_changes():
+        update_item_path(connection, target.id)
+
+
+@event.listens_for(TaxonomyItemRelation, "after_insert")
+def _update_path_of_new_child(mapper, connection, target: TaxonomyItemRelation):
+    if target.deleted_on is None:
+        update_item_path(connection, target.taxonomy_item_target_id)
+
+
+@event.listens_for(TaxonomyItemRelation, "after_update")
+def _update_path_of_child(mapper, connection, target: TaxonomyItemRelation):
+    if inspect(target).attrs.deleted_on.history.has_changes():
+        update_item_path(connection, target.taxonomy_item_target_id)
+
+
+@event.listens_for(TaxonomyItemRelation, "after_delete")
+def _update_path_of_removed_child(mapper, connection, target: TaxonomyItemRelation):
+    update_item_path(connection, target.taxonomy_item_target_id)
@@ -1,10 +1,11 @@
 """Module containing the namespace table definitions."""
 
-from typing import List, Optional, Set, Union
+from typing import FrozenSet, List, Optional, Set, Tuple, Union
 
 from flask_babel import gettext
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql.elements import literal
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy.sql.schema import ForeignKey
 from sqlalchemy.types import Text
 
@@ -17,6 +18,9 @@ from ...password_helpers import FLASK_PASSWORD
 
 RESOURCE_TYPE = Union[Namespace, OntologyObjectType, OntologyObject, Taxonomy]
 
+# (role, resource_type, resource_id) with resource_id None for grants on all resources
+GRANT_INDEX_KEY = Tuple[str, str, Optional[int]]
+
 
 class Guest:
     def __init__(self) -> None:
@@ -118,26 +122,43 @@ class User(MODEL, IdMixin, CreateDeleteMixin, ExistsMixin):
         resource: RESOURCE_TYPE,
     ) -> bool:
         resource_type: str = _resolve_resource_type(resource=resource)
-        # TODO check if query slows down requests (if true, handle inheritance checking here and not in ozo)
-        result: Optional[bool] = (
-            DB.session.query(literal(True))
-            .filter(
-                UserGrant.query.filter(
-                    UserGrant.user == self,
-                    UserGrant.role == role,
-                    UserGrant.resource_type == resource_type,
-                    (UserGrant.resource_id == None)
-                    | (UserGrant.resource_id == resource.id),
-                ).exists()
-            )
-            .scalar()
+        grant_index = self.grant_index
+        return (role, resource_type, None) in grant_index or (
+            role,
+            resource_type,
+            resource.id,
+        ) in grant_index
+
+    @property
+    def grant_index(self) -> FrozenSet[GRANT_INDEX_KEY]:
+        """Index of all grants of this user.
+
+        The grants are loaded once (until the user is expired, e.g. by a
+        commit) and the index is invalidated by all grant changes of this user.
+        """
+        grant_index: Optional[FrozenSet[GRANT_INDEX_KEY]] = self.__dict__.get(
+            "_grant_index"
         )
-        return bool(result)
+        if grant_index is None:
+            grant_index = frozenset(
+                DB.session.query(
+                    UserGrant.role, UserGrant.resource_type, UserGrant.resource_id
+                )
+                .filter(UserGrant.user_id == self.id)
+                .all()
+            )
+            self.__dict__["_grant_index"] = grant_index
+        return grant_index
+
+    def invalidate_grant_index(self):
+        """Drop the cached grant index to reload the grants on the next check."""
+        self.__dict__.pop("_grant_index", None)
 
     def set_role_for_resource(self, role: str, resource: RESOURCE_TYPE):
         resource_type: str = _resolve_resource_type(resource=resource)
         grant = UserGrant(self, role, resource_type, resource.id)
         DB.session.add(grant)
+        self.invalidate_grant_index()
 
 
 def _get_allowed_user_roles() -> Set[str]:
@@ -269,3 +290,23 @@ class UserGrant(MODEL, IdMixin):
         self.role = role
         self.resource_type = resource_type
         self.resource_id = resource_id
+
+
+@event.listens_for(UserGrant, "after_insert")
+@event.listens_for(UserGrant, "after_update")
+@event.listens_for(UserGrant, "after_delete")
+def _invalidate_grant_index_of_user(mapper, connection, target: UserGrant):
+    """Invalidate the grant index of the user of a changed grant (if it is loaded)."""
+    session = inspect(target).session
+    if session is None or target.user_id is None:
+        return
+    user = session.identity_map.get(identity_key(User, target.user_id))
+    if user is not None:
+        user.invalidate_grant_index()
+
+
+@event.listens_for(User, "expire")
+def _invalidate_grant_index_on_expire(target: User, attrs):
+    """Reload the grants together with the other expired attributes of the user."""
+    if attrs is None:
+        target.invalidate_grant_index()
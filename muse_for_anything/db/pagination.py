@@ -3,10 +3,11 @@ from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, TypeVar, Un
 
 from sqlalchemy.orm.query import Query
 from sqlalchemy.sql import column, func, select
-from sqlalchemy.sql.expression import and_, asc, desc, or_
+from sqlalchemy.sql.expression import and_, asc, case, desc, false, or_, tuple_
 from sqlalchemy.sql.schema import Column
 from sqlalchemy.sql.selectable import CTE
 
+from .collection_sizes import COLLECTION_SIZES
 from .db import DB, MODEL
 from .models.model_helpers import IdMixin
 
@@ -37,6 +38,30 @@ class PaginationInfo:
     surrounding_pages: List[PageInfo]
     last_page: Optional[PageInfo]
     page_items_query: Query
+    is_approximate: bool = False
+
+
+def _parse_sort(
+    model: Type[M], sortables: Sequence[Column], sort: str
+) -> List[Tuple[Column, Any, bool]]:
+    """Parse the sort string into a list of (column, sort expression, descending) tuples."""
+    sort_columns: Dict[str, Column] = {c.name: c for c in sortables}
+
+    if issubclass(model, IdMixin):
+        sort_columns["id"] = model.id
+
+    sort_keys: List[Tuple[Column, Any, bool]] = []
+
+    for s in sort.split(","):
+        sort_column_name = s.lstrip("+-")
+        sort_column = sort_columns[sort_column_name]
+        expression: Any = sort_column
+
+        if "collate" in sort_column.info:
+            expression = sort_column.collate(sort_column.info["collate"])
+
+        sort_keys.append((sort_column, expression, s.startswith("-")))
+    return sort_keys
 
 
 def get_page_info(
@@ -52,34 +77,15 @@ def get_page_info(
     if item_count is None:
         item_count = 25
 
-    sort_columns: Dict[str, Column] = {c.name: c for c in sortables}
-
-    if issubclass(model, IdMixin):
-        sort_columns["id"] = model.id
-
-    order_by = []
-
-    for s in sort.split(","):
-        sort_column_name = s.lstrip("+-")
-        sort_direction: Any = desc if s.startswith("-") else asc
-
-        sort_column = sort_columns[sort_column_name]
-
-        if "collate" in sort_column.info:
-            order_by.append(
-                sort_direction(
-                    sort_columns[sort_column_name].collate(sort_column.info["collate"])
-                )
-            )
-        else:
-            order_by.append(sort_direction(sort_columns[sort_column_name]))
+    order_by = [
+        desc(expression) if descending else asc(expression)
+        for _, expression, descending in _parse_sort(model, sortables, sort)
+    ]
     row_numbers: Any = func.row_number().over(order_by=order_by)
 
     query_filter: Any = and_(*filter_criteria)
 
-    collection_size: int = (
-        model.query.filter(query_filter).enable_eagerloads(False).count()
-    )
+    collection_size: int = COLLECTION_SIZES.get_collection_size(model, filter_criteria)
 
     if cursor is not None:
         # set cursor to none if no cursor is not found
@@ -244,3 +250,341 @@ def digest_pages(
         cursor_row,
         cursor_page,
     )
+
+
+KEYSET_EXACT_ROW_LIMIT = 10_000
+
+
+# (sort expression, descending, nullable) of a sort key of the keyset pagination
+SeekKey = Tuple[Any, bool, bool]
+
+
+def _is_nullable(sort_column: Any) -> bool:
+    return getattr(sort_column, "nullable", True)
+
+
+def _seek_order_by(seek_keys: Sequence[SeekKey], reverse: bool = False) -> List[Any]:
+    """Get the order by clauses of the sort keys.
+
+    NULL values are sorted before all other values (in ascending order) on
+    every dialect, as the seek conditions must know where NULL values are.
+    """
+    order_by: List[Any] = []
+    for expression, descending, nullable in seek_keys:
+        ascending = descending == reverse
+        if nullable:
+            is_not_null = case((expression.is_(None), 0), else_=1)
+            order_by.append(asc(is_not_null) if ascending else desc(is_not_null))
+        order_by.append(asc(expression) if ascending else desc(expression))
+    return order_by
+
+
+def _seek_strict(expression: Any, value: Any, forward: bool, nullable: bool) -> Any:
+    """Select the rows strictly after (forward) or before the value (NULL is first)."""
+    if value is None:
+        return expression.is_not(None) if forward else false()
+    if forward:
+        return expression > value
+    if nullable:
+        return or_(expression < value, expression.is_(None))
+    return expression < value
+
+
+def _seek_equal(expression: Any, value: Any) -> Any:
+    return expression.is_(None) if value is None else expression == value
+
+
+def _seek_condition(
+    sort_keys: Sequence[SeekKey],
+    values: Sequence[Any],
+    after: bool = True,
+    inclusive: bool = False,
+) -> Any:
+    """Build a condition selecting all rows after (or before) the row with the given sort values.
+
+    Args:
+        sort_keys (Sequence[SeekKey]): the (sort expression, descending, nullable) tuples in sort order
+        values (Sequence[Any]): the values of the sort columns of the reference row
+        after (bool, optional): select rows after the reference row if True, else rows before it. Defaults to True.
+        inclusive (bool, optional): also select the reference row itself. Defaults to False.
+    """
+    if all(
+        descending == sort_keys[0][1] and not nullable
+        for _, descending, nullable in sort_keys
+    ):
+        # uniform sort direction without NULL values can use a single row
+        # value comparison (which can use a multi column index)
+        keys = tuple_(*(expression for expression, _, _ in sort_keys))
+        reference = tuple_(*values)
+        if after != sort_keys[0][1]:
+            return keys >= reference if inclusive else keys > reference
+        return keys <= reference if inclusive else keys < reference
+
+    condition: Any = None
+    for (expression, descending, nullable), value in reversed(
+        list(zip(sort_keys, values))
+    ):
+        forward = after != descending
+        strict = _seek_strict(expression, value, forward, nullable)
+        if condition is None:
+            if inclusive:
+                condition = or_(strict, _seek_equal(expression, value))
+            else:
+                condition = strict
+            continue
+        condition = or_(strict, and_(_seek_equal(expression, value), condition))
+    return condition
+
+
+class _KeysetQueries:
+    """The bounded queries of the keyset pagination of a filtered collection."""
+
+    def __init__(
+        self, cursor_column: Column, filter_criteria: Sequence[Any], exact_row_limit: int
+    ) -> None:
+        self.cursor_column = cursor_column
+        self.filter_criteria = filter_criteria
+        self.exact_row_limit = exact_row_limit
+
+    def count_rows(self, condition: Any) -> int:
+        """Count the rows matching the condition (up to the exact row limit)."""
+        limited = (
+            DB.session.query(self.cursor_column)
+            .filter(*self.filter_criteria, condition)
+            .limit(self.exact_row_limit)
+            .subquery()
+        )
+        return DB.session.query(func.count()).select_from(limited).scalar()
+
+    def page_cursors(
+        self, condition: Any, order: Sequence[Any], offset: int, limit: int
+    ) -> List[Any]:
+        """Get the cursor column values of a range of the (ordered) rows."""
+        query = DB.session.query(self.cursor_column).filter(*self.filter_criteria)
+        if condition is not None:
+            query = query.filter(condition)
+        return [
+            row[0] for row in query.order_by(*order).offset(offset).limit(limit).all()
+        ]
+
+    def count_rows_before(
+        self, seek_condition: Any, before_condition: Any, collection_size: int
+    ) -> Tuple[int, bool]:
+        """Count the rows before the cursor.
+
+        Returns:
+            the number of rows before the cursor and if it is approximated
+        """
+        rows_before = self.count_rows(before_condition)
+        is_approximate = False
+        if rows_before >= self.exact_row_limit:
+            rows_from_cursor = self.count_rows(seek_condition)
+            if rows_from_cursor < self.exact_row_limit:
+                rows_before = collection_size - rows_from_cursor
+            else:
+                # both sides are too large to be counted, assume the middle
+                is_approximate = True
+                rows_before = collection_size // 2
+        return max(min(rows_before, collection_size), 0), is_approximate
+
+
+def _get_seek_keys(
+    model: Type[M], cursor_column: Column, sortables: Sequence[Column], sort: str
+) -> Tuple[List[Column], List[SeekKey]]:
+    """Get the sort columns and seek keys (cursor column as tie breaker)."""
+    sort_keys = _parse_sort(model, sortables, sort)
+    if not any(column.name == cursor_column.name for column, _, _ in sort_keys):
+        # the cursor column is required as a unique tie breaker
+        sort_keys.append((cursor_column, cursor_column, False))
+    return (
+        [column for column, _, _ in sort_keys],
+        [
+            (expression, descending, _is_nullable(column))
+            for column, expression, descending in sort_keys
+        ],
+    )
+
+
+def _get_cursor_values(
+    cursor_column: Column,
+    sort_columns: Sequence[Column],
+    cursor: Optional[Union[str, int]],
+) -> Optional[Sequence[Any]]:
+    """Get the sort values of the cursor row (None if not found)."""
+    if cursor is None:
+        return None
+    return DB.session.query(*sort_columns).filter(cursor_column == cursor).first()
+
+
+def _get_previous_pages(
+    previous_cursors: Sequence[Any],
+    cursor_page: int,
+    rows_before: int,
+    item_count: int,
+    surrounding_pages: int,
+) -> List[PageInfo]:
+    """Get the pages before the cursor page from the reversed cursors."""
+    max_rows = item_count * surrounding_pages
+    pages: List[PageInfo] = []
+    for distance in range(1, surrounding_pages + 1):
+        page = max(cursor_page - distance, 1)
+        index = distance * item_count - 1
+        if index >= len(previous_cursors):
+            if (
+                len(previous_cursors) < max_rows
+                and index - item_count < len(previous_cursors) - 1
+            ):
+                # first page containing fewer than item_count items
+                pages.insert(0, PageInfo(cursor=previous_cursors[-1], page=page, row=0))
+            break
+        pages.insert(
+            0,
+            PageInfo(
+                cursor=previous_cursors[index],
+                page=page,
+                row=max(rows_before - index - 1, 0),
+            ),
+        )
+        if page == 1:
+            break
+    return pages
+
+
+def _get_last_page(
+    queries: _KeysetQueries,
+    reversed_order_by: Sequence[Any],
+    cursor: Optional[Union[str, int]],
+    cursor_page: int,
+    rows_before: int,
+    rows_from_cursor: int,
+    item_count: int,
+) -> PageInfo:
+    """Get the last page by counting the pages from the cursor page."""
+    pages_from_cursor = max((rows_from_cursor + item_count - 1) // item_count, 1)
+    last_page = PageInfo(
+        cursor=cursor if cursor is not None else 0, page=cursor_page, row=rows_before
+    )
+    if pages_from_cursor > 1:
+        last_page_size = rows_from_cursor - (pages_from_cursor - 1) * item_count
+        last_cursor = queries.page_cursors(None, reversed_order_by, last_page_size - 1, 1)
+        if last_cursor:
+            last_page = PageInfo(
+                cursor=last_cursor[0],
+                page=cursor_page + pages_from_cursor - 1,
+                row=rows_before + (pages_from_cursor - 1) * item_count,
+            )
+    return last_page
+
+
+def get_keyset_page_info(
+    model: Type[M],
+    cursor_column: Column,
+    sortables: Sequence[Column],
+    cursor: Optional[Union[str, int]],
+    sort: str,
+    item_count: int = 25,
+    surrounding_pages: int = 5,
+    filter_criteria: Sequence[Any] = tuple(),
+    exact_row_limit: int = KEYSET_EXACT_ROW_LIMIT,
+) -> PaginationInfo:
+    """Get the pagination info using keyset (seek) pagination.
+
+    The cursor row is located by its sort values (and the cursor column as
+    tie breaker) instead of computing row numbers for the whole collection.
+    Page items and the cursors of the surrounding pages are fetched with
+    bounded index range queries.
+
+    Page numbers are only exact if the rows before or after the cursor can be
+    counted within ``exact_row_limit`` rows. Otherwise the page numbers are
+    approximated and ``PaginationInfo.is_approximate`` is set. The page links
+    stay correct as they only depend on the cursors.
+
+    NULL values are sorted before all other values (after all other values
+    in descending order) independent of the database dialect.
+
+    Unlike ``get_page_info`` the cursor of a page is the first row of the page
+    (not the row directly before the page). Cursors of one pagination engine
+    therefore point to a page one row off in the other engine.
+    """
+    if item_count is None:
+        item_count = 25
+
+    sort_columns, seek_keys = _get_seek_keys(model, cursor_column, sortables, sort)
+    order_by = _seek_order_by(seek_keys)
+    reversed_order_by = _seek_order_by(seek_keys, reverse=True)
+
+    collection_size: int = COLLECTION_SIZES.get_collection_size(model, filter_criteria)
+
+    cursor_values = _get_cursor_values(cursor_column, sort_columns, cursor)
+    if cursor_values is None:
+        cursor = None  # cursor was not found
+
+    item_query: Query = model.query.filter(*filter_criteria).order_by(*order_by)
+
+    if collection_size <= item_count:
+        return PaginationInfo(
+            collection_size=collection_size,
+            cursor_row=0,
+            cursor_page=1,
+            surrounding_pages=[],
+            last_page=PageInfo(0, 1, 0),
+            page_items_query=item_query.limit(item_count),
+        )
+
+    queries = _KeysetQueries(cursor_column, filter_criteria, exact_row_limit)
+
+    rows_before = 0
+    is_approximate = False
+    seek_condition: Any = None
+    before_condition: Any = None
+
+    if cursor_values is not None:
+        seek_condition = _seek_condition(seek_keys, cursor_values, inclusive=True)
+        before_condition = _seek_condition(seek_keys, cursor_values, after=False)
+        item_query = item_query.filter(seek_condition)
+        rows_before, is_approximate = queries.count_rows_before(
+            seek_condition, before_condition, collection_size
+        )
+
+    rows_from_cursor = max(collection_size - rows_before, 0)
+    cursor_page = (rows_before + item_count - 1) // item_count + 1
+
+    context_pages: List[PageInfo] = []
+
+    if before_condition is not None and rows_before > 0:
+        previous_cursors = queries.page_cursors(
+            before_condition, reversed_order_by, 0, item_count * surrounding_pages
+        )
+        context_pages = _get_previous_pages(
+            previous_cursors, cursor_page, rows_before, item_count, surrounding_pages
+        )
+
+    next_cursors = queries.page_cursors(
+        seek_condition, order_by, item_count, item_count * surrounding_pages
+    )
+    for distance, next_cursor in enumerate(next_cursors[::item_count], start=1):
+        context_pages.append(
+            PageInfo(
+                cursor=next_cursor,
+                page=cursor_page + distance,
+                row=rows_before + distance * item_count,
+            )
+        )
+
+    return PaginationInfo(
+        collection_size=collection_size,
+        cursor_row=rows_before,
+        cursor_page=cursor_page,
+        surrounding_pages=context_pages,
+        last_page=_get_last_page(
+            queries,
+            reversed_order_by,
+            cursor,
+            cursor_page,
+            rows_before,
+            rows_from_cursor,
+            item_count,
+        ),
+        page_items_query=item_query.limit(item_count),
+        is_approximate=is_approximate,
+    )
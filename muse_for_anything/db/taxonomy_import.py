@@ -0,0 +1,389 @@
+"""Module containing the bulk import of taxonomy items and their relations.
+
+An import is either a nested tree (items with ``children``) or an edge list
+(items with a ``key`` and ``relations`` between the keys). Both can be mixed:
+the children of an item and the relations of the import are both added as
+taxonomy item relations. The import is validated once (unique keys, known
+keys and acyclicity with a topological sort) before anything is written.
+
+The items, item versions, relations and closure table rows are inserted with
+bulk statements (one statement per table) in the current transaction. The
+current versions and paths of the new items are set with a single bulk update.
+The caller has to commit the session.
+
+The ids of the inserted items and versions are returned by the insert
+statements if the database supports ``RETURNING`` for bulk inserts. Otherwise
+(e.g. MySQL) they are queried afterwards: the new items are the items of the
+taxonomy without a current version above the largest item id before the
+insert, and the new versions are the first versions of the new items.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.sql.expression import func, insert, select, update
+
+from .db import DB
+from .models.taxonomies import (
+    Taxonomy,
+    TaxonomyItem,
+    TaxonomyItemRelation,
+    TaxonomyItemVersion,
+)
+from .models.taxonomy_closure import CLOSURE_QUERY_BATCH_SIZE, add_new_item_paths
+from .models.taxonomy_paths import compute_item_paths
+
+# the number of keys of problematic items included in error messages
+MAX_REPORTED_KEYS = 10
+
+
+class TaxonomyImportError(ValueError):
+    """Error raised for imports that cannot be imported (e.g. because of a circle).
+
+    Args:
+        message (str): the error message
+        keys (Sequence[str], optional): the keys (or names) of the problematic items
+    """
+
+    def __init__(self, message: str, keys: Sequence[str] = tuple()) -> None:
+        super().__init__(message)
+        self.message = message
+        self.keys = keys
+
+    def __str__(self) -> str:
+        if not self.keys:
+            return self.message
+        keys = ", ".join(self.keys[:MAX_REPORTED_KEYS])
+        if len(self.keys) > MAX_REPORTED_KEYS:
+            keys += f" (and {len(self.keys) - MAX_REPORTED_KEYS} more)"
+        return f"{self.message} ({keys})"
+
+
+@dataclass
+class ImportedItem:
+    """A taxonomy item of an import."""
+
+    name: str
+    description: str = ""
+    sort_key: float = 10
+    key: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return self.key if self.key is not None else self.name
+
+
+@dataclass
+class TaxonomyImport:
+    """The items of an import and the relations between them (as item indexes)."""
+
+    items: List[ImportedItem] = field(default_factory=list)
+    relations: List[Tuple[int, int]] = field(default_factory=list)
+    keys: Dict[str, int] = field(default_factory=dict)
+
+    @staticmethod
+    def from_data(
+        items: Sequence[Mapping[str, Any]],
+        relations: Sequence[Mapping[str, Any]] = tuple(),
+    ) -> "TaxonomyImport":
+        """Parse the (already deserialized) data of an import.
+
+        Items are dicts with a ``name`` and optionally ``key``, ``description``,
+        ``sort_key`` and ``children`` (nested items). Relations are dicts with
+        the ``source`` and ``target`` keys of two items.
+
+        Raises:
+            TaxonomyImportError: if keys are duplicated or unknown
+        """
+        result = TaxonomyImport()
+        seen_relations: Set[Tuple[int, int]] = set()
+        duplicate_keys: List[str] = []
+
+        # depth first without recursion (nested trees can be very deep)
+        stack: List[Tuple[Optional[int], Mapping[str, Any]]] = [
+            (None, item) for item in reversed(items)
+        ]
+        while stack:
+            parent_index, data = stack.pop()
+            key: Optional[str] = data.get("key")
+            sort_key = data.get("sort_key")
+            item = ImportedItem(
+                name=data["name"],
+                description=data.get("description") or "",
+                sort_key=sort_key if sort_key is not None else 10,
+                key=key,
+            )
+            index = len(result.items)
+            result.items.append(item)
+            if key is not None:
+                if key in result.keys:
+                    duplicate_keys.append(key)
+                result.keys[key] = index
+            if parent_index is not None:
+                seen_relations.add((parent_index, index))
+                result.relations.append((parent_index, index))
+            stack.extend((index, child) for child in reversed(data.get("children", ())))
+
+        if duplicate_keys:
+            raise TaxonomyImportError("Item keys must be unique.", duplicate_keys)
+
+        unknown_keys: List[str] = []
+        for relation in relations:
+            source, target = relation["source"], relation["target"]
+            if source not in result.keys:
+                unknown_keys.append(source)
+            if target not in result.keys:
+                unknown_keys.append(target)
+            if source not in result.keys or target not in result.keys:
+                continue
+            edge = (result.keys[source], result.keys[target])
+            if edge in seen_relations:
+                continue  # ignore duplicated relations
+            seen_relations.add(edge)
+            result.relations.append(edge)
+
+        if unknown_keys:
+            raise TaxonomyImportError("Relations reference unknown items.", unknown_keys)
+        return result
+
+    def get_topological_order(self) -> List[int]:
+        """Sort the items topologically (parents before children).
+
+        Raises:
+            TaxonomyImportError: if the relations contain a circle
+        """
+        children: List[List[int]] = [[] for _ in self.items]
+        parent_count: List[int] = [0] * len(self.items)
+        for source, target in self.relations:
+            children[source].append(target)
+            parent_count[target] += 1
+        queue = deque(index for index, count in enumerate(parent_count) if not count)
+        order: List[int] = []
+        while queue:
+            index = queue.popleft()
+            order.append(index)
+            for child in children[index]:
+                parent_count[child] -= 1
+                if not parent_count[child]:
+                    queue.append(child)
+        if len(order) < len(self.items):
+            # all items not sorted are part of a circle or below a circle
+            raise TaxonomyImportError(
+                "The relations of the imported items contain a circle.",
+                [
+                    self.items[index].label
+                    for index, count in enumerate(parent_count)
+                    if count
+                ],
+            )
+        return order
+
+    def get_toplevel_items(self) -> List[int]:
+        """Get the indexes of all items without a parent in the import."""
+        has_parent = {target for _, target in self.relations}
+        return [index for index in range(len(self.items)) if index not in has_parent]
+
+
+@dataclass
+class TaxonomyImportResult:
+    """Summary of an import."""
+
+    items_created: int
+    relations_created: int
+    toplevel_items: int
+    max_depth: int
+    closure_rows: int
+    # the ids of all imported items with a key
+    ids: Dict[str, int] = field(default_factory=dict)
+
+
+def _supports_bulk_returning() -> bool:
+    """Check if the database returns the inserted rows of bulk inserts."""
+    return DB.session.get_bind().dialect.insert_executemany_returning
+
+
+def _insert_items(taxonomy: Taxonomy, count: int, now: datetime) -> List[int]:
+    """Insert new items without a version and return their ids (sorted)."""
+    rows = [
+        {"taxonomy_id": taxonomy.id, "created_on": now, "updated_on": now}
+        for _ in range(count)
+    ]
+    if _supports_bulk_returning():
+        # new items are indistinguishable until they have a version, so the
+        # returned ids do not need to be in the order of the inserted rows
+        # (which would force some databases to insert the rows one by one)
+        return sorted(
+            DB.session.execute(insert(TaxonomyItem).returning(TaxonomyItem.id), rows)
+            .scalars()
+            .all()
+        )
+    last_id: int = DB.session.execute(select(func.max(TaxonomyItem.id))).scalar() or 0
+    DB.session.execute(insert(TaxonomyItem), rows)
+    item_ids: List[int] = (
+        DB.session.execute(
+            select(TaxonomyItem.id)
+            .where(
+                TaxonomyItem.taxonomy_id == taxonomy.id,
+                TaxonomyItem.current_version_id == None,
+                TaxonomyItem.id > last_id,
+            )
+            .order_by(TaxonomyItem.id)
+        )
+        .scalars()
+        .all()
+    )
+    if len(item_ids) != count:
+        raise TaxonomyImportError("Could not identify the inserted items.")
+    return item_ids
+
+
+def _insert_versions(rows: List[Dict[str, Any]]) -> Dict[int, int]:
+    """Insert the first versions of new items and return their ids by item id."""
+    if _supports_bulk_returning():
+        return {
+            item_id: version_id
+            for version_id, item_id in DB.session.execute(
+                insert(TaxonomyItemVersion).returning(
+                    TaxonomyItemVersion.id, TaxonomyItemVersion.taxonomy_item_id
+                ),
+                rows,
+            )
+        }
+    DB.session.execute(insert(TaxonomyItemVersion), rows)
+    item_ids = [row["taxonomy_item_id"] for row in rows]
+    version_ids: Dict[int, int] = {}
+    for start in range(0, len(item_ids), CLOSURE_QUERY_BATCH_SIZE):
+        version_ids.update(
+            (item_id, version_id)
+            for version_id, item_id in DB.session.execute(
+                select(
+                    TaxonomyItemVersion.id, TaxonomyItemVersion.taxonomy_item_id
+                ).where(
+                    TaxonomyItemVersion.taxonomy_item_id.in_(
+                        item_ids[start : start + CLOSURE_QUERY_BATCH_SIZE]
+                    ),
+                    TaxonomyItemVersion.version == 1,
+                )
+            )
+        )
+    return version_ids
+
+
+def import_taxonomy_items(
+    taxonomy: Taxonomy,
+    taxonomy_import: TaxonomyImport,
+    parent: Optional[TaxonomyItem] = None,
+) -> TaxonomyImportResult:
+    """Insert all items of an import into a taxonomy with bulk statements.
+
+    Args:
+        taxonomy (Taxonomy): the taxonomy to import into
+        taxonomy_import (TaxonomyImport): the items to import
+        parent (Optional[TaxonomyItem], optional): an existing item of the
+            taxonomy that becomes the parent of all toplevel imported items
+
+    Raises:
+        TaxonomyImportError: if the relations contain a circle
+
+    Returns:
+        TaxonomyImportResult: the summary of the import
+    """
+    # validate before writing anything
+    order = taxonomy_import.get_topological_order()
+    toplevel_items = taxonomy_import.get_toplevel_items()
+
+    depth = [0] * len(taxonomy_import.items)
+    children: List[List[int]] = [[] for _ in taxonomy_import.items]
+    for source, target in taxonomy_import.relations:
+        children[source].append(target)
+    for index in order:
+        for child in children[index]:
+            depth[child] = max(depth[child], depth[index] + 1)
+
+    if not taxonomy_import.items:
+        return TaxonomyImportResult(
+            items_created=0,
+            relations_created=0,
+            toplevel_items=0,
+            max_depth=0,
+            closure_rows=0,
+        )
+
+    now = datetime.now(timezone.utc)
+    item_ids = _insert_items(taxonomy, len(taxonomy_import.items), now)
+    version_ids = _insert_versions(
+        [
+            {
+                "taxonomy_item_id": item_id,
+                "version": 1,
+                "name": item.name,
+                "description": item.description,
+                "sort_key": item.sort_key,
+                "created_on": now,
+            }
+            for item_id, item in zip(item_ids, taxonomy_import.items)
+        ]
+    )
+
+    edges = [
+        (item_ids[source], item_ids[target])
+        for source, target in taxonomy_import.relations
+    ]
+    toplevel_ids = [item_ids[index] for index in toplevel_items]
+    relations = list(edges)
+    if parent is not None:
+        relations.extend((parent.id, item_id) for item_id in toplevel_ids)
+    if relations:
+        # bulk inserts bypass the mapper events maintaining the closure table
+        DB.session.execute(
+            insert(TaxonomyItemRelation),
+            [
+                {
+                    "taxonomy_item_source_id": source_id,
+                    "taxonomy_item_target_id": target_id,
+                    "created_on": now,
+                }
+                for source_id, target_id in relations
+            ],
+        )
+    # bulk updates bypass the events copying the current version into the item
+    first_parents: Dict[int, int] = {}
+    for source_id, target_id in relations:
+        first_parents.setdefault(target_id, source_id)
+    paths = compute_item_paths(
+        item_ids,
+        first_parents,
+        {parent.id: parent.path} if parent is not None else {},
+    )
+    DB.session.execute(
+        update(TaxonomyItem),
+        [
+            {
+                "id": item_id,
+                "current_version_id": version_ids[item_id],
+                "current_name": item.name,
+                "current_sort_key": item.sort_key,
+                "path": paths[item_id],
+                "updated_on": now,
+            }
+            for item_id, item in zip(item_ids, taxonomy_import.items)
+        ],
+    )
+    closure_rows = add_new_item_paths(
+        DB.session.connection(),
+        taxonomy.id,
+        edges,
+        toplevel_ids=toplevel_ids,
+        parent_id=parent.id if parent is not None else None,
+    )
+
+    return TaxonomyImportResult(
+        items_created=len(item_ids),
+        relations_created=len(relations),
+        toplevel_items=len(toplevel_ids),
+        max_depth=max(depth),
+        closure_rows=closure_rows,
+        ids={key: item_ids[index] for key, index in taxonomy_import.keys.items()},
+    )
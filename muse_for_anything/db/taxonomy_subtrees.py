@@ -0,0 +1,387 @@
+"""Module containing set based operations on subtrees of taxonomy items.
+
+The subtree of a taxonomy item contains the item and all its (transitive)
+children. Items with multiple parents belong to the subtrees of all their
+parents. The operations change all items and relations of a subtree with a
+few ``UPDATE ... WHERE id IN (subtree)`` statements and maintain the closure
+table and the item paths directly (bulk statements bypass the mapper events
+of the relations).
+
+* deleting a subtree marks all items and all their current relations as
+  deleted with the same timestamp
+* restoring a subtree restores all items and relations deleted together with
+  the root item (found with a recursive query as deleted items are not part
+  of the closure table)
+* moving a subtree replaces the parents of the root item with a new parent
+
+The caller has to commit the session.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.expression import delete, insert, or_, select, update
+
+from .db import DB
+from .models.taxonomies import TaxonomyItem, TaxonomyItemRelation
+from .models.taxonomy_closure import (
+    CLOSURE_QUERY_BATCH_SIZE,
+    CLOSURE_TABLE,
+    TaxonomyItemClosure,
+    add_new_item_paths,
+    add_relation_paths,
+    remove_relation_paths,
+)
+from .models.taxonomy_paths import update_item_path, update_restored_item_paths
+
+
+# (source id, target id) by relation id
+RelationsById = Dict[int, Tuple[int, int]]
+
+
+@dataclass
+class SubtreeChange:
+    """Summary of a subtree operation."""
+
+    items: int = 0
+    relations: int = 0
+    # relations that were not restored because they would create a circle
+    skipped_relations: int = 0
+    # the ids of all items of the subtree
+    item_ids: Set[int] = field(default_factory=set)
+
+
+def _batched(ids: Iterable[int]) -> Iterable[List[int]]:
+    id_list = sorted(ids)
+    for start in range(0, len(id_list), CLOSURE_QUERY_BATCH_SIZE):
+        yield id_list[start : start + CLOSURE_QUERY_BATCH_SIZE]
+
+
+def get_subtree_ids(taxonomy_item_id: int) -> Set[int]:
+    """Get the ids of a (not deleted) taxonomy item and all its descendants."""
+    return {taxonomy_item_id, *TaxonomyItemClosure.get_descendant_ids(taxonomy_item_id)}
+
+
+def get_deleted_subtree_ids(taxonomy_item: TaxonomyItem) -> Set[int]:
+    """Get the ids of all items deleted together with a deleted taxonomy item.
+
+    Follows the relations deleted at the same time as the item with a single
+    recursive query.
+    """
+    deleted_on = taxonomy_item.deleted_on
+    subtree = (
+        select(TaxonomyItem.id.label("item_id"))
+        .where(TaxonomyItem.id == taxonomy_item.id)
+        .cte("deleted_subtree", recursive=True)
+    )
+    child = aliased(TaxonomyItem)
+    subtree = subtree.union(
+        select(child.id)
+        .join(
+            TaxonomyItemRelation,
+            TaxonomyItemRelation.taxonomy_item_target_id == child.id,
+        )
+        .join(subtree, subtree.c.item_id == TaxonomyItemRelation.taxonomy_item_source_id)
+        .where(
+            TaxonomyItemRelation.deleted_on == deleted_on,
+            child.deleted_on == deleted_on,
+        )
+    )
+    return set(DB.session.execute(select(subtree.c.item_id)).scalars())
+
+
+def delete_subtree(
+    taxonomy_item: TaxonomyItem, deleted_on: Optional[datetime] = None
+) -> SubtreeChange:
+    """Delete a taxonomy item, all its descendants and all their relations."""
+    if deleted_on is None:
+        deleted_on = datetime.now(timezone.utc)
+    item_ids = get_subtree_ids(taxonomy_item.id)
+    change = SubtreeChange(item_ids=item_ids)
+    for batch in _batched(item_ids):
+        change.items += DB.session.execute(
+            update(TaxonomyItem)
+            .where(TaxonomyItem.id.in_(batch), TaxonomyItem.deleted_on == None)
+            .values(deleted_on=deleted_on)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        change.relations += DB.session.execute(
+            update(TaxonomyItemRelation)
+            .where(
+                TaxonomyItemRelation.deleted_on == None,
+                or_(
+                    TaxonomyItemRelation.taxonomy_item_source_id.in_(batch),
+                    TaxonomyItemRelation.taxonomy_item_target_id.in_(batch),
+                ),
+            )
+            .values(deleted_on=deleted_on)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        # paths from or to items of the subtree always end in the subtree
+        DB.session.execute(
+            delete(CLOSURE_TABLE).where(CLOSURE_TABLE.c.descendant_id.in_(batch))
+        )
+    return change
+
+
+def _creates_circle(graph: Dict[int, Set[int]], source_id: int, target_id: int) -> bool:
+    """Check if the source can be reached from the target in the graph."""
+    stack = [target_id]
+    seen = {target_id}
+    while stack:
+        current = stack.pop()
+        if current == source_id:
+            return True
+        for next_id in graph.get(current, ()):
+            if next_id not in seen:
+                seen.add(next_id)
+                stack.append(next_id)
+    return False
+
+
+def _get_deleted_relations(
+    item_ids: Set[int], deleted_on: datetime
+) -> Dict[int, Tuple[int, int, bool, bool]]:
+    """Get the relations of the items deleted at the same time as the items.
+
+    Returns:
+        the source id, target id and the existence of the source and target
+        item by relation id
+    """
+    source_item, target_item = aliased(TaxonomyItem), aliased(TaxonomyItem)
+    relations: Dict[int, Tuple[int, int, bool, bool]] = {}
+    for batch in _batched(item_ids):
+        rows = DB.session.execute(
+            select(
+                TaxonomyItemRelation.id,
+                TaxonomyItemRelation.taxonomy_item_source_id,
+                TaxonomyItemRelation.taxonomy_item_target_id,
+                source_item.deleted_on == None,
+                target_item.deleted_on == None,
+            )
+            .join(
+                source_item,
+                source_item.id == TaxonomyItemRelation.taxonomy_item_source_id,
+            )
+            .join(
+                target_item,
+                target_item.id == TaxonomyItemRelation.taxonomy_item_target_id,
+            )
+            .where(
+                TaxonomyItemRelation.deleted_on == deleted_on,
+                or_(
+                    TaxonomyItemRelation.taxonomy_item_source_id.in_(batch),
+                    TaxonomyItemRelation.taxonomy_item_target_id.in_(batch),
+                ),
+            )
+        )
+        for relation_id, source_id, target_id, source_exists, target_exists in rows:
+            relations[relation_id] = (source_id, target_id, source_exists, target_exists)
+    return relations
+
+
+def _classify_relations(
+    relations: Dict[int, Tuple[int, int, bool, bool]], item_ids: Set[int]
+) -> Tuple[RelationsById, RelationsById, RelationsById]:
+    """Split the restorable relations by their position relative to the subtree.
+
+    Returns:
+        the relations inside of the subtree, the relations from existing
+        parents and the relations to existing children
+    """
+    internal: RelationsById = {}
+    incoming: RelationsById = {}
+    outgoing: RelationsById = {}
+    for relation_id, (source_id, target_id, source_exists, target_exists) in sorted(
+        relations.items()
+    ):
+        if source_id in item_ids and target_id in item_ids:
+            internal[relation_id] = (source_id, target_id)
+        elif target_id in item_ids:
+            if source_exists:
+                incoming[relation_id] = (source_id, target_id)
+        elif target_exists:
+            outgoing[relation_id] = (source_id, target_id)
+    return internal, incoming, outgoing
+
+
+def _get_restorable_outgoing(
+    internal: RelationsById, incoming: RelationsById, outgoing: RelationsById
+) -> RelationsById:
+    """Get the relations to children outside of the subtree without a circle.
+
+    The relations are checked against the existing paths from these children
+    to the parents of the subtree.
+    """
+    graph: Dict[int, Set[int]] = {}
+    for source_id, target_id in (*internal.values(), *incoming.values()):
+        graph.setdefault(source_id, set()).add(target_id)
+    if outgoing and incoming:
+        children = {target_id for _, target_id in outgoing.values()}
+        parents = {source_id for source_id, _ in incoming.values()}
+        for child_batch in _batched(children):
+            for parent_batch in _batched(parents):
+                graph_edges = DB.session.execute(
+                    select(
+                        CLOSURE_TABLE.c.ancestor_id, CLOSURE_TABLE.c.descendant_id
+                    ).where(
+                        CLOSURE_TABLE.c.ancestor_id.in_(child_batch),
+                        CLOSURE_TABLE.c.descendant_id.in_(parent_batch),
+                    )
+                )
+                for ancestor_id, descendant_id in graph_edges:
+                    graph.setdefault(ancestor_id, set()).add(descendant_id)
+    restorable: RelationsById = {}
+    for relation_id, (source_id, target_id) in outgoing.items():
+        if _creates_circle(graph, source_id, target_id):
+            continue
+        graph.setdefault(source_id, set()).add(target_id)
+        restorable[relation_id] = (source_id, target_id)
+    return restorable
+
+
+def _add_restored_paths(
+    taxonomy_id: int,
+    item_ids: Set[int],
+    internal: RelationsById,
+    incoming: RelationsById,
+    restored_outgoing: RelationsById,
+):
+    """Add the restored items and relations to the closure table and paths."""
+    # the restored items are not part of the closure table yet
+    connection = DB.session.connection()
+    add_new_item_paths(connection, taxonomy_id, internal.values())
+    for source_id, target_id in (*incoming.values(), *restored_outgoing.values()):
+        add_relation_paths(connection, source_id, target_id)
+    # a restored relation can be the (oldest) first relation of a child
+    update_restored_item_paths(connection, item_ids)
+    for child_id in {target_id for _, target_id in restored_outgoing.values()}:
+        update_item_path(connection, child_id)
+
+
+def restore_subtree(taxonomy_item: TaxonomyItem) -> SubtreeChange:
+    """Restore a deleted taxonomy item and all items deleted together with it.
+
+    Relations deleted together with the items are restored if both related
+    items exist after the restore. Restored relations to children outside of
+    the subtree are skipped if they would create a circle.
+    """
+    if taxonomy_item.deleted_on is None:
+        return SubtreeChange()
+    deleted_on = taxonomy_item.deleted_on
+    item_ids = get_deleted_subtree_ids(taxonomy_item)
+
+    internal, incoming, outgoing = _classify_relations(
+        _get_deleted_relations(item_ids, deleted_on), item_ids
+    )
+    restored_outgoing = _get_restorable_outgoing(internal, incoming, outgoing)
+
+    restored = [*internal, *incoming, *restored_outgoing]
+    change = SubtreeChange(
+        relations=len(restored),
+        skipped_relations=len(outgoing) - len(restored_outgoing),
+        item_ids=item_ids,
+    )
+    for batch in _batched(item_ids):
+        change.items += DB.session.execute(
+            update(TaxonomyItem)
+            .where(TaxonomyItem.id.in_(batch), TaxonomyItem.deleted_on == deleted_on)
+            .values(deleted_on=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    for batch in _batched(restored):
+        DB.session.execute(
+            update(TaxonomyItemRelation)
+            .where(TaxonomyItemRelation.id.in_(batch))
+            .values(deleted_on=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    _add_restored_paths(
+        taxonomy_item.taxonomy_id, item_ids, internal, incoming, restored_outgoing
+    )
+    return change
+
+
+def get_parent_relations(taxonomy_item: TaxonomyItem) -> List[TaxonomyItemRelation]:
+    """Get the current relations from the parents to a taxonomy item."""
+    return TaxonomyItemRelation.query.filter(
+        TaxonomyItemRelation.taxonomy_item_target_id == taxonomy_item.id,
+        TaxonomyItemRelation.deleted_on == None,
+    ).all()
+
+
+def get_removed_parent_relations(
+    parent_relations: Sequence[TaxonomyItemRelation], new_parent: Optional[TaxonomyItem]
+) -> List[TaxonomyItemRelation]:
+    """Get the parent relations a move to the new parent deletes."""
+    new_parent_id = new_parent.id if new_parent is not None else None
+    return [
+        relation
+        for relation in parent_relations
+        if relation.taxonomy_item_source_id != new_parent_id
+    ]
+
+
+def move_subtree(
+    taxonomy_item: TaxonomyItem,
+    new_parent: Optional[TaxonomyItem],
+    item_ids: Optional[Set[int]] = None,
+    parent_relations: Optional[Sequence[TaxonomyItemRelation]] = None,
+) -> SubtreeChange:
+    """Replace all parents of a taxonomy item with a new parent.
+
+    The caller must check that the new parent is not part of the subtree
+    (``item_ids``) of the item.
+
+    Args:
+        taxonomy_item (TaxonomyItem): the root of the moved subtree
+        new_parent (Optional[TaxonomyItem]): the new parent (None to make the
+            item a toplevel item)
+        item_ids (Optional[Set[int]], optional): the precomputed subtree of
+            the item
+        parent_relations (Optional[Sequence[TaxonomyItemRelation]], optional):
+            the precomputed current parent relations of the item
+    """
+    if item_ids is None:
+        item_ids = get_subtree_ids(taxonomy_item.id)
+    if parent_relations is None:
+        parent_relations = get_parent_relations(taxonomy_item)
+    now = datetime.now(timezone.utc)
+    new_parent_id = new_parent.id if new_parent is not None else None
+    removed: Dict[int, int] = {
+        relation.id: relation.taxonomy_item_source_id
+        for relation in get_removed_parent_relations(parent_relations, new_parent)
+    }
+    change = SubtreeChange(items=len(item_ids), item_ids=item_ids)
+
+    connection = DB.session.connection()
+    if removed:
+        DB.session.execute(
+            update(TaxonomyItemRelation)
+            .where(TaxonomyItemRelation.id.in_(list(removed)))
+            .values(deleted_on=now)
+            .execution_options(synchronize_session=False)
+        )
+        for parent_id in removed.values():
+            remove_relation_paths(connection, parent_id, taxonomy_item.id)
+        change.relations += len(removed)
+    # only add the new parent if it is not a parent of the item already
+    if new_parent_id is not None and len(removed) == len(parent_relations):
+        DB.session.execute(
+            insert(TaxonomyItemRelation),
+            [
+                {
+                    "taxonomy_item_source_id": new_parent_id,
+                    "taxonomy_item_target_id": taxonomy_item.id,
+                    "created_on": now,
+                }
+            ],
+        )
+        add_relation_paths(connection, new_parent_id, taxonomy_item.id)
+        change.relations += 1
+    # moves the paths of all items below the first parent of the item
+    update_item_path(connection, taxonomy_item.id)
+    return change
@@ -0,0 +1,335 @@
+"""Module containing a compiled (pure python) version of the common authorization rules.
+
+The predicates mirror the rules in ``muse_for_anything/policies/*.polar`` for
+the ontology resources. They are stored in a table per
+(actor class, action, resource class) where the resource class of an
+``OsoResource`` is its resource type string. Checks without a table entry (or
+with a resource shape a predicate cannot decide) return None and must be
+answered by polar.
+
+After changing the policy files run the app with
+``OSO_AUTHORIZATION_ENGINE = "parity"`` to compare both engines.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from .db.models.namespace import Namespace
+from .db.models.ontology_objects import (
+    OntologyObject,
+    OntologyObjectType,
+    OntologyObjectTypeVersion,
+    OntologyObjectVersion,
+)
+from .db.models.taxonomies import (
+    Taxonomy,
+    TaxonomyItem,
+    TaxonomyItemRelation,
+    TaxonomyItemVersion,
+)
+from .db.models.users import Guest, User
+from .oso_helpers import OsoResource
+
+ResourceClass = Union[type, str]
+Predicate = Callable[[Any, Any], Optional[bool]]
+
+# the policy files the compiled rules were derived from
+COMPILED_POLICY_FILES = (
+    "muse_for_anything/policies/identity_rules.polar",
+    "muse_for_anything/policies/authorizations.polar",
+    "muse_for_anything/policies/user_management_authorizations.polar",
+)
+
+_MODEL_RESOURCES = (
+    Namespace,
+    OntologyObjectType,
+    OntologyObjectTypeVersion,
+    OntologyObject,
+    OntologyObjectVersion,
+    Taxonomy,
+    TaxonomyItem,
+    TaxonomyItemVersion,
+    TaxonomyItemRelation,
+)
+
+_OSO_RESOURCE_TYPES = (
+    "ont-namespace",
+    "ont-type",
+    "ont-type-version",
+    "ont-object",
+    "ont-object-version",
+    "ont-taxonomy",
+    "ont-taxonomy-item",
+    "ont-taxonomy-item-version",
+    "ont-taxonomy-item-relation",
+)
+
+# resource types with type specific roles on the namespace (e.g. "ont-type_owner")
+_NAMESPACE_SCOPED_TYPES: Dict[type, str] = {
+    OntologyObjectType: "ont-type",
+    OntologyObject: "ont-object",
+    Taxonomy: "ont-taxonomy",
+}
+
+# roles that allow creating resources of a type without a resource grant
+_CREATOR_ROLES: Dict[str, Tuple[str, ...]] = {
+    "ont-namespace": ("ont-namespace_admin", "ont-namespace_creator"),
+    "ont-type": ("ont-namespace_admin", "ont-type_creator"),
+    "ont-object": ("ont-namespace_admin", "ont-object_creator"),
+    "ont-taxonomy": ("ont-namespace_admin", "ont-taxonomy_creator"),
+    "ont-taxonomy-item": ("ont-namespace_admin", "ont-taxonomy_creator"),
+    "ont-taxonomy-item-relation": ("ont-namespace_admin", "ont-taxonomy_creator"),
+}
+
+
+# identity rules ###############################################################
+
+
+def has_resource_role(user: User, role: str, resource: Any) -> bool:
+    """has_resource_role(user, role, resource) of identity_rules.polar."""
+    if isinstance(resource, Namespace):
+        return user.has_resource_role(role, resource)
+    for resource_class, resource_type in _NAMESPACE_SCOPED_TYPES.items():
+        if isinstance(resource, resource_class):
+            return (
+                user.has_resource_role(role, resource)
+                or has_resource_role(user, role, resource.namespace)
+                or has_typed_resource_role(user, role, resource_type, resource.namespace)
+            )
+    if isinstance(resource, OntologyObjectTypeVersion):
+        return has_resource_role(user, role, resource.ontology_type)
+    if isinstance(resource, OntologyObjectVersion):
+        return has_resource_role(user, role, resource.ontology_object)
+    if isinstance(resource, TaxonomyItem):
+        return has_resource_role(user, role, resource.taxonomy)
+    if isinstance(resource, TaxonomyItemVersion):
+        return has_resource_role(user, role, resource.taxonomy_item)
+    if isinstance(resource, TaxonomyItemRelation):
+        return has_resource_role(user, role, resource.taxonomy_item_source)
+    return False
+
+
+def has_typed_resource_role(
+    user: User, role: str, resource_type: str, resource: Any
+) -> bool:
+    """has_resource_role(user, role, resource_type, resource) of identity_rules.polar."""
+    if isinstance(resource, Namespace):
+        return user.has_resource_role(f"{resource_type}_{role}", resource)
+    return False
+
+
+def _is_admin(user: User) -> bool:
+    return user.has_role("admin")
+
+
+def _is_namespace_admin_or_editor(user: User) -> bool:
+    return user.has_role("ont-namespace_admin") or user.has_role("ont-namespace_editor")
+
+
+def _is_owner(user: User, resource: Any) -> bool:
+    return has_resource_role(user, "owner", resource)
+
+
+def _is_owner_or_editor(user: User, resource: Any) -> bool:
+    return has_resource_role(user, "owner", resource) or has_resource_role(
+        user, "editor", resource
+    )
+
+
+# create rules #################################################################
+
+
+def _can_create(user: User) -> bool:
+    return user.has_role("creator") or _is_admin(user)
+
+
+def _can_create_type(user: User, resource_type: str) -> bool:
+    return any(user.has_role(role) for role in _CREATOR_ROLES[resource_type])
+
+
+def _can_create_in(user: User, resource_type: str, parent: Any) -> bool:
+    """can_create(user, resource_type, parent_resource) of authorizations.polar."""
+    if isinstance(parent, TaxonomyItem):
+        parent = parent.taxonomy
+    if not isinstance(parent, (Namespace, Taxonomy)):
+        return False
+    return (
+        _is_owner(user, parent)
+        or has_typed_resource_role(user, "owner", resource_type, parent)
+        or has_resource_role(user, "creator", parent)
+        or has_typed_resource_role(user, "creator", resource_type, parent)
+    )
+
+
+def _allow_create(user: User, resource: OsoResource) -> Optional[bool]:
+    if resource.is_collection:
+        return False
+    resource_type = resource.resource_type
+    parent = resource.parent_resource
+
+    if resource_type == "ont-object":
+        if not resource.arguments or "type" not in resource.arguments:
+            return False
+        if not isinstance(parent, Namespace):
+            return False
+        if _can_create(user) or _can_create_type(user, resource_type):
+            return True
+        if _can_create_in(user, resource_type, parent):
+            return True
+        object_type = resource.arguments["type"]
+        if not isinstance(object_type, OntologyObjectType):
+            return False
+        return _is_owner(user, object_type) or has_resource_role(
+            user, "creator", object_type
+        )
+
+    if resource.arguments is not None:
+        return False
+
+    if resource_type == "ont-namespace":
+        return _can_create(user) or _can_create_type(user, resource_type)
+    if resource_type in ("ont-type", "ont-taxonomy"):
+        expected_parent: type = Namespace
+    elif resource_type == "ont-taxonomy-item":
+        expected_parent = Taxonomy
+    elif resource_type == "ont-taxonomy-item-relation":
+        if not isinstance(parent, TaxonomyItem):
+            return None
+        parent = parent.taxonomy
+        expected_parent = Taxonomy
+    else:
+        return None
+
+    if not isinstance(parent, expected_parent):
+        return False
+    return (
+        _can_create(user)
+        or _can_create_type(user, resource_type)
+        or _can_create_in(user, resource_type, parent)
+    )
+
+
+# edit rules ###################################################################
+
+
+def _can_edit(user: User) -> bool:
+    return user.has_role("editor") or _is_admin(user)
+
+
+def _allow_edit(user: User, resource: Any) -> bool:
+    return _can_edit(user) or _is_owner_or_editor(user, resource)
+
+
+def _allow_edit_in_namespace(user: User, resource: Any) -> bool:
+    return (
+        _can_edit(user)
+        or _is_namespace_admin_or_editor(user)
+        or _is_owner_or_editor(user, resource)
+    )
+
+
+# delete and restore rules #####################################################
+
+
+def _can_delete(user: User, resource: Any) -> bool:
+    if _is_owner(user, resource):
+        return True
+    if isinstance(resource, TaxonomyItem):
+        return _is_owner_or_editor(user, resource.taxonomy)
+    if isinstance(resource, TaxonomyItemRelation):
+        return _can_delete(user, resource.taxonomy_item_source.taxonomy)
+    return False
+
+
+def _allow_delete(user: User, resource: Any) -> bool:
+    return _is_admin(user) or _can_delete(user, resource)
+
+
+def _allow_delete_in_namespace(user: User, resource: Any) -> bool:
+    return (
+        _is_admin(user)
+        or _is_namespace_admin_or_editor(user)
+        or _can_delete(user, resource)
+    )
+
+
+# guest rules ##################################################################
+
+
+def _guest_get_namespace(guest: Guest, resource: OsoResource) -> bool:
+    return resource.arguments is None
+
+
+def _allow(actor: Any, resource: Any) -> bool:
+    return True
+
+
+def _deny(actor: Any, resource: Any) -> bool:
+    return False
+
+
+def compile_rules() -> Dict[Tuple[type, str, ResourceClass], Predicate]:
+    """Build the predicate table of the compiled rules."""
+    rules: Dict[Tuple[type, str, ResourceClass], Predicate] = {}
+
+    resource_classes: Tuple[ResourceClass, ...] = (
+        *_MODEL_RESOURCES,
+        *_OSO_RESOURCE_TYPES,
+    )
+
+    # guests may only see namespaces
+    for action in ("GET", "CREATE", "EDIT", "DELETE", "RESTORE", "EXPORT"):
+        for resource_class in resource_classes:
+            rules[(Guest, action, resource_class)] = _deny
+    rules[(Guest, "GET", Namespace)] = _allow
+    rules[(Guest, "GET", "ont-namespace")] = _guest_get_namespace
+
+    # users may see all ontology resources (they are not protected resources)
+    for action in ("CREATE", "EDIT", "DELETE", "RESTORE", "EXPORT"):
+        for resource_class in resource_classes:
+            rules[(User, action, resource_class)] = _deny
+    for resource_class in resource_classes:
+        rules[(User, "GET", resource_class)] = _allow
+    rules[(User, "EXPORT", Namespace)] = _allow
+
+    for resource_type in _CREATOR_ROLES:
+        rules[(User, "CREATE", resource_type)] = _allow_create
+
+    rules[(User, "EDIT", Namespace)] = _allow_edit_in_namespace
+    rules[(User, "EDIT", Taxonomy)] = _allow_edit_in_namespace
+    for resource_class in (OntologyObjectType, OntologyObject, TaxonomyItem):
+        rules[(User, "EDIT", resource_class)] = _allow_edit
+
+    for action in ("DELETE", "RESTORE"):
+        rules[(User, action, Namespace)] = _allow_delete_in_namespace
+        rules[(User, action, Taxonomy)] = _allow_delete_in_namespace
+        for resource_class in (
+            OntologyObjectType,
+            OntologyObject,
+            TaxonomyItem,
+            TaxonomyItemRelation,
+        ):
+            rules[(User, action, resource_class)] = _allow_delete
+
+    return rules
+
+
+class CompiledPolicy:
+    """Authorization engine evaluating the compiled rules."""
+
+    def __init__(self) -> None:
+        self._rules = compile_rules()
+
+    def decide(self, actor: Any, action: Any, resource: Any) -> Optional[bool]:
+        """Decide if the actor is allowed to perform the action on the resource.
+
+        Returns None if the check cannot be decided by the compiled rules.
+        """
+        resource_class: ResourceClass
+        if isinstance(resource, OsoResource):
+            resource_class = resource.resource_type
+        else:
+            resource_class = type(resource)
+        predicate = self._rules.get((type(actor), action, resource_class))
+        if predicate is None:
+            return None
+        return predicate(actor, resource)
@@ -1,16 +1,34 @@
 """Module for setting up oso support for flask app."""
 
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, NoReturn, Optional, Sequence, Type
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NoReturn,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
-from flask import Flask, current_app
+from flask import Flask, current_app, has_app_context
 from flask.globals import request_ctx, g, request
 from flask.wrappers import Request, Response
 from oso import Oso
 from polar.exceptions import OsoError
+from sqlalchemy import event, inspect, select
 from sqlalchemy.exc import ArgumentError
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 from werkzeug.exceptions import Forbidden
 
+from muse_for_anything.db.db import DB
 from muse_for_anything.db.models.namespace import Namespace
 from muse_for_anything.db.models.ontology_objects import (
     OntologyObject,
@@ -24,7 +42,8 @@ from muse_for_anything.db.models.taxonomies import (
     TaxonomyItemRelation,
     TaxonomyItemVersion,
 )
-from muse_for_anything.db.models.users import User, UserGrant, UserRole
+from muse_for_anything.db.models.users import Guest, User, UserGrant, UserRole
+from muse_for_anything.util.logging import get_logger
 
 _RESOURCE_TYPE_TO_RELATION_MAPPING: Dict[Type, str] = {
     Namespace: "ont-namespace",
@@ -42,6 +61,16 @@ _RESOURCE_TYPE_TO_RELATION_MAPPING: Dict[Type, str] = {
     # TODO add all resources here!
 }
 
+# parent relations traversed by the policies that are not eagerly loaded
+_POLICY_PARENT_RELATIONS: Dict[Type, Tuple[str, ...]] = {
+    OntologyObjectTypeVersion: ("ontology_type",),
+    OntologyObjectVersion: ("ontology_object",),
+    TaxonomyItemVersion: ("taxonomy_item",),
+    TaxonomyItemRelation: ("taxonomy_item_source", "taxonomy_item_target"),
+}
+
+T = TypeVar("T")
+
 
 def get_oso_resource_type(resource_type: Type) -> str:
     if resource_type in _RESOURCE_TYPE_TO_RELATION_MAPPING:
@@ -57,11 +86,68 @@ class OsoResource:
     arguments: Optional[Dict[str, Any]] = None
 
 
+_NIL = "nil"  # marks None values in identities (oso distinguishes nil from {})
+
+
+def _resource_identity(resource: Any) -> Optional[Hashable]:
+    """Get a stable identity of an oso resource.
+
+    Returns None if the resource has no stable identity (e.g. unsaved db models).
+    """
+    if resource is None:
+        return _NIL
+    if isinstance(resource, OsoResource):
+        parent = _resource_identity(resource.parent_resource)
+        if parent is None:
+            return None
+        arguments: Hashable = _NIL
+        if resource.arguments is not None:
+            argument_identities = []
+            for key, value in sorted(resource.arguments.items()):
+                value_identity = _resource_identity(value)
+                if value_identity is None:
+                    return None
+                argument_identities.append((key, value_identity))
+            arguments = tuple(argument_identities)
+        return (
+            OsoResource,
+            resource.resource_type,
+            resource.is_collection,
+            parent,
+            arguments,
+        )
+    if type(resource) in _RESOURCE_TYPE_TO_RELATION_MAPPING:
+        resource_id = getattr(resource, "id", None)
+        if resource_id is None:
+            return None
+        return (type(resource), resource_id)
+    if isinstance(resource, (str, int, bool)):
+        return (type(resource), resource)
+    return None
+
+
+def _actor_identity(actor: Any) -> Optional[Hashable]:
+    """Get a stable identity of an actor or None if the actor has no stable identity."""
+    if isinstance(actor, Guest):
+        return (Guest,)
+    if isinstance(actor, User) and actor.id is not None:
+        return (User, actor.id)
+    return None
+
+
+@dataclass
+class DecisionCache:
+    """Request scoped cache of authorization decisions."""
+
+    decisions: Dict[Hashable, Any] = field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+
+
 class CustomFlaskOso:
 
     _oso: Optional[Oso]
     _app: Optional[Flask]
-    _allowed_methods: Optional[Sequence[str]]
 
     def __init__(self, oso: Optional[Oso] = None, app: Optional[Flask] = None) -> None:
         self._app = app
@@ -74,13 +160,27 @@ class CustomFlaskOso:
 
         self._get_actor = lambda: g.current_user
 
+        # process wide totals of the request scoped decision caches
+        self.decision_cache_hits = 0
+        self.decision_cache_misses = 0
+        self._listeners_registered = False
+
+        # optional compiled rules ("polar", "compiled" or "parity")
+        self.authorization_engine = "polar"
+        self._compiled_policy = None
+        self.compiled_fallbacks = 0
+        self.parity_checks = 0
+        self.parity_disagreements = 0
+        self._logger = None
+
+        # optional authorization filters for collection queries
+        self._sql_filters = None
+
         if self._app is not None:
             self.init_app(self._app)
         if oso is not None:
             self.set_oso(oso)
 
-        self._allowed_methods = None
-
     def set_oso(self, oso: Oso) -> None:
         if oso == self._oso:
             return
@@ -91,6 +191,42 @@ class CustomFlaskOso:
         app.teardown_appcontext(self.teardown)
         app.before_request(self._provide_oso)
         app.before_request(self._clear_old_cache)
+        if not self._listeners_registered:
+            # commits may change grants, never reuse decisions across a commit
+            event.listen(DB.session, "after_commit", self._clear_cache_on_commit)
+            self._listeners_registered = True
+        self._logger = get_logger(app, "oso")
+        self._init_authorization_engine(app)
+
+    def _init_authorization_engine(self, app: Flask):
+        from .oso_compiled_rules import COMPILED_POLICY_FILES, CompiledPolicy
+        from .oso_sql_filters import SqlAuthorizationFilters
+
+        policy_files_match = tuple(app.config.get("OSO_POLICY_FILES", [])) == tuple(
+            COMPILED_POLICY_FILES
+        )
+
+        engine = app.config.get("OSO_AUTHORIZATION_ENGINE", "polar")
+        if engine not in ("polar", "compiled", "parity"):
+            raise ValueError(f"Unknown authorization engine '{engine}'!")
+        if engine != "polar" and not policy_files_match:
+            self._logger.warning(
+                "The compiled authorization rules do not match the configured policy "
+                "files. Falling back to polar for all authorization checks."
+            )
+            engine = "polar"
+        self.authorization_engine = engine
+        self._compiled_policy = CompiledPolicy() if engine != "polar" else None
+
+        self._sql_filters = None
+        if app.config.get("OSO_SQL_FILTERS", True):
+            if policy_files_match:
+                self._sql_filters = SqlAuthorizationFilters()
+            else:
+                self._logger.warning(
+                    "The SQL authorization filters do not match the configured policy "
+                    "files. Collection queries are not filtered in the database."
+                )
 
     def teardown(self, exception):
         pass
@@ -103,7 +239,75 @@ class CustomFlaskOso:
     def _clear_old_cache(
         self,
     ):
-        self._allowed_methods = None
+        g.oso_decision_cache = DecisionCache()
+
+    def _clear_cache_on_commit(self, session):
+        if has_app_context():
+            self.clear_decision_cache()
+
+    def clear_decision_cache(self):
+        """Forget all authorization decisions of the current request."""
+        cache: Optional[DecisionCache] = g.get("oso_decision_cache")
+        if cache is not None:
+            cache.decisions.clear()
+
+    @property
+    def decision_cache(self) -> DecisionCache:
+        """The authorization decision cache of the current request."""
+        cache: Optional[DecisionCache] = g.get("oso_decision_cache")
+        if cache is None:
+            cache = DecisionCache()
+            g.oso_decision_cache = cache
+        return cache
+
+    def _cached_decision(
+        self, actor: Any, action: Any, resource: Any, decide: Callable[[], Any]
+    ) -> Any:
+        """Return the cached decision for (actor, action, resource) or compute it with decide."""
+        actor_identity = _actor_identity(actor)
+        resource_identity = _resource_identity(resource)
+        if actor_identity is None or resource_identity is None or not has_app_context():
+            return decide()
+        key = (actor_identity, action, resource_identity)
+        cache = self.decision_cache
+        if key in cache.decisions:
+            cache.hits += 1
+            self.decision_cache_hits += 1
+            return cache.decisions[key]
+        cache.misses += 1
+        self.decision_cache_misses += 1
+        decision = decide()
+        cache.decisions[key] = decision
+        return decision
+
+    def _decide_is_allowed(
+        self, oso: Oso, actor: Any, action: Any, resource: Any
+    ) -> bool:
+        """Decide an authorization check with the configured authorization engine."""
+        if self._compiled_policy is None:
+            return oso.is_allowed(actor, action, resource)
+        try:
+            decision = self._compiled_policy.decide(actor, action, resource)
+        except (AttributeError, TypeError):
+            self._logger.debug(
+                f"Compiled rules failed for ({actor}, {action}, {resource}).",
+                exc_info=True,
+            )
+            decision = None
+        if self.authorization_engine == "parity":
+            polar_decision = oso.is_allowed(actor, action, resource)
+            self.parity_checks += 1
+            if decision is not None and decision != polar_decision:
+                self.parity_disagreements += 1
+                self._logger.warning(
+                    f"Authorization engines disagree for ({actor}, {action}, {resource}): "
+                    f"polar={polar_decision} compiled={decision}"
+                )
+            return polar_decision
+        if decision is None:
+            self.compiled_fallbacks += 1
+            return oso.is_allowed(actor, action, resource)
+        return decision
 
     def set_get_actor(self, func: Callable[[], Any]) -> None:
         self._get_actor = func
@@ -180,7 +384,13 @@ class CustomFlaskOso:
         if self.oso is None:
             raise OsoError("Cannot perform authorization without oso instance")
 
-        allowed = self.oso.is_allowed(actor, action, resource)
+        oso = self.oso
+        allowed = self._cached_decision(
+            actor,
+            action,
+            resource,
+            lambda: self._decide_is_allowed(oso, actor, action, resource),
+        )
         _authorize_called()
 
         if not allowed:
@@ -246,16 +456,16 @@ class CustomFlaskOso:
         oso = self.oso
         if oso is None:
             raise ValueError("No instance of oso set!")
-        return oso.is_allowed(actor, action, resource)
+        return self._cached_decision(
+            actor,
+            action,
+            resource,
+            lambda: self._decide_is_allowed(oso, actor, action, resource),
+        )
 
     def get_allowed_actions(
         self, resource=None, *, actor=None, allow_wildcard: bool = True
     ) -> Sequence[str]:
-        should_cache_result = resource is None and actor is None and allow_wildcard
-
-        if should_cache_result and self._allowed_methods is not None:
-            return self._allowed_methods
-
         if resource is None:
             resource = self._get_resource()
 
@@ -265,10 +475,111 @@ class CustomFlaskOso:
         oso = self.oso
         if oso is None:
             raise ValueError("No instance of oso set!")
-        result = oso.get_allowed_actions(actor, resource, allow_wildcard=allow_wildcard)
-        if should_cache_result:
-            self._allowed_methods = result
-        return result
+        return self._cached_decision(
+            actor,
+            ("get_allowed_actions", allow_wildcard),
+            resource,
+            lambda: oso.get_allowed_actions(
+                actor, resource, allow_wildcard=allow_wildcard
+            ),
+        )
+
+    def get_filter_criteria(
+        self,
+        model: Type,
+        action: Optional[Any] = None,
+        *,
+        actor: Optional[Any] = None,
+    ) -> Optional[List[Any]]:
+        """Get SQL filter criteria selecting only the rows of model the actor may access.
+
+        Returns None if the authorization rules cannot be expressed as filter
+        criteria. The rows must then be checked individually with is_allowed.
+        """
+        if self._sql_filters is None:
+            return None
+
+        if actor is None:
+            actor = self._get_current_actor()
+
+        if action is None:
+            action = request.method
+
+        return self._sql_filters.get_filter_criteria(actor, action, model)
+
+    def filter_allowed(
+        self,
+        resources: Iterable[T],
+        action: Optional[Any] = None,
+        *,
+        actor: Optional[Any] = None,
+    ) -> List[T]:
+        """Return the resources the actor is allowed to perform the action on.
+
+        The parent resources the policies need are loaded with one query per
+        resource type and all decisions are stored in the decision cache of the
+        request, so later checks of the same resources are free.
+        """
+        resources = list(resources)
+        if not resources:
+            return resources
+
+        if actor is None:
+            actor = self._get_current_actor()
+
+        if action is None:
+            action = request.method
+
+        self._preload_policy_parents(resources)
+
+        return [
+            resource
+            for resource in resources
+            if self.is_allowed(resource, actor=actor, action=action)
+        ]
+
+    def _preload_policy_parents(self, resources: Sequence[Any]) -> None:
+        """Load the parents of the resources the policies traverse (one query per type)."""
+        # parent model -> [(resource, relation name, parent id)]
+        unloaded: Dict[Type, List[Tuple[Any, str, Any]]] = defaultdict(list)
+        for resource in resources:
+            resource_type = type(resource)
+            for relation_name in _POLICY_PARENT_RELATIONS.get(resource_type, ()):
+                if relation_name in resource.__dict__:
+                    continue  # already loaded
+                mapper = inspect(resource_type)
+                relation = mapper.relationships[relation_name]
+                foreign_key = mapper.get_property_by_column(
+                    next(iter(relation.local_columns))
+                ).key
+                parent_id = getattr(resource, foreign_key)
+                if parent_id is not None:
+                    unloaded[relation.mapper.class_].append(
+                        (resource, relation_name, parent_id)
+                    )
+
+        for parent_model, relations in unloaded.items():
+            parents: Dict[Any, Any] = {}
+            parent_ids = set()
+            for _, _, parent_id in relations:
+                parent = DB.session.identity_map.get(
+                    identity_key(parent_model, parent_id)
+                )
+                if parent is not None:
+                    parents[parent_id] = parent
+                else:
+                    parent_ids.add(parent_id)
+            if parent_ids:
+                parents.update(
+                    (parent.id, parent)
+                    for parent in DB.session.execute(
+                        select(parent_model).where(parent_model.id.in_(parent_ids))
+                    ).scalars()
+                )
+            for resource, relation_name, parent_id in relations:
+                parent = parents.get(parent_id)
+                if parent is not None:
+                    set_committed_value(resource, relation_name, parent)
 
 
 OSO = Oso()
@@ -0,0 +1,102 @@
+"""Module containing SQL filter criteria equivalent to the authorization rules.
+
+Collection queries use these criteria to only select rows the current actor
+is allowed to see. The criteria mirror the rules in
+``muse_for_anything/policies/*.polar`` (the same files as the compiled rules in
+``oso_compiled_rules.py``). Combinations without a table entry return None and
+the rows must be filtered with ``FLASK_OSO.is_allowed`` instead.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.sql.expression import false
+
+from .db.models.namespace import Namespace
+from .db.models.ontology_objects import (
+    OntologyObject,
+    OntologyObjectType,
+    OntologyObjectTypeVersion,
+    OntologyObjectVersion,
+)
+from .db.models.taxonomies import (
+    Taxonomy,
+    TaxonomyItem,
+    TaxonomyItemRelation,
+    TaxonomyItemVersion,
+)
+from .db.models.users import Guest, User, UserRole
+
+FilterBuilder = Callable[[Any, type], List[Any]]
+
+_ONTOLOGY_MODELS = (
+    Namespace,
+    OntologyObjectType,
+    OntologyObjectTypeVersion,
+    OntologyObject,
+    OntologyObjectVersion,
+    Taxonomy,
+    TaxonomyItem,
+    TaxonomyItemVersion,
+    TaxonomyItemRelation,
+)
+
+
+def _all_rows(actor: Any, model: type) -> List[Any]:
+    return []
+
+
+def _no_rows(actor: Any, model: type) -> List[Any]:
+    return [false()]
+
+
+def _visible_users(user: User, model: type) -> List[Any]:
+    """allow(user, "GET", resource: User) of user_management_authorizations.polar."""
+    if user.has_role("admin"):
+        return []
+    return [User.id == user.id]
+
+
+def _visible_user_roles(user: User, model: type) -> List[Any]:
+    """allow(user, "GET", resource: UserRole) of user_management_authorizations.polar."""
+    if user.has_role("admin"):
+        return []
+    return [UserRole.user_id == user.id]
+
+
+def compile_filters() -> Dict[Tuple[type, str, type], FilterBuilder]:
+    """Build the table of filter builders keyed by (actor class, action, model)."""
+    filters: Dict[Tuple[type, str, type], FilterBuilder] = {}
+
+    # guests may only see namespaces
+    for model in _ONTOLOGY_MODELS:
+        filters[(Guest, "GET", model)] = _no_rows
+    filters[(Guest, "GET", Namespace)] = _all_rows
+    filters[(Guest, "GET", User)] = _no_rows
+    filters[(Guest, "GET", UserRole)] = _no_rows
+
+    # ontology resources are not protected resources
+    for model in _ONTOLOGY_MODELS:
+        filters[(User, "GET", model)] = _all_rows
+    filters[(User, "GET", User)] = _visible_users
+    filters[(User, "GET", UserRole)] = _visible_user_roles
+
+    return filters
+
+
+class SqlAuthorizationFilters:
+    """Translates authorization checks for whole tables into SQL filter criteria."""
+
+    def __init__(self) -> None:
+        self._filters = compile_filters()
+
+    def get_filter_criteria(
+        self, actor: Any, action: Any, model: type
+    ) -> Optional[List[Any]]:
+        """Get the filter criteria selecting all rows of model the actor may access.
+
+        Returns None if the check cannot be expressed as SQL.
+        """
+        builder = self._filters.get((type(actor), action, model))
+        if builder is None:
+            return None
+        return builder(actor, model)
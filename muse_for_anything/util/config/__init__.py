@@ -3,10 +3,13 @@
 from logging import INFO, WARNING
 from os import urandom
 
+from .http_cache_config import HttpCacheDebugConfig, HttpCacheProductionConfig
 from .oso_config import OsoDebugConfig, OsoProductionConfig
+from .pagination_config import PaginationDebugConfig, PaginationProductionConfig
 from .passwords_config import PasswordsDebugConfig, PasswordsProductionConfig
 from .smorest_config import SmorestDebugConfig, SmorestProductionConfig
 from .sqlalchemy_config import SQLAchemyDebugConfig, SQLAchemyProductionConfig
+from .validation_config import ValidationDebugConfig, ValidationProductionConfig
 
 
 class ProductionConfig(
@@ -14,6 +17,9 @@ class ProductionConfig(
     SmorestProductionConfig,
     OsoProductionConfig,
     PasswordsProductionConfig,
+    PaginationProductionConfig,
+    HttpCacheProductionConfig,
+    ValidationProductionConfig,
 ):
     ENV = "production"
     SECRET_KEY = urandom(
@@ -42,6 +48,9 @@ class DebugConfig(
     SmorestDebugConfig,
     OsoDebugConfig,
     PasswordsDebugConfig,
+    PaginationDebugConfig,
+    HttpCacheDebugConfig,
+    ValidationDebugConfig,
 ):
     ENV = "development"
     DEBUG = True
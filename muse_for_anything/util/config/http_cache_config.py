@@ -0,0 +1,12 @@
+class HttpCacheProductionConfig:
+    # cache rendered responses of immutable version resources
+    IMMUTABLE_RESPONSE_CACHE_ENABLED = True
+    IMMUTABLE_RESPONSE_CACHE_MAX_ENTRIES = 5_000
+    # seconds until a cached response is rendered again (the cache is per process)
+    IMMUTABLE_RESPONSE_CACHE_TTL = 300
+    # max-age of the (private) Cache-Control header of cached responses in seconds
+    IMMUTABLE_RESPONSE_MAX_AGE = 60
+
+
+class HttpCacheDebugConfig(HttpCacheProductionConfig):
+    pass
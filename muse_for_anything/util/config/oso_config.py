@@ -4,10 +4,15 @@ class OsoProductionConfig:
         "muse_for_anything/policies/authorizations.polar",
         "muse_for_anything/policies/user_management_authorizations.polar",
     ]
+    # "polar", "compiled" (pure python rules with polar fallback) or
+    # "parity" (run both and log disagreements)
+    OSO_AUTHORIZATION_ENGINE = "polar"
+    # filter collection queries in the database (only visible rows are paginated)
+    OSO_SQL_FILTERS = True
 
 
 class OsoDebugConfig(OsoProductionConfig):
-    pass
+    OSO_AUTHORIZATION_ENGINE = "parity"
     # OSO_POLICY_FILES = [
     #     "muse_for_anything/policies/identity_rules.polar",
     #     "muse_for_anything/policies/authorizations.polar",
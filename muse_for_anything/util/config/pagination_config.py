@@ -0,0 +1,14 @@
+class PaginationProductionConfig:
+    PAGINATION_USE_KEYSET = True
+    # max number of rows counted before/after the cursor for exact page numbers
+    PAGINATION_EXACT_ROW_LIMIT = 10_000
+
+    COLLECTION_SIZE_CACHE_ENABLED = True
+    # max age of cached collection sizes in seconds (the cache is per process,
+    # changes committed by other processes are only seen after this time)
+    COLLECTION_SIZE_CACHE_TTL = 60
+    COLLECTION_SIZE_CACHE_MAX_ENTRIES = 10_000
+
+
+class PaginationDebugConfig(PaginationProductionConfig):
+    pass
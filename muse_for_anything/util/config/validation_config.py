@@ -0,0 +1,23 @@
+class ValidationProductionConfig:
+    # cache of prepared json schema validators of type versions
+    SCHEMA_VALIDATOR_CACHE_MAX_ENTRIES = 512
+    # approximate size (of the json representation) of all cached schemas in bytes
+    SCHEMA_VALIDATOR_CACHE_MAX_SIZE = 64_000_000
+    # store of type version schemas used to resolve schema references
+    TYPE_SCHEMA_STORE_MAX_ENTRIES = 2048
+    # object request bodies of at least this size (in bytes) are validated while
+    # they are read (None to always read the complete body first)
+    OBJECT_STREAMING_VALIDATION_MIN_SIZE = 1_000_000
+    # maximum number of json schema validation errors reported for a request
+    # (None to report all errors)
+    SCHEMA_VALIDATION_MAX_ERRORS = 20
+    # stop json schema validation at the first error
+    SCHEMA_VALIDATION_FAIL_FAST = False
+    # number of objects revalidated (and committed) together by revalidation tasks
+    OBJECT_REVALIDATION_BATCH_SIZE = 200
+    # worker processes of revalidation tasks (None for one per cpu, 0 for no workers)
+    OBJECT_REVALIDATION_PROCESSES = None
+
+
+class ValidationDebugConfig(ValidationProductionConfig):
+    pass
@@ -158,6 +158,24 @@ def upgrade_db(c):
     c.run(join(["python", "-m", "flask", "db", "upgrade"]), echo=True, warn=True)
 
 
+@task
+def benchmark(c, preset="quick", output="", api=True):
+    """Run the benchmarks of the json schema tools and emit the results as json.
+
+    Args:
+        c (Context): task context
+        preset (str, optional): the benchmark sizes ("quick" or "full"). Defaults to "quick".
+        output (str, optional): write the results to this file. Defaults to "" (stdout).
+        api (bool, optional): also benchmark the object and type validation. Defaults to True.
+    """
+    cmd = ["python", "-m", "benchmarks.schema_tools", "--preset", preset]
+    if output:
+        cmd += ["--output", output]
+    if not api:
+        cmd.append("--no-api")
+    c.run(join(cmd), echo=True)
+
+
 @task
 def ensure_paths(c):
     """Docker specific task. Do not call."""
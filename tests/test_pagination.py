@@ -0,0 +1,86 @@
+"""Tests for the keyset pagination of nullable sort columns."""
+
+from typing import List, Optional
+
+import pytest
+
+from muse_for_anything import create_app
+from muse_for_anything.db.db import DB
+from muse_for_anything.db.models.namespace import Namespace
+from muse_for_anything.db.pagination import get_keyset_page_info
+from muse_for_anything.util.config import ProductionConfig
+
+ITEM_COUNT = 10
+NAMESPACE_COUNT = 57
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    config = {key: getattr(ProductionConfig, key) for key in dir(ProductionConfig)}
+    config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}",
+        SECRET_KEY="test",
+        JWT_SECRET_KEY="test",
+    )
+    app = create_app({key: value for key, value in config.items() if key.isupper()})
+    with app.app_context():
+        DB.create_all()
+        for index in range(NAMESPACE_COUNT):
+            # most descriptions are NULL, some duplicated
+            description = f"d{index % 4}" if index % 3 == 0 else None
+            DB.session.add(Namespace(name=f"n{index:02d}", description=description))
+        DB.session.commit()
+        yield app
+
+
+def _walk(sort: str) -> List[List[int]]:
+    """Follow the next page cursors from the first page to the last page."""
+    pages: List[List[int]] = []
+    cursor: Optional[int] = None
+    for _ in range(NAMESPACE_COUNT):
+        info = get_keyset_page_info(
+            Namespace,
+            Namespace.id,
+            [Namespace.name, Namespace.description],
+            cursor,
+            sort,
+            item_count=ITEM_COUNT,
+        )
+        assert info.cursor_page == len(pages) + 1
+        pages.append([namespace.id for namespace in info.page_items_query.all()])
+        next_pages = [p for p in info.surrounding_pages if p.page == info.cursor_page + 1]
+        if not next_pages:
+            assert info.last_page.page == info.cursor_page
+            return pages
+        cursor = next_pages[0].cursor
+    pytest.fail("The next page cursors do not end.")
+
+
+def _expected(sort: str) -> List[int]:
+    namespaces = Namespace.query.all()
+    for key in reversed(sort.split(",")):
+        attribute = key.lstrip("+-")
+        # NULL values are sorted before all other values
+        namespaces.sort(
+            key=lambda namespace, attribute=attribute: (
+                getattr(namespace, attribute) is not None,
+                getattr(namespace, attribute) or "",
+            ),
+            reverse=key.startswith("-"),
+        )
+    return [namespace.id for namespace in namespaces]
+
+
+@pytest.mark.parametrize(
+    "sort", ["description", "-description", "description,-name", "-description,id"]
+)
+def test_walk_nullable_sort_column(app, sort: str):
+    with app.app_context():
+        pages = _walk(sort)
+        assert all(len(page) == ITEM_COUNT for page in pages[:-1])
+        walked = [namespace_id for page in pages for namespace_id in page]
+        expected = _expected(sort)
+        if "," not in sort:
+            # rows with the same sort value are ordered by id
+            expected = _expected(f"{sort},id")
+        assert walked == expected